@@ -362,6 +362,45 @@ export const fetchData = async <T,>(url: string, options: RequestInit = {}, skip
   }
 };
 
+const IMPORT_JOB_POLL_INTERVAL_MS = 1000;
+// Stop waiting for a job after this long, or after this many failed polls in a row
+const IMPORT_JOB_POLL_TIMEOUT_MS = 30 * 60 * 1000;
+const IMPORT_JOB_POLL_MAX_FAILURES = 5;
+
+// Queues an upload as a background import job and polls /jobs/{id} until it
+// finishes, so large files do not hold a request open behind the proxy.
+const runImportJob = async (url: string, formData: FormData, skipAuth: boolean = false): Promise<any> => {
+  const queued = await fetchData<any>(`${url}?background=true`, { method: 'POST', body: formData }, skipAuth);
+  if (!queued || queued.job_id === undefined) {
+    return queued;
+  }
+  const deadline = Date.now() + IMPORT_JOB_POLL_TIMEOUT_MS;
+  let failures = 0;
+  while (Date.now() < deadline) {
+    await new Promise(resolve => setTimeout(resolve, IMPORT_JOB_POLL_INTERVAL_MS));
+    const job = await fetchData<any>(`${API_BASE_URL}/jobs/${queued.job_id}`, {}, skipAuth);
+    if (!job) {
+      failures += 1;
+      if (failures >= IMPORT_JOB_POLL_MAX_FAILURES) {
+        throw new Error(`Dosya aktarımının durumu alınamadı (İş #${queued.job_id}).`);
+      }
+      continue;
+    }
+    failures = 0;
+    if (job.Durum === 'completed') {
+      return {
+        message: `Dosya işlendi. Eklenen kayıtlar: ${job.Eklenen}, Atlanan kayıtlar: ${job.Atlanan + job.Hatali}`,
+        added: job.Eklenen,
+        skipped: job.Atlanan + job.Hatali,
+      };
+    }
+    if (job.Durum === 'failed') {
+      throw new Error(job.Hata || 'Dosya aktarımı başarısız oldu');
+    }
+  }
+  throw new Error(`Dosya aktarımı hâlâ sürüyor, sonucu daha sonra kontrol edin (İş #${queued.job_id}).`);
+};
+
 // DataProvider Component
 const DataProvider: React.FC<{ children: ReactNode }> = ({ children }) => {
     const [isInitialDataLoaded, setIsInitialDataLoaded] = useState(false);
@@ -689,27 +728,15 @@ const DataProvider: React.FC<{ children: ReactNode }> = ({ children }) => {
   }, []);
 
   const uploadB2BEkstre = useCallback(async (formData: FormData) => {
-    const result = await fetchData<any>(`${API_BASE_URL}/b2b-ekstreler/upload/`, {
-        method: 'POST',
-        body: formData,
-    });
-    return result;
+    return runImportJob(`${API_BASE_URL}/b2b-ekstreler/upload/`, formData);
   }, []);
 
   const uploadOdeme = useCallback(async (formData: FormData) => {
-    const result = await fetchData<any>(`${API_BASE_URL}/odeme/upload-csv/`, {
-        method: 'POST',
-        body: formData,
-    });
-    return result;
+    return runImportJob(`${API_BASE_URL}/odeme/upload-csv/`, formData);
   }, []);
 
   const uploadPosHareketleri = useCallback(async (formData: FormData) => {
-    const result = await fetchData<any>(`${API_BASE_URL}/pos-hareketleri/upload/`, {
-        method: 'POST',
-        body: formData,
-    }, true);
-    return result;
+    return runImportJob(`${API_BASE_URL}/pos-hareketleri/upload/`, formData, true);
   }, []);
 
   const uploadTabakSayisi = useCallback(async (formData: FormData) => {
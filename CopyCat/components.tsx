@@ -1,5 +1,5 @@
 import React, { ReactNode, useState, useEffect, useRef, forwardRef, useMemo } from 'react';
-import { Icons, DEFAULT_END_DATE, MOCK_UST_KATEGORILER, OZEL_FATURA_YETKI_ADI, HarcamaTipiOptions } from './constants';
+import { Icons, DEFAULT_END_DATE, MOCK_UST_KATEGORILER, OZEL_FATURA_YETKI_ADI, HarcamaTipiOptions, recordImageUrl } from './constants';
 import { useAppContext, useDataContext } from './App';
 import { 
     Sube, SubeFormData, Kullanici, Rol, Yetki, KullaniciRol, RolYetki, KullaniciFormData, RolFormData, YetkiFormData, 
@@ -878,8 +878,9 @@ export const DigerHarcamaForm: React.FC<DigerHarcamaFormProps> = ({ initialData,
             ...initialData,
             Donem: initialData.Donem || calculatePeriod(initialData.Belge_Tarihi)
         });
-        if (initialData.Imaj && typeof initialData.Imaj === 'string') {
-            setImagePreview(`data:image/jpeg;base64,${initialData.Imaj}`);
+        if (initialData.has_imaj && initialData.Harcama_ID) {
+            // The browser loads the stored image only when the form shows it
+            setImagePreview(recordImageUrl('diger-harcamalar', initialData.Harcama_ID));
         } else {
             setImagePreview(null);
         }
@@ -1626,8 +1627,9 @@ export const NakitForm: React.FC<NakitFormProps> = ({ initialData, onSubmit, onC
   const [imagePreview, setImagePreview] = useState<string | null>(null);
 
   useEffect(() => {
-    if (initialData?.Imaj && typeof initialData.Imaj === 'string') {
-      setImagePreview(`data:image/jpeg;base64,${initialData.Imaj}`);
+    if (initialData?.has_imaj && initialData.Nakit_ID) {
+      // The browser loads the stored image only when the form shows it
+      setImagePreview(recordImageUrl('nakit', initialData.Nakit_ID));
     } else {
       setImagePreview(null);
     }
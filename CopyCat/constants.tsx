@@ -7,6 +7,9 @@ export const API_BASE_URL = import.meta.env.VITE_API_BASE_URL ||
     ? 'http://localhost:8000/api/v1' 
     : 'https://gumusbulut.onrender.com/api/v1');
 
+// Liste kayıtlarında resim gelmez; has_imaj olan kaydın resmi bu adresten ayrıca yüklenir
+export const recordImageUrl = (resource: string, id: number) => `${API_BASE_URL}/${resource}/${id}/image`;
+
 // Heroicons (Outline)
 // Updated to accept className prop
 export const Icons = {
@@ -3,7 +3,7 @@ import React, { useState, useEffect, useCallback, useMemo, useRef } from 'react'
 import { generateDashboardPdf } from './utils/pdfGenerator';
 import * as XLSX from 'xlsx';
 import { useAppContext, useDataContext, fetchData } from './App';
-import { API_BASE_URL } from './constants';
+import { API_BASE_URL, recordImageUrl } from './constants';
 import { useToast } from './contexts/ToastContext';
 import { Button, Input, Modal, Card, TableLayout, StatusBadge, UserForm, RoleForm, PermissionForm, Select, DegerForm, Textarea, UstKategoriForm, KategoriForm, InlineEditInput, DigerHarcamaForm, StokForm, StokFiyatForm, NumberSpinnerInput, CalisanForm, PuantajSecimiForm, SubeForm, EFaturaReferansForm, OdemeReferansForm, NakitForm, AvansIstekForm } from './components';
 import { 
@@ -3573,10 +3573,10 @@ export const DigerHarcamalarPage: React.FC = () => {
                 {h.Gunluk_Harcama ? <Icons.CheckedSquare className="w-4 h-4 text-green-500" /> : <Icons.EmptySquare className="w-4 h-4 text-gray-300" />}
               </td>
               <td className="px-4 py-2 text-sm text-gray-500">
-                {h.Imaj_Adi && (
-                  <a href={`data:image/jpeg;base64,${h.Imaj}`} download={h.Imaj_Adi} className="text-blue-600 hover:underline flex items-center space-x-1">
+                {h.has_imaj && (
+                  <a href={recordImageUrl('diger-harcamalar', h.Harcama_ID)} download={h.Imaj_Adi} target="_blank" rel="noopener noreferrer" className="text-blue-600 hover:underline flex items-center space-x-1">
                     <Icons.Download className="w-4 h-4" />
-                    <span>{h.Imaj_Adi}</span>
+                    <span>{h.Imaj_Adi || 'Resim'}</span>
                   </a>
                 )}
               </td>
@@ -5629,9 +5629,9 @@ export const NakitPage: React.FC = () => {
                 <td className="px-2 py-1.5 whitespace-nowrap text-sm text-gray-900">{nakit.Tip}</td>
                 <td className="px-2 py-1.5 whitespace-nowrap text-sm text-gray-500">{nakit.Donem}</td>
                 <td className="px-2 py-1.5 whitespace-nowrap text-sm text-gray-500">
-                  {nakit.Imaj && nakit.Imaj_Adı ? (
-                    <a href={`data:image/jpeg;base64,${nakit.Imaj}`} download={nakit.Imaj_Adı} className="text-blue-600 hover:underline">
-                      {nakit.Imaj_Adı}
+                  {nakit.has_imaj ? (
+                    <a href={recordImageUrl('nakit', nakit.Nakit_ID)} download={nakit.Imaj_Adı} target="_blank" rel="noopener noreferrer" className="text-blue-600 hover:underline">
+                      {nakit.Imaj_Adı || 'Resim'}
                     </a>
                   ) : '-'}
                 </td>
@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { Plus, Edit, Trash2, Check, X, FileText, Users, Eye, Download } from 'lucide-react';
 import * as XLSX from 'xlsx';
 import { useAppContext, useDataContext } from '../App';
-import { CALISAN_TALEP_ISE_GIRIS_ONAYI_YETKI_ADI, CALISAN_TALEP_SSK_ONAYI_YETKI_ADI } from '../constants';
+import { CALISAN_TALEP_ISE_GIRIS_ONAYI_YETKI_ADI, CALISAN_TALEP_SSK_ONAYI_YETKI_ADI, recordImageUrl } from '../constants';
 
 // Types
 interface CalisanTalep {
@@ -31,7 +31,8 @@ interface CalisanTalep {
   Talep: 'İşten Çıkış' | 'İşe Giriş';
   Sube_ID: number;
   Imaj_Adi?: string;
-  Imaj?: string;
+  Imaj?: string; // Only sent when a file is uploaded; lists carry has_imaj instead
+  has_imaj?: boolean;
   Kayit_Tarih: string;
   Is_Onay_Tarih?: string | null;
   SSK_Onay_Tarih?: string | null;
@@ -630,15 +631,16 @@ const CalisanTalepSistemi: React.FC = () => {
                       {selectedFile && (
                         <p className="mt-1 text-sm text-gray-600">Seçilen dosya: {selectedFile.name}</p>
                       )}
-                      {(modalType === 'edit' || modalType === 'observe') && formData.Imaj && (() => {
+                      {(modalType === 'edit' || modalType === 'observe') && formData.has_imaj && formData.Calisan_Talep_ID && (() => {
                         const mimeType = getMimeType(formData.Imaj_Adi);
                         const isImage = mimeType.startsWith('image/');
+                        const imageUrl = recordImageUrl('calisan-talepler', formData.Calisan_Talep_ID);
                         return (
                           <div className="mt-2">
                             <p className="text-sm font-medium text-gray-700">Mevcut Dosya:</p>
-                            <a href={`data:${mimeType};base64,${formData.Imaj}`} download={formData.Imaj_Adi || 'Mevcut Dosya'} target="_blank" rel="noopener noreferrer">
+                            <a href={imageUrl} download={formData.Imaj_Adi || 'Mevcut Dosya'} target="_blank" rel="noopener noreferrer">
                               {isImage ? (
-                                <img src={`data:${mimeType};base64,${formData.Imaj}`} alt="Mevcut Dosya" className="mt-1 max-h-40 rounded-lg" />
+                                <img src={imageUrl} alt="Mevcut Dosya" className="mt-1 max-h-40 rounded-lg" />
                               ) : (
                                 <div className="mt-1 flex items-center gap-2 text-blue-600 hover:text-blue-800">
                                   <FileText className="w-6 h-6" />
@@ -858,15 +860,16 @@ const CalisanTalepSistemi: React.FC = () => {
                       {selectedFile && (
                         <p className="mt-1 text-sm text-gray-600">Seçilen dosya: {selectedFile.name}</p>
                       )}
-                      {(modalType === 'edit' || modalType === 'observe') && formData.Imaj && (() => {
+                      {(modalType === 'edit' || modalType === 'observe') && formData.has_imaj && formData.Calisan_Talep_ID && (() => {
                         const mimeType = getMimeType(formData.Imaj_Adi);
                         const isImage = mimeType.startsWith('image/');
+                        const imageUrl = recordImageUrl('calisan-talepler', formData.Calisan_Talep_ID);
                         return (
                           <div className="mt-2">
                             <p className="text-sm font-medium text-gray-700">Mevcut Dosya:</p>
-                            <a href={`data:${mimeType};base64,${formData.Imaj}`} download={formData.Imaj_Adi || 'Mevcut Dosya'} target="_blank" rel="noopener noreferrer">
+                            <a href={imageUrl} download={formData.Imaj_Adi || 'Mevcut Dosya'} target="_blank" rel="noopener noreferrer">
                               {isImage ? (
-                                <img src={`data:${mimeType};base64,${formData.Imaj}`} alt="Mevcut Dosya" className="mt-1 max-h-40 rounded-lg" />
+                                <img src={imageUrl} alt="Mevcut Dosya" className="mt-1 max-h-40 rounded-lg" />
                               ) : (
                                 <div className="mt-1 flex items-center gap-2 text-blue-600 hover:text-blue-800">
                                   <FileText className="w-6 h-6" />
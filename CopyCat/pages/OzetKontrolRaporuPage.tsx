@@ -58,35 +58,22 @@ export const OzetKontrolRaporuPage: React.FC = () => {
 
     useEffect(() => {
         if (selectedBranch && reportPeriod) {
-            Promise.all([
-                fetchData<number>(`${API_BASE_URL}/ozet-kontrol-raporu/robotpos-tutar/${selectedBranch.Sube_ID}/${reportPeriod}`),
-                fetchData<number>(`${API_BASE_URL}/ozet-kontrol-raporu/toplam-satis-gelirleri/${selectedBranch.Sube_ID}/${reportPeriod}`),
-                fetchData<number>(`${API_BASE_URL}/ozet-kontrol-raporu/nakit/${selectedBranch.Sube_ID}/${reportPeriod}`),
-                fetchData<number>(`${API_BASE_URL}/ozet-kontrol-raporu/gunluk-harcama-diger/${selectedBranch.Sube_ID}/${reportPeriod}`),
-                fetchData<number>(`${API_BASE_URL}/ozet-kontrol-raporu/gunluk-harcama-efatura/${selectedBranch.Sube_ID}/${reportPeriod}`),
-                fetchData<number>(`${API_BASE_URL}/ozet-kontrol-raporu/nakit-girisi-toplam/${selectedBranch.Sube_ID}/${reportPeriod}`),
-                fetchData<number>(`${API_BASE_URL}/ozet-kontrol-raporu/bankaya-yatan-toplam/${selectedBranch.Sube_ID}/${reportPeriod}`),
-                fetchData<number>(`${API_BASE_URL}/ozet-kontrol-raporu/gelir-pos-toplam/${selectedBranch.Sube_ID}/${reportPeriod}`),
-                fetchData<number>(`${API_BASE_URL}/ozet-kontrol-raporu/pos-hareketleri-toplam/${selectedBranch.Sube_ID}/${reportPeriod}`),
-                fetchData<number>(`${API_BASE_URL}/ozet-kontrol-raporu/online-gelir-toplam/${selectedBranch.Sube_ID}/${reportPeriod}`),
-                fetchData<number>(`${API_BASE_URL}/ozet-kontrol-raporu/online-virman-toplam/${selectedBranch.Sube_ID}/${reportPeriod}`),
-                fetchData<number>(`${API_BASE_URL}/ozet-kontrol-raporu/yemek-ceki-aylik-gelir-toplam/${selectedBranch.Sube_ID}/${reportPeriod}`),
-                fetchData<number>(`${API_BASE_URL}/ozet-kontrol-raporu/yemek-ceki-donem-toplam/${selectedBranch.Sube_ID}/${reportPeriod}`)
-            ]).then(data => {
+            fetchData<any>(`${API_BASE_URL}/ozet-kontrol-raporu/${selectedBranch.Sube_ID}/${reportPeriod}`).then(data => {
+                if (!data) return;
                 setDatabaseData({
-                    robotposTutar: data[0],
-                    toplamSatis: data[1],
-                    nakit: data[2],
-                    gunlukHarcamaDiger: data[3],
-                    gunlukHarcamaEFatura: data[4],
-                    nakitGirisiToplam: data[5],
-                    bankayaYatan: data[6],
-                    gelirPOS: data[7],
-                    posHareketleri: data[8],
-                    onlineGelirToplam: data[9] || 0,
-                    onlineVirmanToplam: data[10] || 0,
-                    yemekCekiAylikGelir: data[11],
-                    yemekCekiDonemToplam: data[12],
+                    robotposTutar: data.robotpos_tutar,
+                    toplamSatis: data.toplam_satis_gelirleri,
+                    nakit: data.nakit,
+                    gunlukHarcamaDiger: data.gunluk_harcama_diger,
+                    gunlukHarcamaEFatura: data.gunluk_harcama_efatura,
+                    nakitGirisiToplam: data.nakit_girisi_toplam,
+                    bankayaYatan: data.bankaya_yatan,
+                    gelirPOS: data.gelir_pos,
+                    posHareketleri: data.pos_hareketleri,
+                    onlineGelirToplam: data.gelir_toplam || 0,
+                    onlineVirmanToplam: data.virman_toplam || 0,
+                    yemekCekiAylikGelir: data.aylik_gelir,
+                    yemekCekiDonemToplam: data.toplam_donem,
                 });
             });
         }
@@ -3,7 +3,7 @@ import * as XLSX from 'xlsx';
 import '../styles/YemekCekiKontrolDashboard.css';
 import { useAppContext, useDataContext } from '../App';
 import { Button } from '../components'; // Import Button component
-import { Icons, EXCELE_AKTAR_YETKISI_ADI } from '../constants'; // Import Icons and permission names
+import { Icons, EXCELE_AKTAR_YETKISI_ADI, recordImageUrl } from '../constants'; // Import Icons and permission names
 
 // Helper function to parse YYYY-MM-DD or DD.MM.YYYY string to Date object safely
 const parseDate = (dateString: string | null | undefined): Date | null => {
@@ -441,15 +441,15 @@ export const YemekCekiKontrolDashboardPage: React.FC = () => {
                                         {grup.cekler.map(cek => (
                                             <tr key={cek.ID}>
                                                 <td style={{ paddingLeft: '25px' }}>
-                                                    {cek.Imaj && cek.Imaj_Adi ? (
+                                                    {cek.has_imaj ? (
                                                         <a 
-                                                            href={`data:${getMimeType(cek.Imaj_Adi)};base64,${cek.Imaj}`}
+                                                            href={recordImageUrl('yemek-cekiler', cek.ID)}
                                                             download={cek.Imaj_Adi}
                                                             target="_blank"
                                                             rel="noopener noreferrer"
                                                             className="text-blue-600 hover:underline"
                                                         >
-                                                            {cek.Imaj_Adi}
+                                                            {cek.Imaj_Adi || 'Resim'}
                                                         </a>
                                                     ) : (
                                                         '-'
@@ -166,8 +166,9 @@ export interface DigerHarcama {
   Gunluk_Harcama: boolean;
   Sube_ID: number;
   Kayit_Tarihi: string; // TIMESTAMP
-  Imaj?: string; // Base64 encoded image
+  Imaj?: string; // Base64 encoded image, only in single-record responses
   Imaj_Adi?: string; // Image filename
+  has_imaj?: boolean; // Set by list responses; the image is served from /diger-harcamalar/{id}/image
   Açıklama?: string; // TEXT
 }
 
@@ -317,7 +318,8 @@ export interface Nakit {
   Tip: string; // ENUM ('Bankaya Yatan', 'Elden', 'Banka Transferi')
   Donem: number; // INT
   Imaj_Adı?: string; // VARCHAR(255)
-  Imaj?: string; // LONGBLOB (Base64 encoded string)
+  Imaj?: string; // LONGBLOB (Base64 encoded string), only in single-record responses
+  has_imaj?: boolean; // Set by list responses; the image is served from /nakit/{id}/image
 }
 
 // --- ODEME REPORT TYPES ---
@@ -618,8 +620,9 @@ export interface YemekCeki {
   Ilk_Tarih: string; // DATE
   Son_Tarih: string; // DATE
   Sube_ID: number;
-  Imaj?: string; // Base64 encoded image
+  Imaj?: string; // Base64 encoded image, only in single-record responses
   Imaj_Adi?: string; // Image filename
+  has_imaj?: boolean; // Set by list responses; the image is served from /yemek-cekiler/{id}/image
   Kayit_Tarihi?: string; // TIMESTAMP
 }
 
@@ -1,38 +1,132 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional
+from datetime import date, datetime
+import hashlib
 
+from core import compression
 from core.config import settings
-from db import crud, database, models
+from core.security import ALGORITHM, REFRESH_TOKEN_TYPE
+from db import bootstrap_crud, crud, database, permissions, principals, versioning
 from schemas.user import UserInDB
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/token")
 
+def list_filters(
+    after_id: Optional[int] = None,
+    sube_id: Optional[int] = None,
+    donem: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    since: Optional[datetime] = None,
+) -> dict:
+    """
+    Common query parameters of the list endpoints. after_id is the primary key
+    of the last row of the previous page (keyset pagination), donem is YYMM and
+    since limits the result to rows inserted or updated after a sync watermark.
+    A donem that is not a valid YYMM or YYYYMM period is rejected with 400.
+    """
+    if donem is not None:
+        try:
+            crud.donem_to_date_range(donem)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid donem '{donem}'. Expected YYMM or YYYYMM.")
+    return {
+        "after_id": after_id,
+        "sube_id": sube_id,
+        "donem": donem,
+        "start_date": start_date,
+        "end_date": end_date,
+        "since": since,
+    }
+
+def field_selection(fields: Optional[str] = None) -> Optional[List[str]]:
+    """
+    Sparse fieldset of a list endpoint: ?fields=Fatura_ID,Tutar selects only
+    those columns in SQL and returns only those keys. None means all fields.
+    """
+    if not fields:
+        return None
+    return [name.strip() for name in fields.split(",") if name.strip()] or None
+
+def _scope_param(request: Request, name: str) -> Optional[int]:
+    values = request.query_params.getlist(name) or [request.path_params.get(name)]
+    if len(values) != 1 or not str(values[0] or "").isdigit():
+        return None
+    return int(values[0])
+
+def table_etag(*table_names: str):
+    """
+    Conditional GET support for endpoints reading table_names. The strong ETag
+    is derived from the tables' write counters for the request's sube_id/donem
+    scope and the negotiated Content-Encoding, so a matching If-None-Match is
+    answered with 304 before the endpoint queries or serializes anything.
+    """
+    def etag_checker(request: Request, response: Response, db: Session = Depends(database.get_db)):
+        sube_id = _scope_param(request, "sube_id")
+        donem = _scope_param(request, "donem")
+        keys = [key for table_name in table_names for key in versioning.version_keys(table_name, sube_id, donem)]
+        versions = versioning.get_table_versions(db, keys)
+        query = sorted(request.query_params.multi_items())
+        digest = hashlib.sha1(f"{settings.PROJECT_VERSION}|{request.url.path}|{query}|{versions}".encode("utf-8")).hexdigest()
+        etag = compression.variant_etag(digest, request.headers.get("accept-encoding", ""))
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return etag
+
+    return etag_checker
+
+def deleted_since(model):
+    """
+    Delta sync through a list endpoint: with ?since= the response also carries
+    the keys of model's rows deleted since then (X-Deleted-Ids, comma
+    separated) and the watermark to send as since next time
+    (X-Sync-Watermark), the same tombstones and watermark /bootstrap returns.
+    Only tables in models.TOMBSTONE_TABLES record their deletes.
+    """
+    if crud.get_change_column(model) is None:
+        raise ValueError(f"{model.__tablename__} does not track changes and deletes")
+
+    def deleted_ids_header(response: Response, since: Optional[datetime] = None, sube_id: Optional[int] = None,
+                           db: Session = Depends(database.get_db)):
+        if since is None:
+            return
+        scope = bootstrap_crud.BootstrapScope(sube_id=sube_id, since=since)
+        response.headers["X-Sync-Watermark"] = bootstrap_crud.get_sync_watermark(db).isoformat()
+        response.headers["X-Deleted-Ids"] = ",".join(str(key) for key in bootstrap_crud.get_deleted_ids(db, scope, model))
+
+    return deleted_ids_header
+
 def get_current_user(
     db: Session = Depends(database.get_db), token: str = Depends(oauth2_scheme)
-) -> models.Kullanici:
+) -> principals.Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
-        if username is None:
+        if username is None or payload.get("type") == REFRESH_TOKEN_TYPE:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = crud.get_user_by_username(db, username=username)
+    # Cached for a short time, so most requests skip the user lookup
+    user = principals.get_principal(db, username)
     if user is None:
         raise credentials_exception
     return user
 
 def get_current_active_user(
-    current_user: models.Kullanici = Depends(get_current_user),
-) -> models.Kullanici:
+    current_user: principals.Principal = Depends(get_current_user),
+) -> principals.Principal:
     if not current_user.Aktif_Pasif:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
@@ -40,20 +134,11 @@ def get_current_active_user(
 def check_permission(permission_name: str):
     def permission_checker(
         db: Session = Depends(database.get_db),
-        current_user: models.Kullanici = Depends(get_current_active_user)
+        current_user: principals.Principal = Depends(get_current_active_user)
     ):
-        # Get user roles
-        user_roles = crud.get_kullanici_rolleri(db, kullanici_id=current_user.Kullanici_ID)
-        
-        # Check if user has the required permission
-        for user_role in user_roles:
-            # Get role permissions
-            role_permissions = crud.get_rol_yetkileri(db, rol_id=user_role.Rol_ID)
-            for role_permission in role_permissions:
-                permission = crud.get_yetki(db, role_permission.Yetki_ID)
-                if permission and permission.Yetki_Adi == permission_name and role_permission.Aktif_Pasif:
-                    return True
-        
+        if permission_name in permissions.get_user_permissions(db, current_user.Kullanici_ID):
+            return True
+
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"User does not have the required permission: {permission_name}"
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
+from api.v1 import deps
 from db import crud, database, models
 from schemas import avans_istek
 
@@ -11,9 +12,9 @@ router = APIRouter()
 def create_avans_istek(avans_istek: avans_istek.AvansIstekCreate, db: Session = Depends(database.get_db)):
     return crud.create_avans_istek(db=db, avans_istek=avans_istek)
 
-@router.get("/avans-istekler/", response_model=List[avans_istek.AvansIstekInDB])
-def read_avans_istekler(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    avans_istekler = crud.get_avans_istekler(db, skip=skip, limit=limit)
+@router.get("/avans-istekler/", response_model=List[avans_istek.AvansIstekInDB], dependencies=[Depends(deps.table_etag("Avans_Istek")), Depends(deps.deleted_since(models.AvansIstek))])
+def read_avans_istekler(skip: int = 0, limit: int = 100, filters: dict = Depends(deps.list_filters), db: Session = Depends(database.get_db)):
+    avans_istekler = crud.get_avans_istekler(db, skip=skip, limit=limit, **filters)
     return avans_istekler
 
 @router.get("/avans-istekler/{avans_id}", response_model=avans_istek.AvansIstekInDB)
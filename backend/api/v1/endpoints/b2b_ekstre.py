@@ -1,14 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
-import csv
-import io
+from typing import List, Optional
 from datetime import datetime
 import logging
 
-# Import send_email function assuming the script is run from the project root
-from send_email import gmail_send_message
-from db import crud, database, models
+from api.v1 import deps, import_jobs
+from core import uploads
+from db import crud, database, email_outbox, import_ledger, models
 from schemas import b2b_ekstre
 
 # Configure logging
@@ -17,25 +16,14 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/b2b-ekstreler/upload/")
-async def upload_b2b_ekstre(
-    sube_id: int = Form(...),
-    file: UploadFile = File(...), 
-    db: Session = Depends(database.get_db)
-):
-    logger.info(f"Starting B2B Ekstre upload for Sube_ID: {sube_id}")
-    if not file.filename.endswith('.csv'):
-        logger.error(f"Invalid file type: {file.filename}")
-        raise HTTPException(status_code=400, detail="Invalid file type. Please upload a CSV file.")
-
-    content = await file.read()
-    # Use utf-8-sig to handle potential BOM characters at the start of the file
-    stream = io.StringIO(content.decode('utf-8-sig'))
-    csv_reader = csv.DictReader(stream)
-
-    ekstreler_to_create = []
+def _parse_b2b_rows(csv_rows, sube_id: int, efatura_aciklamalari: dict):
+    """
+    Yields a B2BEkstreCreate per statement line, or None for a line that cannot
+    be parsed. Descriptions for the e-Fatura backfill are collected into
+    efatura_aciklamalari as a side effect.
+    """
     rows_read = 0
-    for row in csv_reader:
+    for row in csv_rows:
         rows_read += 1
         # Normalize keys from the CSV header to be more robust
         row_normalized = {k.strip().lower().replace(' ', '_').replace('ş', 's').replace('ı', 'i').replace('ü', 'u').replace('ğ', 'g').replace('ö', 'o').replace('ç', 'c'): v for k, v in row.items()}
@@ -49,14 +37,9 @@ async def upload_b2b_ekstre(
                 # Use description as a fallback, otherwise generate a placeholder
                 fis_no = row_normalized.get("aciklama", f"PAYMENT-{row_normalized.get('tarih')}-{rows_read}")
 
-            # Update e_Fatura.Aciklama if applicable
             aciklama_from_csv = row_normalized.get("aciklama")
             if fis_no and aciklama_from_csv:
-                e_fatura_record = db.query(models.EFatura).filter(models.EFatura.Fatura_Numarasi == fis_no).first()
-                if e_fatura_record and not e_fatura_record.Aciklama:
-                    logger.info(f"Updating e_Fatura record for Fatura_Numarasi {fis_no} with new Aciklama.")
-                    e_fatura_record.Aciklama = aciklama_from_csv
-                    db.commit()
+                efatura_aciklamalari.setdefault(fis_no, aciklama_from_csv)
 
             # Handle potential missing 'donem' key
             donem = row_normalized.get("donem")
@@ -70,9 +53,11 @@ async def upload_b2b_ekstre(
                         logger.info(f"Derived 'donem' as {donem} from 'tarih' {tarih_str}")
                     except ValueError:
                         logger.error(f"Could not parse date to derive 'donem' on row {rows_read}. Row: {row_normalized}")
+                        yield None
                         continue # Skip row if 'donem' is critical and cannot be derived
                 else:
                     logger.error(f"'donem' and 'tarih' are missing on row {rows_read}. Row: {row_normalized}")
+                    yield None
                     continue # Skip row
 
             ekstre_data = b2b_ekstre.B2BEkstreCreate(
@@ -89,57 +74,141 @@ async def upload_b2b_ekstre(
                 Kategori_ID=int(row_normalized["kategori_id"]) if row_normalized.get("kategori_id") else None,
                 Sube_ID=sube_id,
             )
-            ekstreler_to_create.append(ekstre_data)
+            yield ekstre_data
         except (ValueError, KeyError, TypeError) as e:
             logger.error(f"CSV parsing error on row {rows_read}: {e} - Row data: {row_normalized}")
             # Decide if you want to stop or continue
             # raise HTTPException(status_code=400, detail=f"CSV parsing error on row {rows_read}: {e}")
-            continue # Continue with the next rows
+            yield None # Continue with the next rows
+
+def _import_b2b_csv(upload_file, db: Session, sube_id: int, progress=None):
+    """
+    Streams the CSV from the spooled upload and commits it UPLOAD_CHUNK_ROWS
+    lines at a time, together with the e-Fatura descriptions seen so far. A
+    file already in the import ledger is not read again.
+    """
+    def import_rows(scope):
+        # Fatura_Numarasi -> Aciklama for e-Faturas that have no description yet;
+        # applied in one UPDATE per chunk together with the ekstre insert
+        efatura_aciklamalari = {}
+        counts = {"parsed": 0, "added": 0, "skipped": 0, "errored": 0}
+        for batch in uploads.batches(_parse_b2b_rows(uploads.iter_csv_rows(upload_file), sube_id, efatura_aciklamalari)):
+            ekstreler = [ekstre_data for ekstre_data in batch if ekstre_data is not None]
+            for ekstre_data in ekstreler:
+                scope.see(ekstre_data.Tarih)
+            result = crud.create_b2b_ekstre_bulk(db=db, ekstreler=ekstreler, efatura_aciklamalari=efatura_aciklamalari)
+            efatura_aciklamalari.clear()
+            counts["parsed"] += len(batch)
+            counts["errored"] += len(batch) - len(ekstreler)
+            counts["added"] += result["added"]
+            counts["skipped"] += result["skipped"]
+            if progress is not None:
+                progress(counts)
+        if efatura_aciklamalari:
+            crud.create_b2b_ekstre_bulk(db=db, ekstreler=[], efatura_aciklamalari=efatura_aciklamalari)
+        return counts
+
+    return import_ledger.run(db, models.B2BEkstre.__tablename__, sube_id, uploads.csv_digest(upload_file), import_rows)
+
+def _preview_b2b_csv(upload_file, db: Session, sube_id: int):
+    """
+    Reports what _import_b2b_csv would do with the CSV without writing: the
+    lines are parsed and split against the existing keys in the same
+    UPLOAD_CHUNK_ROWS chunks the import commits, so only the totals and the
+    samples are kept in memory.
+    """
+    key = import_ledger.fingerprint(models.B2BEkstre.__tablename__, sube_id, uploads.csv_digest(upload_file))
+    previous = import_ledger.lookup(db, models.B2BEkstre.__tablename__, sube_id, key)
+    if previous is not None:
+        return uploads.previously_imported_result(import_ledger.counts_of(previous))
+
+    preview = uploads.PreviewCounts()
+    seen = set()
+    for batch in uploads.batches(_parse_b2b_rows(uploads.iter_csv_rows(upload_file), sube_id, {})):
+        ekstreler = [ekstre_data for ekstre_data in batch if ekstre_data is not None]
+        new_ekstreler, duplicates = crud.split_new_b2b_ekstreler(db, ekstreler, seen)
+        preview.add(
+            parsed=len(batch),
+            new=len(new_ekstreler),
+            duplicate=len(duplicates),
+            invalid=len(batch) - len(ekstreler),
+            uncategorized=sum(ekstre_data.Kategori_ID is None for ekstre_data in new_ekstreler),
+            sample_new=[ekstre_data.dict() for ekstre_data in new_ekstreler[:uploads.PREVIEW_SAMPLE_ROWS]],
+            sample_duplicate=[ekstre_data.dict() for ekstre_data in duplicates[:uploads.PREVIEW_SAMPLE_ROWS]],
+        )
+    return preview.result()
+
+def _notify_admins(db: Session, filename: str):
+    # Queue one email to every admin; the outbox sends it after the response
+    try:
+        recipients = [user.Email for user in crud.get_users_by_role_name(db, role_name="Admin") if user.Email]
+        if not recipients:
+            logger.info("No admin user with an email address, skipping email notification.")
+            return
+        email_outbox.enqueue(db, recipients, subject="B2B Ekstre Yükleme", body=f"'{filename}' Yüklendi.")
+    except Exception as e:
+        logger.error(f"Could not queue the B2B upload notification: {e}")
+        # Do not re-raise the exception, as the file upload itself was successful.
+
+def _notify_admins_of_job(db: Session, job, counts: dict):
+    if counts["parsed"] > counts["errored"] and not counts.get("duplicate"):
+        _notify_admins(db, job.Dosya_Adi)
 
-    logger.info(f"Total rows read from CSV: {rows_read}")
-    logger.info(f"Number of records to be created: {len(ekstreler_to_create)}")
+import_jobs.register("b2b_ekstre", _import_b2b_csv, on_complete=_notify_admins_of_job)
 
-    if not ekstreler_to_create:
+@router.post("/b2b-ekstreler/upload/")
+async def upload_b2b_ekstre(
+    response: Response,
+    sube_id: int = Form(...),
+    file: UploadFile = File(...), 
+    background: bool = False,
+    dry_run: bool = False,
+    db: Session = Depends(database.get_db)
+):
+    logger.info(f"Starting B2B Ekstre upload for Sube_ID: {sube_id}")
+    if not file.filename.endswith('.csv'):
+        logger.error(f"Invalid file type: {file.filename}")
+        raise HTTPException(status_code=400, detail="Invalid file type. Please upload a CSV file.")
+
+    if dry_run:
+        return await run_in_threadpool(_preview_b2b_csv, file.file, db, sube_id)
+
+    if background:
+        job = await run_in_threadpool(import_jobs.enqueue, db, "b2b_ekstre", file, sube_id)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"job_id": job.Is_ID, "status": job.Durum}
+
+    counts = await run_in_threadpool(_import_b2b_csv, file.file, db, sube_id)
+    logger.info(f"Bulk insert result: {counts}")
+
+    if counts["parsed"] == counts["errored"]:
         logger.warning("CSV file is empty or contains no valid data to insert.")
         return {"message": "CSV file is empty or contains no valid data to insert.", "added": 0, "skipped": 0}
 
-    result = crud.create_b2b_ekstre_bulk(db=db, ekstreler=ekstreler_to_create)
-    logger.info(f"Bulk insert result: {result}")
-    
-    # Send email notification to admins
-    try:
-        print("--- DEBUG: ENTERING EMAIL BLOCK ---")
-        admin_users = crud.get_users_by_role_name(db, role_name="Admin")
-        if not admin_users:
-            print("--- DEBUG: No admin users found, skipping email notification. ---")
-        else:
-            subject = "B2B Ekstre Yükleme"
-            body = f"'{file.filename}' Yüklendi."
-            print(f"--- DEBUG: Found {len(admin_users)} admin user(s). ---")
-            for user in admin_users:
-                if user.Email:
-                    print(f"--- DEBUG: Attempting to send email to {user.Email} ---")
-                    gmail_send_message(to_email=user.Email, subject=subject, body=body)
-                else:
-                    print(f"--- DEBUG: Admin user {user.Kullanici_Adi} has no email address, skipping. ---")
-            print("--- DEBUG: Finished sending email notifications. ---")
-    except Exception as e:
-        print(f"--- DEBUG: CRITICAL ERROR IN EMAIL BLOCK: {e} ---")
-        # Do not re-raise the exception, as the file upload itself was successful.
+    if counts.get("duplicate"):
+        logger.info(f"B2B Ekstre file {file.filename} was already imported; returning the earlier result.")
+        return {
+            "message": "This B2B Ekstre file was already imported.",
+            "added": counts["added"],
+            "skipped": counts["skipped"],
+            "duplicate": True
+        }
+
+    _notify_admins(db, file.filename)
 
     return {
         "message": "B2B Ekstre file processed successfully.",
-        "added": result["added"],
-        "skipped": result["skipped"]
+        "added": counts["added"],
+        "skipped": counts["skipped"]
     }
 
 @router.post("/b2b-ekstreler/", response_model=b2b_ekstre.B2BEkstreInDB, status_code=status.HTTP_201_CREATED)
 def create_new_b2b_ekstre(ekstre: b2b_ekstre.B2BEkstreCreate, db: Session = Depends(database.get_db)):
     return crud.create_b2b_ekstre(db=db, ekstre=ekstre)
 
-@router.get("/b2b-ekstreler/", response_model=List[b2b_ekstre.B2BEkstreInDB])
-def read_b2b_ekstreler(skip: int = 0, db: Session = Depends(database.get_db)):
-    ekstreler = crud.get_b2b_ekstreler(db, skip=skip)
+@router.get("/b2b-ekstreler/", response_model=List[b2b_ekstre.B2BEkstreInDB], dependencies=[Depends(deps.table_etag("B2B_Ekstre")), Depends(deps.deleted_since(models.B2BEkstre))])
+def read_b2b_ekstreler(skip: int = 0, limit: Optional[int] = None, filters: dict = Depends(deps.list_filters), db: Session = Depends(database.get_db)):
+    ekstreler = crud.get_b2b_ekstreler(db, skip=skip, limit=limit, **filters)
     return ekstreler
 
 @router.get("/b2b-ekstreler/{ekstre_id}", response_model=b2b_ekstre.B2BEkstreInDB)
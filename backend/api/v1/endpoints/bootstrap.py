@@ -0,0 +1,124 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from typing import List, Optional
+from datetime import datetime
+import json
+import logging
+import zlib
+
+from core import compression
+from db import bootstrap_crud, crud, database, models
+from schemas import (
+    e_fatura, b2b_ekstre, diger_harcama, stok, stok_fiyat, stok_sayim, calisan, puantaj_secimi, puantaj,
+    gelir, gelir_ekstra, avans_istek, e_fatura_referans, odeme_referans, nakit, odeme, yemek_ceki, calisan_talep
+)
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Dataset key -> (model, loader, response schema). Keys follow the list endpoints
+# the frontend used to call one by one on startup.
+BOOTSTRAP_DATASETS = [
+    ("e_faturalar", models.EFatura, bootstrap_crud.get_e_faturalar, e_fatura.EFaturaInDB),
+    ("b2b_ekstreler", models.B2BEkstre, bootstrap_crud.get_b2b_ekstreler, b2b_ekstre.B2BEkstreInDB),
+    ("diger_harcamalar", models.DigerHarcama, bootstrap_crud.get_diger_harcamalar, diger_harcama.DigerHarcamaList),
+    ("stoklar", models.Stok, bootstrap_crud.get_stoklar, stok.StokInDB),
+    ("stok_fiyatlar", models.StokFiyat, bootstrap_crud.get_stok_fiyatlar, stok_fiyat.StokFiyatInDB),
+    ("stok_sayimlar", models.StokSayim, bootstrap_crud.get_stok_sayimlar, stok_sayim.StokSayimInDB),
+    ("calisanlar", models.Calisan, bootstrap_crud.get_calisanlar, calisan.Calisan),
+    ("puantaj_secimleri", models.PuantajSecimi, bootstrap_crud.get_puantaj_secimleri, puantaj_secimi.PuantajSecimiInDB),
+    ("puantajlar", models.Puantaj, bootstrap_crud.get_puantajlar, puantaj.PuantajInDB),
+    ("gelirler", models.Gelir, bootstrap_crud.get_gelirler, gelir.GelirInDB),
+    ("gelir_ekstralar", models.GelirEkstra, bootstrap_crud.get_gelir_ekstralar, gelir_ekstra.GelirEkstraInDB),
+    ("avans_istekler", models.AvansIstek, bootstrap_crud.get_avans_istekler, avans_istek.AvansIstekInDB),
+    ("efatura_referanslar", models.EFaturaReferans, bootstrap_crud.get_efatura_referanslar, e_fatura_referans.EFaturaReferansInDB),
+    ("odeme_referanslar", models.OdemeReferans, bootstrap_crud.get_odeme_referanslar, odeme_referans.OdemeReferansInDB),
+    ("nakitler", models.Nakit, bootstrap_crud.get_nakitler, nakit.NakitList),
+    ("odemeler", models.Odeme, bootstrap_crud.get_odemeler, odeme.OdemeInDB),
+    ("yemek_cekiler", models.YemekCeki, bootstrap_crud.get_yemek_cekiler, yemek_ceki.YemekCekiList),
+    ("calisan_talepler", models.CalisanTalep, bootstrap_crud.get_calisan_talepler, calisan_talep.CalisanTalepList),
+]
+
+
+def iter_bootstrap_json(db: Session, scope: bootstrap_crud.BootstrapScope):
+    """
+    Yields the snapshot as JSON fragments, one dataset at a time, so only a
+    single table is held in memory while the response is being written.
+
+    For delta requests (scope.since set) tracked datasets only contain rows
+    written since then, "deleted" lists the keys removed in the meantime and
+    "full" names the untracked datasets that are still sent completely.
+    """
+    header = {
+        "scope": {"sube_id": scope.sube_id, "donem_start": scope.donem_start, "donem_end": scope.donem_end},
+        "since": scope.since.isoformat() if scope.since else None,
+        "watermark": bootstrap_crud.get_sync_watermark(db).isoformat(),
+    }
+    yield json.dumps(header)[:-1].encode('utf-8') + b',"datasets":{'
+
+    full, deleted = [], {}
+    for index, (name, model, loader, schema) in enumerate(BOOTSTRAP_DATASETS):
+        rows = loader(db, scope)
+        adapter = TypeAdapter(List[schema])
+        payload = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+        logger.info(f"Bootstrap dataset {name}: {len(rows)} rows, {len(payload)} bytes")
+        yield (b',' if index else b'') + json.dumps(name).encode('utf-8') + b':' + payload
+
+        if bootstrap_crud.get_change_column(model) is None:
+            full.append(name)
+        elif scope.since is not None:
+            deleted[name] = bootstrap_crud.get_deleted_ids(db, scope, model)
+
+    if scope.sube_id is not None and scope.end_date is not None:
+        depo_kira = crud.get_depo_kira_rapor(db=db, year=scope.end_date.year, sube_id=scope.sube_id)
+        yield b',"depo_kira_rapor":' + json.dumps(depo_kira).encode('utf-8')
+
+    yield b'}'
+    if scope.since is not None:
+        yield b',"full":' + json.dumps(full).encode('utf-8') + b',"deleted":' + json.dumps(deleted).encode('utf-8')
+    yield b'}'
+
+
+def gzip_chunks(chunks, level: int = 6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+@router.get("/bootstrap")
+def read_bootstrap(
+    request: Request,
+    sube_id: Optional[int] = None,
+    donem_start: Optional[int] = None,
+    donem_end: Optional[int] = None,
+    since: Optional[datetime] = None,
+    db: Session = Depends(database.get_db)
+):
+    """
+    Returns every dataset the frontend needs on startup in a single streamed,
+    gzip-compressed JSON document, using one database session.
+
+    Args:
+        sube_id: Optional branch filter for branch-owned tables
+        donem_start: Optional first period (YYMM or YYYYMM) of the window
+        donem_end: Optional last period (YYMM or YYYYMM) of the window
+        since: Optional watermark of a previous response, returns only the changes after it
+    """
+    try:
+        scope = bootstrap_crud.BootstrapScope(sube_id=sube_id, donem_start=donem_start, donem_end=donem_end, since=since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(f"Building bootstrap snapshot for Sube_ID: {sube_id}, Donem: {donem_start}-{donem_end}, since: {since}")
+    body = iter_bootstrap_json(db, scope)
+    headers = {"Vary": "Accept-Encoding"}
+    # When brotli is preferred the compression middleware encodes the stream instead
+    if compression.negotiate_encoding(request.headers.get("accept-encoding", "")) == "gzip":
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type="application/json", headers=headers)
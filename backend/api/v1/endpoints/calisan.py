@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
+from api.v1 import deps
 from db import crud, database, models
 from schemas import calisan
 
@@ -11,10 +12,10 @@ router = APIRouter()
 def create_calisan(calisan: calisan.CalisanCreate, db: Session = Depends(database.get_db)):
     return crud.create_calisan(db=db, calisan=calisan)
 
-@router.get("/calisanlar/", response_model=List[calisan.Calisan])
-def read_calisanlar(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
+@router.get("/calisanlar/", response_model=List[calisan.Calisan], dependencies=[Depends(deps.table_etag("Calisan"))])
+def read_calisanlar(skip: int = 0, limit: int = 100, sube_id: Optional[int] = None, db: Session = Depends(database.get_db)):
     print("Request received for /calisanlar/")
-    calisanlar = crud.get_calisanlar(db, skip=skip, limit=limit)
+    calisanlar = crud.get_calisanlar(db, skip=skip, limit=limit, sube_id=sube_id)
     print(f"Returning {len(calisanlar)} calisanlar")
     return calisanlar
 
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Form, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Form, UploadFile, File, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import base64
 from datetime import date, datetime
 
-from db import crud, database
+from api.v1 import deps, images
+from db import crud, database, models
 from schemas import calisan_talep
 
 router = APIRouter()
@@ -19,12 +20,9 @@ async def create_calisan_talep(
         db_talep.Imaj = base64.b64encode(db_talep.Imaj).decode('utf-8')
     return db_talep
 
-@router.get("/calisan-talepler/", response_model=List[calisan_talep.CalisanTalep])
-def read_calisan_talepler(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    talepler = crud.get_calisan_talepler(db, skip=skip, limit=limit)
-    for talep in talepler:
-        if talep.Imaj:
-            talep.Imaj = base64.b64encode(talep.Imaj).decode('utf-8')
+@router.get("/calisan-talepler/", response_model=List[calisan_talep.CalisanTalepList], dependencies=[Depends(deps.table_etag("Calisan_Talep")), Depends(deps.deleted_since(models.CalisanTalep))])
+def read_calisan_talepler(skip: int = 0, limit: int = 100, filters: dict = Depends(deps.list_filters), db: Session = Depends(database.get_db)):
+    talepler = crud.get_calisan_talepler(db, skip=skip, limit=limit, **filters)
     return talepler
 
 @router.get("/calisan-talepler/by-tc/{tc_no}", response_model=calisan_talep.CalisanTalep)
@@ -45,6 +43,10 @@ def read_calisan_talep(talep_id: int, db: Session = Depends(database.get_db)):
         db_talep.Imaj = base64.b64encode(db_talep.Imaj).decode('utf-8')
     return db_talep
 
+@router.get("/calisan-talepler/{talep_id}/image")
+def get_calisan_talep_image(talep_id: int, request: Request, thumbnail: bool = False, db: Session = Depends(database.get_db)):
+    return images.image_response(request, db, models.CalisanTalep, models.CalisanTalep.Calisan_Talep_ID, talep_id, thumbnail=thumbnail)
+
 @router.put("/calisan-talepler/{talep_id}", response_model=calisan_talep.CalisanTalep)
 async def update_calisan_talep(
     talep_id: int,
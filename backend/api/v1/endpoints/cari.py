@@ -4,6 +4,7 @@ from typing import List
 
 from db import crud
 from schemas import cari
+from api.v1 import deps
 from db.database import get_db
 
 router = APIRouter()
@@ -12,7 +13,7 @@ router = APIRouter()
 def create_cari(cari_data: cari.CariCreate, db: Session = Depends(get_db)):
     return crud.create_cari(db=db, cari_data=cari_data)
 
-@router.get("/cari/", response_model=List[cari.Cari])
+@router.get("/cari/", response_model=List[cari.Cari], dependencies=[Depends(deps.table_etag("Cari"))])
 def read_cariler(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     cariler = crud.get_cariler(db, skip=skip, limit=limit)
     return cariler
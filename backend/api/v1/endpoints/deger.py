@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
+from api.v1 import deps, reference_cache
 from db import crud, database
 from schemas import deger
 
@@ -11,10 +12,9 @@ router = APIRouter()
 def create_deger(deger: deger.DegerCreate, db: Session = Depends(database.get_db)):
     return crud.create_deger(db=db, deger=deger)
 
-@router.get("/degerler/", response_model=List[deger.Deger])
-def read_degerler(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    degerler = crud.get_degerler(db, skip=skip, limit=limit)
-    return degerler
+@router.get("/degerler/", response_model=List[deger.Deger], dependencies=[Depends(deps.table_etag("Deger"))])
+def read_degerler(request: Request, response: Response, skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
+    return reference_cache.cached_list_response(request, response, deger.Deger, lambda: crud.get_degerler(db, skip=skip, limit=limit))
 
 @router.get("/degerler/{deger_id}", response_model=deger.Deger)
 def read_deger(deger_id: int, db: Session = Depends(database.get_db)):
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date, datetime
 
+from api.v1 import deps, fast_json, images
 from db import crud, database, models
 from schemas import diger_harcama
 
@@ -41,10 +42,13 @@ async def create_diger_harcama(
         harcama_data.Imaj = await image.read()
     return await crud.create_diger_harcama(db=db, harcama=harcama_data)
 
-@router.get("/diger-harcamalar/", response_model=List[diger_harcama.DigerHarcamaInDB])
-def read_diger_harcamalar(skip: int = 0, db: Session = Depends(database.get_db)):
-    harcamalar = crud.get_diger_harcamalar(db, skip=skip)
-    return harcamalar
+@router.get("/diger-harcamalar/", response_model=List[diger_harcama.DigerHarcamaList], dependencies=[Depends(deps.table_etag("Diger_Harcama")), Depends(deps.deleted_since(models.DigerHarcama))])
+def read_diger_harcamalar(response: Response, skip: int = 0, limit: Optional[int] = None, filters: dict = Depends(deps.list_filters), fields: Optional[List[str]] = Depends(deps.field_selection), db: Session = Depends(database.get_db)):
+    has_imaj, imaj_boyutu = crud.image_metadata_columns(models.DigerHarcama)
+    columns = fast_json.schema_columns(diger_harcama.DigerHarcamaList, models.DigerHarcama, fields,
+                                       expressions={"has_imaj": has_imaj, "Imaj_Boyutu": imaj_boyutu})
+    harcamalar = crud.get_diger_harcamalar(db, skip=skip, limit=limit, columns=columns, **filters)
+    return fast_json.rows_response(diger_harcama.DigerHarcamaList, harcamalar, response)
 
 @router.get("/diger-harcamalar/{harcama_id}", response_model=diger_harcama.DigerHarcamaInDB)
 def read_diger_harcama(harcama_id: int, db: Session = Depends(database.get_db)):
@@ -53,6 +57,10 @@ def read_diger_harcama(harcama_id: int, db: Session = Depends(database.get_db)):
         raise HTTPException(status_code=404, detail="Diğer Harcama not found")
     return db_harcama
 
+@router.get("/diger-harcamalar/{harcama_id}/image")
+def get_diger_harcama_image(harcama_id: int, request: Request, thumbnail: bool = False, db: Session = Depends(database.get_db)):
+    return images.image_response(request, db, models.DigerHarcama, models.DigerHarcama.Harcama_ID, harcama_id, thumbnail=thumbnail)
+
 @router.put("/diger-harcamalar/{harcama_id}", response_model=diger_harcama.DigerHarcamaInDB)
 async def update_diger_harcama(
     harcama_id: int,
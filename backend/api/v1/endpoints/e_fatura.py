@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from db import crud, database
+from api.v1 import deps, fast_json
+from db import crud, database, models
 from schemas import e_fatura
 
 router = APIRouter()
@@ -17,10 +18,11 @@ def create_bulk_efatura(efaturas: List[e_fatura.EFaturaCreate], db: Session = De
 def create_single_efatura(efatura: e_fatura.EFaturaCreate, db: Session = Depends(database.get_db)):
     return crud.create_efatura(db=db, efatura=efatura)
 
-@router.get("/e-faturalar/", response_model=List[e_fatura.EFaturaInDB])
-def read_efaturalar(db: Session = Depends(database.get_db)):
-    efaturalar = crud.get_efaturalar(db)
-    return efaturalar
+@router.get("/e-faturalar/", response_model=List[e_fatura.EFaturaInDB], dependencies=[Depends(deps.table_etag("e_Fatura")), Depends(deps.deleted_since(models.EFatura))])
+def read_efaturalar(response: Response, limit: Optional[int] = None, filters: dict = Depends(deps.list_filters), fields: Optional[List[str]] = Depends(deps.field_selection), db: Session = Depends(database.get_db)):
+    columns = fast_json.schema_columns(e_fatura.EFaturaInDB, models.EFatura, fields)
+    efaturalar = crud.get_efaturalar(db, limit=limit, columns=columns, **filters)
+    return fast_json.rows_response(e_fatura.EFaturaInDB, efaturalar, response)
 
 @router.get("/e-faturalar/{efatura_id}", response_model=e_fatura.EFaturaInDB)
 def read_efatura(efatura_id: int, db: Session = Depends(database.get_db)):
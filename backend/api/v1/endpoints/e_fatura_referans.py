@@ -4,6 +4,7 @@ from typing import List
 
 from db import crud, models
 from schemas import e_fatura_referans
+from api.v1 import deps
 from db.database import get_db
 
 router = APIRouter()
@@ -15,7 +16,7 @@ def create_efatura_referans(efatura_referans: e_fatura_referans.EFaturaReferansC
         raise HTTPException(status_code=400, detail="e-Fatura Referans already registered")
     return crud.create_efatura_referans(db=db, efatura_referans=efatura_referans)
 
-@router.get("/e-fatura-referans/", response_model=List[e_fatura_referans.EFaturaReferansInDB])
+@router.get("/e-fatura-referans/", response_model=List[e_fatura_referans.EFaturaReferansInDB], dependencies=[Depends(deps.table_etag("e_Fatura_Referans"))])
 def read_efatura_referanslar(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     efatura_referanslar = crud.get_efatura_referanslar(db, skip=skip, limit=limit)
     return efatura_referanslar
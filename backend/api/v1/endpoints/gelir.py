@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import date, timedelta
 import logging
 
+from api.v1 import deps, fast_json
 from db import crud, database, models
 from schemas import gelir
 
@@ -14,10 +15,11 @@ logger = logging.getLogger(__name__)
 def create_gelir(gelir: gelir.GelirCreate, db: Session = Depends(database.get_db)):
     return crud.create_gelir(db=db, gelir=gelir)
 
-@router.get("/gelirler/", response_model=List[gelir.GelirInDB])
-def read_gelirler(skip: int = 0, limit: int | None = None, db: Session = Depends(database.get_db)):
-    gelirler = crud.get_gelirler(db, skip=skip, limit=limit)
-    return gelirler
+@router.get("/gelirler/", response_model=List[gelir.GelirInDB], dependencies=[Depends(deps.table_etag("Gelir")), Depends(deps.deleted_since(models.Gelir))])
+def read_gelirler(response: Response, skip: int = 0, limit: int | None = None, filters: dict = Depends(deps.list_filters), fields: List[str] | None = Depends(deps.field_selection), db: Session = Depends(database.get_db)):
+    columns = fast_json.schema_columns(gelir.GelirInDB, models.Gelir, fields)
+    gelirler = crud.get_gelirler(db, skip=skip, limit=limit, columns=columns, **filters)
+    return fast_json.rows_response(gelir.GelirInDB, gelirler, response)
 
 @router.get("/gelirler/{gelir_id}", response_model=gelir.GelirInDB)
 def read_gelir(gelir_id: int, db: Session = Depends(database.get_db)):
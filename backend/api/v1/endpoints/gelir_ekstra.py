@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File,
 from sqlalchemy.orm import Session
 from typing import List
 
+from api.v1 import deps
 from db import crud, database, models
 from schemas import gelir_ekstra
 
@@ -22,9 +23,9 @@ def upload_tabak_sayisi(
 def create_gelir_ekstra(gelir_ekstra: gelir_ekstra.GelirEkstraCreate, db: Session = Depends(database.get_db)):
     return crud.create_gelir_ekstra(db=db, gelir_ekstra=gelir_ekstra)
 
-@router.get("/gelir-ekstra/", response_model=List[gelir_ekstra.GelirEkstraInDB])
-def read_gelir_ekstralar(skip: int = 0, limit: int | None = None, db: Session = Depends(database.get_db)):
-    gelir_ekstralar = crud.get_gelir_ekstralar(db, skip=skip, limit=limit)
+@router.get("/gelir-ekstra/", response_model=List[gelir_ekstra.GelirEkstraInDB], dependencies=[Depends(deps.table_etag("GelirEkstra")), Depends(deps.deleted_since(models.GelirEkstra))])
+def read_gelir_ekstralar(skip: int = 0, limit: int | None = None, filters: dict = Depends(deps.list_filters), db: Session = Depends(database.get_db)):
+    gelir_ekstralar = crud.get_gelir_ekstralar(db, skip=skip, limit=limit, **filters)
     return gelir_ekstralar
 
 @router.get("/gelir-ekstra/{gelir_ekstra_id}", response_model=gelir_ekstra.GelirEkstraInDB)
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from db import database, models
+from schemas import import_job
+
+router = APIRouter()
+
+@router.get("/jobs/{job_id}", response_model=import_job.ImportJobInDB)
+def read_import_job(job_id: int, db: Session = Depends(database.get_db)):
+    job = db.get(models.AktarimIsi, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
+from api.v1 import deps, reference_cache
 from db import crud, database, models
 from schemas import kategori
 
@@ -11,10 +12,9 @@ router = APIRouter()
 def create_kategori(kategori: kategori.KategoriCreate, db: Session = Depends(database.get_db)):
     return crud.create_kategori(db=db, kategori=kategori)
 
-@router.get("/kategoriler/", response_model=List[kategori.KategoriInDB])
-def read_kategoriler(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    kategoriler = crud.get_kategoriler(db, skip=skip, limit=limit)
-    return kategoriler
+@router.get("/kategoriler/", response_model=List[kategori.KategoriInDB], dependencies=[Depends(deps.table_etag("Kategori"))])
+def read_kategoriler(request: Request, response: Response, skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
+    return reference_cache.cached_list_response(request, response, kategori.KategoriInDB, lambda: crud.get_kategoriler(db, skip=skip, limit=limit))
 
 @router.get("/kategoriler/{kategori_id}", response_model=kategori.KategoriInDB)
 def read_kategori(kategori_id: int, db: Session = Depends(database.get_db)):
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
 from decimal import Decimal
 import base64
 
+from api.v1 import deps, images
 from db import crud, database, models
 from schemas import nakit
 
@@ -35,12 +36,9 @@ def create_nakit_entry(
     nakit_in = nakit.NakitCreate(**nakit_data)
     return crud.create_nakit(db=db, nakit=nakit_in)
 
-@router.get("/nakit/", response_model=List[nakit.NakitInDB])
-def read_nakit_entries(skip: int = 0, limit: int = 10000, sube_id: Optional[int] = None, db: Session = Depends(database.get_db)):
-    nakit_entries = crud.get_nakit_entries(db, skip=skip, limit=limit, sube_id=sube_id)
-    for entry in nakit_entries:
-        if entry.Imaj:
-            entry.Imaj = base64.b64encode(entry.Imaj).decode('utf-8')
+@router.get("/nakit/", response_model=List[nakit.NakitList], dependencies=[Depends(deps.table_etag("Nakit")), Depends(deps.deleted_since(models.Nakit))])
+def read_nakit_entries(skip: int = 0, limit: int = 10000, filters: dict = Depends(deps.list_filters), db: Session = Depends(database.get_db)):
+    nakit_entries = crud.get_nakit_entries(db, skip=skip, limit=limit, **filters)
     return nakit_entries
 
 @router.get("/nakit/{nakit_id}", response_model=nakit.NakitInDB)
@@ -50,6 +48,10 @@ def read_nakit_entry(nakit_id: int, db: Session = Depends(database.get_db)):
         raise HTTPException(status_code=404, detail="Nakit entry not found")
     return db_nakit
 
+@router.get("/nakit/{nakit_id}/image")
+def get_nakit_image(nakit_id: int, request: Request, thumbnail: bool = False, db: Session = Depends(database.get_db)):
+    return images.image_response(request, db, models.Nakit, models.Nakit.Nakit_ID, nakit_id, name_column=models.Nakit.Imaj_Adı, thumbnail=thumbnail)
+
 @router.put("/nakit/{nakit_id}", response_model=nakit.NakitInDB)
 def update_existing_nakit_entry(
     nakit_id: int,
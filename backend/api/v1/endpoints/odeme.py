@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, Response, status, File, UploadFile, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import csv
-import io
 import logging
 from datetime import datetime
 from decimal import Decimal # Import Decimal
 
-from db import crud, database
+from api.v1 import deps, fast_json, import_jobs
+from core import uploads
+from db import crud, database, import_ledger, models, odeme_matcher
 from schemas import odeme
 
 # Configure logging (using print for debugging as requested)
@@ -16,34 +17,10 @@ from schemas import odeme
 
 router = APIRouter()
 
-@router.post("/odeme/upload-csv/")
-async def upload_odeme_csv(
-    file: UploadFile = File(...),
-    db: Session = Depends(database.get_db)
-):
-    sube_id = 1 # Hardcode Sube_ID as requested
-    print(f"Starting Odeme CSV upload for Sube_ID: {sube_id}, file: {file.filename}")
-    if not file.filename.endswith('.csv'):
-        print(f"Invalid file type: {file.filename}")
-        raise HTTPException(status_code=400, detail="Invalid file type. Please upload a CSV file.")
-
-    content = await file.read()
-    try:
-        # Use utf-8-sig to handle BOM
-        stream = io.StringIO(content.decode('utf-8-sig'))
-    except Exception as e: # Simplified error handling for decoding
-        print(f"Failed to decode file: {e}")
-        raise HTTPException(status_code=400, detail="Cannot decode file content. Please ensure it's UTF-8 encoded.")
-
-    csv_reader = csv.DictReader(stream, delimiter=';')
-
-    # Get all odeme referanslar
-    odeme_referanslar = crud.get_odeme_referanslar(db=db)
-
-    added_count = 0
-    skipped_count = 0
+def _parse_odeme_rows(csv_rows, matcher, sube_id):
+    """Yields an OdemeCreate per bank line, or None for a line that cannot be parsed."""
     rows_read = 0
-    for row in csv_reader:
+    for row in csv_rows:
         rows_read += 1
         # Normalize keys from the CSV header
         row_normalized = {k.strip().lower().replace(' ', '_').replace('ş', 's').replace('ı', 'i').replace('ü', 'u').replace('ğ', 'g').replace('ö', 'o').replace('ç', 'c'): v for k, v in row.items()}
@@ -56,7 +33,7 @@ async def upload_odeme_csv(
             tarih_str = row_normalized.get("tarih")
             if not tarih_str:
                 print(f"Skipping row {rows_read} due to missing 'tarih'.")
-                skipped_count += 1
+                yield None
                 continue
 
             # Clean and parse Tutar
@@ -80,14 +57,9 @@ async def upload_odeme_csv(
 
             aciklama = row_normalized.get("aciklama")
 
-            # Find Kategori_ID from odeme_referanslar
-            kategori_id = None
-            for ref in odeme_referanslar:
-                if ref.Referans_Metin in aciklama:
-                    kategori_id = ref.Kategori_ID
-                    break
+            kategori_id = matcher.kategori_for(aciklama)
 
-            odeme_data = odeme.OdemeCreate(
+            yield odeme.OdemeCreate(
                 Tip=row_normalized.get("tip"),
                 Hesap_Adi=row_normalized.get("hesap_adi"),
                 Tarih=tarih_dt.date(),
@@ -97,23 +69,111 @@ async def upload_odeme_csv(
                 Donem=donem,
                 Sube_ID=sube_id,
             )
-
-            # Check for existing odeme
-            existing_odeme = crud.get_odeme_by_unique_fields(db=db, odeme_data=odeme_data)
-            if existing_odeme:
-                print(f"Skipping existing record: {odeme_data.Aciklama[:30]}")
-                skipped_count += 1
-                continue
-
-            # Use crud.create_odeme for single record creation
-            crud.create_odeme(db=db, odeme=odeme_data)
-            added_count += 1
         except (ValueError, KeyError, TypeError) as e:
             print(f"CSV parsing error on row {rows_read}: {e} - Row data: {row_normalized}")
-            skipped_count += 1
-            continue # Continue with the next rows
+            yield None
+
+def _import_odeme_csv(upload_file, db: Session, sube_id: int, progress=None):
+    """
+    Streams the CSV from the spooled upload and commits it UPLOAD_CHUNK_ROWS
+    lines at a time, so memory use does not grow with the file size. A file
+    already in the import ledger is not read again.
+    """
+    def import_rows(scope):
+        # Active Odeme_Referans texts, compiled into one matcher
+        matcher = odeme_matcher.get_matcher(db)
+
+        counts = {"parsed": 0, "added": 0, "skipped": 0, "errored": 0}
+        rows = _parse_odeme_rows(uploads.iter_csv_rows(upload_file, delimiter=';'), matcher, sube_id)
+        for batch in uploads.batches(rows):
+            odemeler = [odeme_data for odeme_data in batch if odeme_data is not None]
+            for odeme_data in odemeler:
+                scope.see(odeme_data.Tarih)
+            result = crud.create_odemeler_bulk(db, odemeler)
+            counts["parsed"] += len(batch)
+            counts["errored"] += len(batch) - len(odemeler)
+            counts["added"] += result["added"]
+            counts["skipped"] += result["skipped"]
+            if progress is not None:
+                progress(counts)
+        return counts
+
+    return import_ledger.run(db, models.Odeme.__tablename__, sube_id, uploads.csv_digest(upload_file), import_rows)
+
+import_jobs.register("odeme", _import_odeme_csv)
+
+def _preview_odeme_csv(upload_file, db: Session, sube_id: int):
+    """
+    Reports what _import_odeme_csv would do with the CSV without writing:
+    the lines are parsed and split against the existing keys in the same
+    UPLOAD_CHUNK_ROWS chunks the import commits, so only the totals and the
+    samples are kept in memory.
+    """
+    key = import_ledger.fingerprint(models.Odeme.__tablename__, sube_id, uploads.csv_digest(upload_file))
+    previous = import_ledger.lookup(db, models.Odeme.__tablename__, sube_id, key)
+    if previous is not None:
+        return uploads.previously_imported_result(import_ledger.counts_of(previous))
+
+    matcher = odeme_matcher.get_matcher(db)
+    preview = uploads.PreviewCounts()
+    seen = set()
+    for batch in uploads.batches(_parse_odeme_rows(uploads.iter_csv_rows(upload_file, delimiter=';'), matcher, sube_id)):
+        odemeler = [odeme_data for odeme_data in batch if odeme_data is not None]
+        new_odemeler, duplicates = crud.split_new_odemeler(db, odemeler, seen)
+        preview.add(
+            parsed=len(batch),
+            new=len(new_odemeler),
+            duplicate=len(duplicates),
+            invalid=len(batch) - len(odemeler),
+            uncategorized=sum(odeme_data.Kategori_ID is None for odeme_data in new_odemeler),
+            sample_new=[odeme_data.dict() for odeme_data in new_odemeler[:uploads.PREVIEW_SAMPLE_ROWS]],
+            sample_duplicate=[odeme_data.dict() for odeme_data in duplicates[:uploads.PREVIEW_SAMPLE_ROWS]],
+        )
+    return preview.result()
+
+@router.post("/odeme/upload-csv/")
+async def upload_odeme_csv(
+    response: Response,
+    file: UploadFile = File(...),
+    background: bool = False,
+    dry_run: bool = False,
+    db: Session = Depends(database.get_db)
+):
+    sube_id = 1 # Hardcode Sube_ID as requested
+    print(f"Starting Odeme CSV upload for Sube_ID: {sube_id}, file: {file.filename}")
+    if not file.filename.endswith('.csv'):
+        print(f"Invalid file type: {file.filename}")
+        raise HTTPException(status_code=400, detail="Invalid file type. Please upload a CSV file.")
+
+    if dry_run:
+        try:
+            return await run_in_threadpool(_preview_odeme_csv, file.file, db, sube_id)
+        except UnicodeDecodeError as e:
+            print(f"Failed to decode file: {e}")
+            raise HTTPException(status_code=400, detail="Cannot decode file content. Please ensure it's UTF-8 encoded.")
+
+    if background:
+        job = await run_in_threadpool(import_jobs.enqueue, db, "odeme", file, sube_id)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"job_id": job.Is_ID, "status": job.Durum}
+
+    try:
+        counts = await run_in_threadpool(_import_odeme_csv, file.file, db, sube_id)
+    except UnicodeDecodeError as e:
+        print(f"Failed to decode file: {e}")
+        raise HTTPException(status_code=400, detail="Cannot decode file content. Please ensure it's UTF-8 encoded.")
+    added_count = counts["added"]
+    skipped_count = counts["skipped"] + counts["errored"]
+
+    if counts.get("duplicate"):
+        print(f"Odeme file {file.filename} was already imported; returning the earlier result.")
+        return {
+            "message": f"This Odeme file was already imported. Added {added_count} records, skipped {skipped_count} records.",
+            "added": added_count,
+            "skipped": skipped_count,
+            "duplicate": True
+        }
 
-    print(f"Total rows read from CSV: {rows_read}")
     print(f"Number of records added: {added_count}")
     print(f"Number of records skipped: {skipped_count}")
 
@@ -124,14 +184,20 @@ async def upload_odeme_csv(
     }
 
 
+@router.post("/Odeme/reclassify")
+def reclassify_odemeler(sube_id: Optional[int] = None, donem: Optional[int] = None, only_uncategorized: bool = True, db: Session = Depends(database.get_db)):
+    """Applies the current Odeme_Referans texts to stored payments."""
+    return crud.reclassify_odemeler(db, sube_id=sube_id, donem=donem, only_uncategorized=only_uncategorized)
+
 @router.post("/Odeme/", response_model=odeme.OdemeInDB, status_code=status.HTTP_201_CREATED)
 def create_new_odeme(odeme_data: odeme.OdemeCreate, db: Session = Depends(database.get_db)):
     return crud.create_odeme(db=db, odeme=odeme_data)
 
-@router.get("/Odeme/", response_model=List[odeme.OdemeInDB])
-def read_odemeler(skip: int = 0, limit: int | None = None, db: Session = Depends(database.get_db)):
-    odemeler = crud.get_odemeler(db, skip=skip, limit=limit)
-    return odemeler
+@router.get("/Odeme/", response_model=List[odeme.OdemeInDB], dependencies=[Depends(deps.table_etag("Odeme")), Depends(deps.deleted_since(models.Odeme))])
+def read_odemeler(response: Response, skip: int = 0, limit: int | None = None, filters: dict = Depends(deps.list_filters), fields: List[str] | None = Depends(deps.field_selection), db: Session = Depends(database.get_db)):
+    columns = fast_json.schema_columns(odeme.OdemeInDB, models.Odeme, fields)
+    odemeler = crud.get_odemeler(db, skip=skip, limit=limit, columns=columns, **filters)
+    return fast_json.rows_response(odeme.OdemeInDB, odemeler, response)
 
 @router.get("/Odeme/{odeme_id}", response_model=odeme.OdemeInDB)
 def read_odeme(odeme_id: int, db: Session = Depends(database.get_db)):
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
+from api.v1 import deps
 from db import crud, database
 from schemas import odeme_referans
 
@@ -11,7 +12,7 @@ router = APIRouter()
 def create_new_odeme_referans(referans_data: odeme_referans.OdemeReferansCreate, db: Session = Depends(database.get_db)):
     return crud.create_odeme_referans(db=db, odeme_referans=referans_data)
 
-@router.get("/Odeme_Referans/", response_model=List[odeme_referans.OdemeReferansInDB])
+@router.get("/Odeme_Referans/", response_model=List[odeme_referans.OdemeReferansInDB], dependencies=[Depends(deps.table_etag("Odeme_Referans"))])
 def read_odeme_referanslar(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
     referanslar = crud.get_odeme_referanslar(db, skip=skip, limit=limit)
     return referanslar
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from db import crud
 from db.database import get_db
@@ -8,6 +10,24 @@ import logging
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+@router.get("/ozet-kontrol-raporu/", response_model=List[OzetKontrolRaporuData])
+def get_ozet_kontrol_raporlari(
+    sube_id: List[int] = Query(...),
+    donem: List[int] = Query(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Get Ozet Kontrol Raporu for every combination of the given branches and periods,
+    e.g. ?sube_id=1&sube_id=2&donem=2508&donem=2509.
+    """
+    logger.info(f"Getting Ozet Kontrol Raporu for Sube_ID: {sube_id}, Donem: {donem}")
+
+    try:
+        return crud.get_ozet_kontrol_raporlari(db=db, sube_ids=sube_id, donemler=donem)
+    except Exception as e:
+        logger.error(f"Error in get_ozet_kontrol_raporlari: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
 @router.get("/ozet-kontrol-raporu/{sube_id}/{donem}", response_model=OzetKontrolRaporuData)
 def get_ozet_kontrol_raporu(
     sube_id: int,
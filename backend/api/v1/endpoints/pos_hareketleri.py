@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from collections import Counter
 from typing import List
 import pandas as pd
 from io import BytesIO
 from datetime import datetime
 import logging
 
-from db import crud, database, models
+from api.v1 import deps, import_jobs
+from core import uploads
+from db import crud, database, import_ledger, models
 from schemas import pos_hareketleri
 # Removed security dependencies
 
@@ -16,10 +20,112 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def _normalize_column_name(col_name):
+    name = str(col_name).strip().lower()
+    # Consistent character replacement for robust matching
+    replacements = {
+        'ı': 'i', 'i̇': 'i', 'ş': 's', 'ç': 'c', 'ğ': 'g', 'ü': 'u', 'ö': 'o', 
+        '_': ' ', '-': ' '
+    }
+    for tr_char, en_char in replacements.items():
+        name = name.replace(tr_char, en_char)
+    # Consolidate whitespace
+    return " ".join(name.split())
+
+# Keys in this map are the fully normalized, ASCII-like versions
+COLUMN_MAPPING = {
+    'islem tarihi': 'islem_tarihi',
+    'hesaba gecis tarihi': 'hesaba_gecis',
+    'para birimi': 'para_birimi',
+    'islem tutari': 'islem_tutari',
+    'kesinti tutari': 'kesinti_tutari',
+    'net tutar': 'net_tutar',
+    'tarih': 'islem_tarihi',
+    'tutar': 'islem_tutari',
+    'hesaba gecis': 'hesaba_gecis',
+}
+
+def _prepare_pos_frame(df, sube_id: int):
+    """Maps the sheet's headers to the POS_Hareketleri columns, or raises 400 when a required one is missing."""
+    df.columns = [_normalize_column_name(col) for col in df.columns]
+    df = df.rename(columns=COLUMN_MAPPING)
+
+    # --- Validation and Type Conversion ---
+    required_cols = ["islem_tarihi", "hesaba_gecis", "para_birimi", "islem_tutari"]
+    missing_cols = [col for col in required_cols if col not in df.columns]
+    if missing_cols:
+        error_detail = f"Could not find required columns: {', '.join(missing_cols)}. Found: {df.columns.tolist()}"
+        raise HTTPException(status_code=400, detail=error_detail)
+
+    # Validation, Net_Tutar and the duplicate check all run column-wise
+    frame = df.rename(columns={
+        'islem_tarihi': 'Islem_Tarihi',
+        'hesaba_gecis': 'Hesaba_Gecis',
+        'para_birimi': 'Para_Birimi',
+        'islem_tutari': 'Islem_Tutari',
+        'kesinti_tutari': 'Kesinti_Tutari',
+        'net_tutar': 'Net_Tutar',
+    })
+    frame['Sube_ID'] = sube_id
+    return frame
+
+def _import_pos_excel(upload_file, db: Session, sube_id: int, progress=None):
+    """
+    Streams the sheet from the spooled upload in UPLOAD_CHUNK_ROWS row frames
+    and commits each one, so memory use does not grow with the file size.
+    Rows that fail validation are counted as skipped, as the frame import does.
+    A sheet already in the import ledger is not read again.
+    """
+    def import_rows(scope):
+        counts = {"parsed": 0, "added": 0, "skipped": 0, "errored": 0}
+        written = Counter()
+        for df in uploads.iter_excel_frames(upload_file):
+            chunk_result = crud.create_pos_hareketleri_from_frame(db, _prepare_pos_frame(df, sube_id), see_dates=scope.see_dates, written=written)
+            counts["parsed"] += len(df)
+            counts["added"] += chunk_result["added"]
+            counts["skipped"] += chunk_result["skipped"]
+            if progress is not None:
+                progress(counts)
+        return counts
+
+    return import_ledger.run(db, models.POSHareketleri.__tablename__, sube_id, uploads.excel_digest(upload_file), import_rows)
+
+import_jobs.register("pos_hareketleri", _import_pos_excel)
+
+def _preview_pos_excel(upload_file, db: Session, sube_id: int):
+    """
+    Reports what _import_pos_excel would do with the sheet without writing:
+    each UPLOAD_CHUNK_ROWS frame is validated and split against the existing
+    keys as the import does, so only the totals and the samples are kept in
+    memory. POS rows have no category, so uncategorized is always 0.
+    """
+    key = import_ledger.fingerprint(models.POSHareketleri.__tablename__, sube_id, uploads.excel_digest(upload_file))
+    previous = import_ledger.lookup(db, models.POSHareketleri.__tablename__, sube_id, key)
+    if previous is not None:
+        return uploads.previously_imported_result(import_ledger.counts_of(previous))
+
+    preview = uploads.PreviewCounts()
+    for df in uploads.iter_excel_frames(upload_file):
+        frame, invalid = crud.validate_pos_hareketleri_frame(_prepare_pos_frame(df, sube_id))
+        new_rows, duplicates = crud.split_new_pos_hareketleri(db, frame)
+        preview.add(
+            parsed=len(df),
+            new=len(new_rows),
+            duplicate=len(duplicates),
+            invalid=invalid,
+            uncategorized=0,
+            sample_new=crud.pos_hareketleri_records(new_rows.head(uploads.PREVIEW_SAMPLE_ROWS)),
+            sample_duplicate=crud.pos_hareketleri_records(duplicates.head(uploads.PREVIEW_SAMPLE_ROWS)),
+        )
+    return preview.result()
+
 @router.post("/pos-hareketleri/upload/")
 async def upload_pos_hareketleri(
+    response: Response,
     sube_id: int = Form(...),
     file: UploadFile = File(...), 
+    background: bool = False,
+    dry_run: bool = False,
     db: Session = Depends(database.get_db)
 ):
     logger.info(f"Starting POS Hareketleri upload for Sube_ID: {sube_id}")
@@ -27,82 +133,25 @@ async def upload_pos_hareketleri(
     if not (file.filename.endswith('.xlsx') or file.filename.endswith('.xls')):
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload an Excel file.")
 
-    content = await file.read()
-    
+    if dry_run:
+        return await run_in_threadpool(_preview_pos_excel, file.file, db, sube_id)
+
+    if background:
+        job = await run_in_threadpool(import_jobs.enqueue, db, "pos_hareketleri", file, sube_id)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"job_id": job.Is_ID, "status": job.Durum}
+
     try:
-        excel_file = BytesIO(content)
-        df = pd.read_excel(excel_file, engine='openpyxl')
-
-        if df.empty:
-            return {"added": 0, "skipped": 0}
-
-        # --- Robust Column Name Normalization and Mapping ---
-        
-        def normalize_column_name(col_name):
-            name = str(col_name).strip().lower()
-            # Consistent character replacement for robust matching
-            replacements = {
-                'ı': 'i', 'i̇': 'i', 'ş': 's', 'ç': 'c', 'ğ': 'g', 'ü': 'u', 'ö': 'o', 
-                '_': ' ', '-': ' '
+        result = await run_in_threadpool(_import_pos_excel, file.file, db, sube_id)
+
+        if result.get("duplicate"):
+            return {
+                "message": "This POS transactions file was already imported.",
+                "added": result["added"],
+                "skipped": result["skipped"],
+                "duplicate": True
             }
-            for tr_char, en_char in replacements.items():
-                name = name.replace(tr_char, en_char)
-            # Consolidate whitespace
-            return " ".join(name.split())
-
-        df.columns = [normalize_column_name(col) for col in df.columns]
-
-        # Keys in this map are the fully normalized, ASCII-like versions
-        column_mapping = {
-            'islem tarihi': 'islem_tarihi',
-            'hesaba gecis tarihi': 'hesaba_gecis',
-            'para birimi': 'para_birimi',
-            'islem tutari': 'islem_tutari',
-            'kesinti tutari': 'kesinti_tutari',
-            'net tutar': 'net_tutar',
-            'tarih': 'islem_tarihi',
-            'tutar': 'islem_tutari',
-            'hesaba gecis': 'hesaba_gecis',
-        }
 
-        df.rename(columns=column_mapping, inplace=True)
-
-        # --- Validation and Type Conversion ---
-        required_cols = ["islem_tarihi", "hesaba_gecis", "para_birimi", "islem_tutari"]
-        missing_cols = [col for col in required_cols if col not in df.columns]
-        if missing_cols:
-            error_detail = f"Could not find required columns: {', '.join(missing_cols)}. Found: {df.columns.tolist()}"
-            raise HTTPException(status_code=400, detail=error_detail)
-
-        df['islem_tarihi'] = pd.to_datetime(df['islem_tarihi'], dayfirst=True, errors='coerce')
-        df['hesaba_gecis'] = pd.to_datetime(df['hesaba_gecis'], dayfirst=True, errors='coerce')
-        df['islem_tutari'] = pd.to_numeric(df['islem_tutari'], errors='coerce')
-        if 'kesinti_tutari' in df.columns:
-            df['kesinti_tutari'] = pd.to_numeric(df['kesinti_tutari'], errors='coerce')
-        if 'net_tutar' in df.columns:
-            df['net_tutar'] = pd.to_numeric(df['net_tutar'], errors='coerce')
-
-        pos_hareketleri_to_create = []
-        df.dropna(subset=['islem_tarihi', 'hesaba_gecis', 'para_birimi', 'islem_tutari'], inplace=True)
-        
-        for index, row in df.iterrows():
-            pos_hareket_data = pos_hareketleri.POSHareketleriCreate(
-                Islem_Tarihi=row["islem_tarihi"],
-                Hesaba_Gecis=row["hesaba_gecis"],
-                Para_Birimi=str(row["para_birimi"]),
-                Islem_Tutari=row["islem_tutari"],
-                Kesinti_Tutari=row.get("kesinti_tutari", 0.00) if not pd.isna(row.get("kesinti_tutari")) else 0.00,
-                Net_Tutar=row.get("net_tutar") if not pd.isna(row.get("net_tutar")) else None,
-                Sube_ID=sube_id,
-            )
-            pos_hareketleri_to_create.append(pos_hareket_data)
-        
-        if not pos_hareketleri_to_create:
-            logger.warning("No valid data found to insert.")
-            return {"message": "No valid data to insert.", "added": 0, "skipped": len(df)}
-
-        result = crud.create_pos_hareketleri_bulk(db=db, pos_hareketleri_list=pos_hareketleri_to_create)
-        
         return {
             "message": "POS transactions file processed successfully.",
             "added": result["added"],
@@ -137,9 +186,9 @@ def create_pos_hareketleri_bulk(
             created_pos_hareketleri.append(db_pos)
     return created_pos_hareketleri
 
-@router.get("/pos-hareketleri/", response_model=List[pos_hareketleri.POSHareketleriInDB])
-def read_pos_hareketleri(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    return crud.get_pos_hareketleri(db, skip=skip, limit=limit)
+@router.get("/pos-hareketleri/", response_model=List[pos_hareketleri.POSHareketleriInDB], dependencies=[Depends(deps.table_etag("POS_Hareketleri")), Depends(deps.deleted_since(models.POSHareketleri))])
+def read_pos_hareketleri(skip: int = 0, limit: int = 100, filters: dict = Depends(deps.list_filters), db: Session = Depends(database.get_db)):
+    return crud.get_pos_hareketleri(db, skip=skip, limit=limit, **filters)
 
 @router.get("/pos-hareketleri/{pos_id}", response_model=pos_hareketleri.POSHareketleriInDB)
 def read_pos_hareket(pos_id: int, db: Session = Depends(database.get_db)):
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
+from api.v1 import deps
 from db import crud, database, models
 from schemas import puantaj
 
@@ -11,9 +12,9 @@ router = APIRouter()
 def create_puantaj(puantaj: puantaj.PuantajCreate, db: Session = Depends(database.get_db)):
     return crud.create_puantaj(db=db, puantaj=puantaj)
 
-@router.get("/puantajlar/", response_model=List[puantaj.PuantajInDB])
-def read_puantajlar(skip: int = 0, limit: int = 10000, db: Session = Depends(database.get_db)):
-    puantajlar = crud.get_puantajlar(db, skip=skip, limit=limit)
+@router.get("/puantajlar/", response_model=List[puantaj.PuantajInDB], dependencies=[Depends(deps.table_etag("Puantaj")), Depends(deps.deleted_since(models.Puantaj))])
+def read_puantajlar(skip: int = 0, limit: int = 10000, filters: dict = Depends(deps.list_filters), db: Session = Depends(database.get_db)):
+    puantajlar = crud.get_puantajlar(db, skip=skip, limit=limit, **filters)
     return puantajlar
 
 @router.get("/puantajlar/{puantaj_id}", response_model=puantaj.PuantajInDB)
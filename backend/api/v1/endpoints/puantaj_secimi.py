@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
+from api.v1 import deps, reference_cache
 from db import crud, database, models
 from schemas import puantaj_secimi
 
@@ -11,10 +12,9 @@ router = APIRouter()
 def create_puantaj_secimi(puantaj_secimi: puantaj_secimi.PuantajSecimiCreate, db: Session = Depends(database.get_db)):
     return crud.create_puantaj_secimi(db=db, puantaj_secimi=puantaj_secimi)
 
-@router.get("/puantaj-secimi/", response_model=List[puantaj_secimi.PuantajSecimiInDB])
-def read_puantaj_secimleri(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    puantaj_secimleri = crud.get_puantaj_secimleri(db, skip=skip, limit=limit)
-    return puantaj_secimleri
+@router.get("/puantaj-secimi/", response_model=List[puantaj_secimi.PuantajSecimiInDB], dependencies=[Depends(deps.table_etag("Puantaj_Secimi"))])
+def read_puantaj_secimleri(request: Request, response: Response, skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
+    return reference_cache.cached_list_response(request, response, puantaj_secimi.PuantajSecimiInDB, lambda: crud.get_puantaj_secimleri(db, skip=skip, limit=limit))
 
 @router.get("/puantaj-secimi/{secim_id}", response_model=puantaj_secimi.PuantajSecimiInDB)
 def read_puantaj_secimi(secim_id: int, db: Session = Depends(database.get_db)):
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 import logging
+from api.v1 import deps
 from db import crud
 from db.database import get_db
 from schemas.report import NakitYatirmaRaporu
@@ -12,7 +13,7 @@ from schemas.pos_kontrol_dashboard import POSKontrolDashboardResponse
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-@router.get("/nakit-yatirma-kontrol/{sube_id}/{donem}", response_model=NakitYatirmaRaporu)
+@router.get("/nakit-yatirma-kontrol/{sube_id}/{donem}", response_model=NakitYatirmaRaporu, dependencies=[Depends(deps.table_etag("Odeme", "Kategori", "Nakit"))])
 def get_nakit_yatirma_kontrol_raporu(sube_id: int, donem: int, db: Session = Depends(get_db)):
     """
     Nakit Yatırma Kontrol Raporu için verileri getirir.
@@ -67,7 +68,7 @@ def get_nakit_yatirma_kontrol_raporu(sube_id: int, donem: int, db: Session = Dep
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.get("/odeme-rapor/", response_model=OdemeRaporResponse)
+@router.get("/odeme-rapor/", response_model=OdemeRaporResponse, dependencies=[Depends(deps.table_etag("Odeme", "Kategori"))])
 def get_odeme_rapor(
     donem: Optional[List[int]] = Query(None),
     kategori: Optional[List[int]] = Query(None),
@@ -120,7 +121,7 @@ def get_odeme_rapor(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.get("/fatura-rapor/", response_model=FaturaRaporResponse)
+@router.get("/fatura-rapor/", response_model=FaturaRaporResponse, dependencies=[Depends(deps.table_etag("e_Fatura", "Kategori"))])
 def get_fatura_rapor(
     donem: Optional[List[int]] = Query(None),
     kategori: Optional[List[int]] = Query(None),
@@ -173,7 +174,7 @@ def get_fatura_rapor(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.get("/pos-kontrol/{sube_id}/{donem}", response_model=POSKontrolDashboardResponse)
+@router.get("/pos-kontrol/{sube_id}/{donem}", response_model=POSKontrolDashboardResponse, dependencies=[Depends(deps.table_etag("Gelir", "Kategori", "Odeme", "POS_Hareketleri"))])
 def get_pos_kontrol_dashboard(
     sube_id: int,
     donem: int,
@@ -220,7 +221,7 @@ def get_pos_kontrol_dashboard(
         logger.error(f"Error in get_pos_kontrol_dashboard: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/all-expenses-by-category/{donem}", response_model=List[Dict[str, Any]])
+@router.get("/all-expenses-by-category/{donem}", response_model=List[Dict[str, Any]], dependencies=[Depends(deps.table_etag("e_Fatura", "Diger_Harcama", "Kategori"))])
 def get_all_expenses_by_category(donem: int, db: Session = Depends(get_db)):
     """
     Fetches all expenses grouped by category for a given period.
@@ -239,7 +240,7 @@ def get_all_expenses_by_category(donem: int, db: Session = Depends(get_db)):
         logger.error(f"Error in get_all_expenses_by_category: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-@router.get("/depo-kira-rapor/{year}/{sube_id}", response_model=List[Dict[str, Any]])
+@router.get("/depo-kira-rapor/{year}/{sube_id}", response_model=List[Dict[str, Any]], dependencies=[Depends(deps.table_etag("e_Fatura", "Diger_Harcama", "Kategori"))])
 def get_depo_kira_rapor(year: int, sube_id: int, db: Session = Depends(get_db)):
     """
     Depo Kira Raporu için verileri getirir.
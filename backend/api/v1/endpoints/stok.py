@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
+from api.v1 import deps
 from db import crud, database, models
 from schemas import stok, stok_fiyat, stok_sayim
 
@@ -11,7 +12,7 @@ router = APIRouter()
 def create_stok(stok: stok.StokCreate, db: Session = Depends(database.get_db)):
     return crud.create_stok(db=db, stok=stok)
 
-@router.get("/stoklar/", response_model=List[stok.StokInDB])
+@router.get("/stoklar/", response_model=List[stok.StokInDB], dependencies=[Depends(deps.table_etag("Stok"))])
 def read_stoklar(skip: int = 0, db: Session = Depends(database.get_db)):
     stoklar = crud.get_stoklar(db, skip=skip)
     return stoklar
@@ -43,9 +44,9 @@ def delete_stok(stok_id: int, db: Session = Depends(database.get_db)):
 def create_stok_fiyat(stok_fiyat: stok_fiyat.StokFiyatCreate, db: Session = Depends(database.get_db)):
     return crud.create_stok_fiyat(db=db, stok_fiyat=stok_fiyat)
 
-@router.get("/stok-fiyatlar/", response_model=List[stok_fiyat.StokFiyatInDB])
-def read_stok_fiyatlar(skip: int = 0, db: Session = Depends(database.get_db)):
-    stok_fiyatlar = crud.get_stok_fiyatlar(db, skip=skip)
+@router.get("/stok-fiyatlar/", response_model=List[stok_fiyat.StokFiyatInDB], dependencies=[Depends(deps.table_etag("Stok_Fiyat", "Stok"))])
+def read_stok_fiyatlar(skip: int = 0, limit: Optional[int] = None, filters: dict = Depends(deps.list_filters), db: Session = Depends(database.get_db)):
+    stok_fiyatlar = crud.get_stok_fiyatlar(db, skip=skip, limit=limit, **filters)
     return stok_fiyatlar
 
 @router.get("/stok-fiyatlar/{fiyat_id}", response_model=stok_fiyat.StokFiyatInDB)
@@ -73,9 +74,9 @@ def delete_stok_fiyat(fiyat_id: int, db: Session = Depends(database.get_db)):
 def create_stok_sayim(stok_sayim: stok_sayim.StokSayimCreate, db: Session = Depends(database.get_db)):
     return crud.create_stok_sayim(db=db, stok_sayim=stok_sayim)
 
-@router.get("/stok-sayimlar/", response_model=List[stok_sayim.StokSayimInDB])
-def read_stok_sayimlar(skip: int = 0, db: Session = Depends(database.get_db)):
-    stok_sayimlar = crud.get_stok_sayimlar(db, skip=skip)
+@router.get("/stok-sayimlar/", response_model=List[stok_sayim.StokSayimInDB], dependencies=[Depends(deps.table_etag("Stok_Sayim")), Depends(deps.deleted_since(models.StokSayim))])
+def read_stok_sayimlar(skip: int = 0, limit: Optional[int] = None, filters: dict = Depends(deps.list_filters), db: Session = Depends(database.get_db)):
+    stok_sayimlar = crud.get_stok_sayimlar(db, skip=skip, limit=limit, **filters)
     return stok_sayimlar
 
 @router.get("/stok-sayimlar/{sayim_id}", response_model=stok_sayim.StokSayimInDB)
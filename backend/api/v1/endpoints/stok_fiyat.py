@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
+from api.v1 import deps
 from db import crud, database, models
 from schemas import stok_fiyat
 
@@ -11,9 +12,9 @@ router = APIRouter()
 def create_stok_fiyat(stok_fiyat: stok_fiyat.StokFiyatCreate, db: Session = Depends(database.get_db)):
     return crud.create_stok_fiyat(db=db, stok_fiyat=stok_fiyat)
 
-@router.get("/stok-fiyatlar/", response_model=List[stok_fiyat.StokFiyatInDB])
-def read_stok_fiyatlar(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    stok_fiyatlar = crud.get_stok_fiyatlar(db, skip=skip, limit=limit)
+@router.get("/stok-fiyatlar/", response_model=List[stok_fiyat.StokFiyatInDB], dependencies=[Depends(deps.table_etag("Stok_Fiyat", "Stok"))])
+def read_stok_fiyatlar(skip: int = 0, limit: int = 100, filters: dict = Depends(deps.list_filters), db: Session = Depends(database.get_db)):
+    stok_fiyatlar = crud.get_stok_fiyatlar(db, skip=skip, limit=limit, **filters)
     return stok_fiyatlar
 
 @router.get("/stok-fiyatlar/{fiyat_id}", response_model=stok_fiyat.StokFiyatInDB)
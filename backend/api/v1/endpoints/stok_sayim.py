@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
+from api.v1 import deps
 from db import crud, database, models
 from schemas import stok_sayim
 
@@ -11,9 +12,9 @@ router = APIRouter()
 def create_stok_sayim(stok_sayim: stok_sayim.StokSayimCreate, db: Session = Depends(database.get_db)):
     return crud.create_stok_sayim(db=db, stok_sayim=stok_sayim)
 
-@router.get("/stok-sayimlar/", response_model=List[stok_sayim.StokSayimInDB])
-def read_stok_sayimlar(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    stok_sayimlar = crud.get_stok_sayimlar(db, skip=skip, limit=limit)
+@router.get("/stok-sayimlar/", response_model=List[stok_sayim.StokSayimInDB], dependencies=[Depends(deps.table_etag("Stok_Sayim")), Depends(deps.deleted_since(models.StokSayim))])
+def read_stok_sayimlar(skip: int = 0, limit: int = 100, filters: dict = Depends(deps.list_filters), db: Session = Depends(database.get_db)):
+    stok_sayimlar = crud.get_stok_sayimlar(db, skip=skip, limit=limit, **filters)
     return stok_sayimlar
 
 @router.get("/stok-sayimlar/{sayim_id}", response_model=stok_sayim.StokSayimInDB)
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
+from api.v1 import deps, reference_cache
 from db import crud, database, models
 from schemas import sube
 
@@ -14,10 +15,9 @@ def create_new_sube(sube: sube.SubeCreate, db: Session = Depends(database.get_db
         raise HTTPException(status_code=400, detail="Sube with this name already exists")
     return crud.create_sube(db=db, sube=sube)
 
-@router.get("/subeler/", response_model=List[sube.SubeInDB])
-def read_subeler(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    subeler = crud.get_subeler(db, skip=skip, limit=limit)
-    return subeler
+@router.get("/subeler/", response_model=List[sube.SubeInDB], dependencies=[Depends(deps.table_etag("Sube"))])
+def read_subeler(request: Request, response: Response, skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
+    return reference_cache.cached_list_response(request, response, sube.SubeInDB, lambda: crud.get_subeler(db, skip=skip, limit=limit))
 
 @router.get("/subeler/{sube_id}", response_model=sube.SubeInDB)
 def read_sube(sube_id: int, db: Session = Depends(database.get_db)):
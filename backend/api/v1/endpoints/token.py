@@ -1,27 +1,58 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
+from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 from datetime import timedelta
 
 from db import crud
 from core import security
-from schemas.token import Token
+from schemas.token import RefreshRequest, Token
 from db.database import get_db
 from core.config import settings
 
 router = APIRouter()
 
+def _issue_tokens(user) -> dict:
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = security.create_access_token(
+        data={"sub": user.Kullanici_Adi}, expires_delta=access_token_expires
+    )
+    refresh_token = security.create_refresh_token(data={"sub": user.Kullanici_Adi})
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
 @router.post("/token", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = crud.authenticate_user(db, username=form_data.username, password=form_data.password)
-    if not user:
+    # The user lookup and the bcrypt check both block, so neither runs on the event loop
+    user = await run_in_threadpool(crud.get_user_by_username, db, form_data.username)
+    if not user or not await security.verify_password_async(form_data.password, user.Password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        data={"sub": user.Kullanici_Adi}, expires_delta=access_token_expires
+    return _issue_tokens(user)
+
+@router.post("/token/refresh", response_model=Token)
+def refresh_access_token(request: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Exchanges a refresh token for a new access token (and a new refresh
+    token) without checking the password again. Inactive users are refused.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    try:
+        payload = jwt.decode(request.refresh_token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    username = payload.get("sub")
+    if payload.get("type") != security.REFRESH_TOKEN_TYPE or username is None:
+        raise credentials_exception
+
+    user = crud.get_user_by_username(db, username=username)
+    if user is None or not user.Aktif_Pasif:
+        raise credentials_exception
+    return _issue_tokens(user)
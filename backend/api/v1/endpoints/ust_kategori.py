@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
+from api.v1 import deps, reference_cache
 from db import crud, database, models
 from schemas import ust_kategori
 
@@ -11,10 +12,9 @@ router = APIRouter()
 def create_ust_kategori(ust_kategori: ust_kategori.UstKategoriCreate, db: Session = Depends(database.get_db)):
     return crud.create_ust_kategori(db=db, ust_kategori=ust_kategori)
 
-@router.get("/ust-kategoriler/", response_model=List[ust_kategori.UstKategoriInDB])
-def read_ust_kategoriler(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    ust_kategoriler = crud.get_ust_kategoriler(db, skip=skip, limit=limit)
-    return ust_kategoriler
+@router.get("/ust-kategoriler/", response_model=List[ust_kategori.UstKategoriInDB], dependencies=[Depends(deps.table_etag("UstKategori"))])
+def read_ust_kategoriler(request: Request, response: Response, skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
+    return reference_cache.cached_list_response(request, response, ust_kategori.UstKategoriInDB, lambda: crud.get_ust_kategoriler(db, skip=skip, limit=limit))
 
 @router.get("/ust-kategoriler/{ust_kategori_id}", response_model=ust_kategori.UstKategoriInDB)
 def read_ust_kategori(ust_kategori_id: int, db: Session = Depends(database.get_db)):
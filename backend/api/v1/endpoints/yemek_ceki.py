@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Response
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
-import mimetypes
 
+from api.v1 import deps, images
 from db import crud, database, models
 from schemas import yemek_ceki
 
@@ -38,9 +38,9 @@ async def create_yemek_ceki(
     
     return await crud.create_yemek_ceki(db=db, yemek_ceki_data=yemek_ceki_data)
 
-@router.get("/yemek-cekiler/", response_model=List[yemek_ceki.YemekCekiList])
-def read_yemek_cekiler(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    yemek_cekiler = crud.get_yemek_cekiler(db, skip=skip, limit=limit)
+@router.get("/yemek-cekiler/", response_model=List[yemek_ceki.YemekCekiList], dependencies=[Depends(deps.table_etag("Yemek_Ceki")), Depends(deps.deleted_since(models.YemekCeki))])
+def read_yemek_cekiler(skip: int = 0, limit: int = 100, filters: dict = Depends(deps.list_filters), db: Session = Depends(database.get_db)):
+    yemek_cekiler = crud.get_yemek_cekiler(db, skip=skip, limit=limit, **filters)
     return yemek_cekiler
 
 @router.get("/yemek-cekiler/{yemek_ceki_id}", response_model=yemek_ceki.YemekCekiInDB)
@@ -51,18 +51,8 @@ def read_yemek_ceki(yemek_ceki_id: int, db: Session = Depends(database.get_db)):
     return db_yemek_ceki
 
 @router.get("/yemek-cekiler/{yemek_ceki_id}/image")
-def get_yemek_ceki_image(yemek_ceki_id: int, db: Session = Depends(database.get_db)):
-    # We query the raw model to get the bytes
-    db_yemek_ceki_raw = db.query(models.YemekCeki).filter(models.YemekCeki.ID == yemek_ceki_id).first()
-    
-    if db_yemek_ceki_raw is None or db_yemek_ceki_raw.Imaj is None:
-        raise HTTPException(status_code=404, detail="Image not found")
-
-    media_type, _ = mimetypes.guess_type(db_yemek_ceki_raw.Imaj_Adi)
-    if media_type is None:
-        media_type = "application/octet-stream"
-
-    return Response(content=db_yemek_ceki_raw.Imaj, media_type=media_type)
+def get_yemek_ceki_image(yemek_ceki_id: int, request: Request, thumbnail: bool = False, db: Session = Depends(database.get_db)):
+    return images.image_response(request, db, models.YemekCeki, models.YemekCeki.ID, yemek_ceki_id, thumbnail=thumbnail)
 
 
 @router.put("/yemek-cekiler/{yemek_ceki_id}", response_model=yemek_ceki.YemekCekiInDB)
@@ -0,0 +1,93 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Optional, Sequence
+import json
+
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import null
+
+try:
+    import orjson
+except ImportError:  # Falls back to the standard library encoder
+    orjson = None
+
+CHUNK_ROWS = 5000
+
+
+def schema_columns(schema, model, fields: Optional[List[str]] = None, expressions: Optional[dict] = None) -> list:
+    """
+    Columns of `model` in the field order of the response schema, limited to
+    `fields` when given (sparse fieldsets). `expressions` supplies computed
+    fields; fields the model does not have are selected as NULL, matching
+    the schema default.
+    """
+    if fields is not None:
+        unknown = [name for name in fields if name not in schema.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    expressions = expressions or {}
+    columns = []
+    for name in schema.model_fields:
+        if fields is not None and name not in fields:
+            continue
+        column = expressions.get(name, getattr(model, name, None))
+        columns.append(column.label(name) if column is not None else null().label(name))
+    return columns
+
+
+def _decimal_encoder(schema):
+    # Mirror what the Pydantic schema emits: Decimal fields are strings unless
+    # the schema sets json_encoders={Decimal: float}; float fields are floats.
+    if Decimal in schema.model_config.get("json_encoders", {}):
+        return float
+    if any(field.annotation in (Decimal, Optional[Decimal]) for field in schema.model_fields.values()):
+        return str
+    return float
+
+
+def _stdlib_default(decimal_encoder):
+    def default(value):
+        if isinstance(value, Decimal):
+            return decimal_encoder(value)
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return default
+
+
+def dump_rows(keys: Sequence[str], rows: List[tuple], decimal_encoder=str) -> Iterator[bytes]:
+    """Encodes result tuples as a JSON array of objects, CHUNK_ROWS rows per chunk."""
+    if orjson is not None:
+        def dumps(objs):
+            return orjson.dumps(objs, default=decimal_encoder)
+    else:
+        default = _stdlib_default(decimal_encoder)
+
+        def dumps(objs):
+            return json.dumps(objs, default=default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    yield b"["
+    for start in range(0, len(rows), CHUNK_ROWS):
+        chunk = dumps([dict(zip(keys, row)) for row in rows[start:start + CHUNK_ROWS]])
+        yield (b"," if start else b"") + chunk[1:-1]
+    yield b"]"
+
+
+def rows_response(schema, rows: Iterable[tuple], response: Response = None) -> StreamingResponse:
+    """
+    Serializes rows selected with schema_columns() straight to JSON, skipping
+    the per-row Pydantic validation of response_model. Headers already set
+    on the endpoint's Response parameter (e.g. the ETag) are carried over.
+    """
+    rows = rows if isinstance(rows, list) else list(rows)
+    keys = list(rows[0]._fields) if rows else []
+    streaming = StreamingResponse(
+        dump_rows(keys, rows, _decimal_encoder(schema)),
+        media_type="application/json"
+    )
+    if response is not None:
+        for name, value in response.headers.items():
+            if name != "content-length":
+                streaming.headers[name] = value
+    return streaming
@@ -0,0 +1,62 @@
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+import hashlib
+import mimetypes
+
+from core import compression
+from core.blob_store import get_blob_store
+from db import crud
+
+
+def image_response(request: Request, db: Session, model, key_column, key, name_column=None, thumbnail: bool = False) -> Response:
+    """
+    Returns the raw image of one row with Content-Length and cache headers.
+    Images in the blob store are streamed from it and their ETag is the
+    content hash; rows not yet migrated are read from the Imaj column and
+    keyed by last-write time and size. Either way a revalidation is answered
+    with 304 without reading the blob. With thumbnail=True the pre-generated
+    thumbnail is returned when there is one.
+    """
+    if name_column is None:
+        name_column = model.Imaj_Adi
+    row = db.query(
+        name_column,
+        crud.get_change_column(model),
+        model.Imaj_Hash,
+        func.coalesce(model.Imaj_Boyutu, func.length(model.Imaj))
+    ).filter(key_column == key).first()
+    if row is None or row[3] is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    imaj_adi, changed_at, imaj_hash, size = row
+    store = get_blob_store()
+    media_type, _ = mimetypes.guess_type(imaj_adi or "")
+    if imaj_hash:
+        thumbnail = thumbnail and store.has_thumbnail(imaj_hash)
+        if thumbnail:
+            size = store.size(imaj_hash, thumbnail=True)
+            media_type = "image/jpeg"
+        tag = f"{imaj_hash}-thumb" if thumbnail else imaj_hash
+    else:
+        tag = hashlib.sha1(f"{model.__tablename__}|{key}|{changed_at}|{size}".encode("utf-8")).hexdigest()
+    if media_type is None:
+        media_type = "application/octet-stream"
+    # Images are never recompressed; PDF receipts and other uploads may be, so
+    # their ETag names the encoding
+    if media_type.startswith("image/"):
+        etag = f'"{tag}"'
+    else:
+        etag = compression.variant_etag(tag, request.headers.get("accept-encoding", ""))
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    if imaj_hash:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(store.iter_chunks(imaj_hash, thumbnail=thumbnail), media_type=media_type, headers=headers)
+
+    image = db.query(model.Imaj).filter(key_column == key).scalar()
+    return Response(content=image, media_type=media_type, headers=headers)
@@ -0,0 +1,169 @@
+import logging
+import os
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Callable, Optional
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db import database, models
+
+logger = logging.getLogger(__name__)
+
+# Job kind -> (importer, on_complete). An importer is called as
+# importer(file, db, sube_id, progress) and returns its final counts; progress
+# takes the same {"parsed", "added", "skipped", "errored"} dict after every chunk.
+IMPORTERS: dict = {}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = Lock()
+
+
+def register(kind: str, importer: Callable, on_complete: Optional[Callable] = None):
+    """Makes an upload importer available to the job queue; on_complete(db, job, counts) runs after a successful import."""
+    IMPORTERS[kind] = (importer, on_complete)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.IMPORT_JOB_WORKERS, thread_name_prefix="import-job")
+        return _executor
+
+
+def enqueue(db: Session, kind: str, upload: UploadFile, sube_id: Optional[int] = None) -> models.AktarimIsi:
+    """
+    Copies the upload out of the request, records a queued Aktarim_Isi row and
+    hands it to the worker pool. Returns the job without waiting for it.
+    """
+    os.makedirs(settings.IMPORT_JOB_PATH, exist_ok=True)
+    path = os.path.join(settings.IMPORT_JOB_PATH, f"{uuid.uuid4().hex}{os.path.splitext(upload.filename or '')[1]}")
+    upload.file.seek(0)
+    with open(path, "wb") as target:
+        shutil.copyfileobj(upload.file, target)
+
+    job = models.AktarimIsi(Tur=kind, Durum="queued", Dosya_Adi=upload.filename or "", Dosya_Yolu=path, Sube_ID=sube_id)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    _get_executor().submit(run_job, job.Is_ID, db.get_bind())
+    return job
+
+
+def _set(db: Session, is_id: int, **values):
+    db.execute(update(models.AktarimIsi).where(models.AktarimIsi.Is_ID == is_id).values(**values))
+    db.commit()
+
+
+def _counts_to_columns(counts: dict) -> dict:
+    return {
+        "Okunan": counts.get("parsed", 0),
+        "Eklenen": counts.get("added", 0),
+        "Atlanan": counts.get("skipped", 0),
+        "Hatali": counts.get("errored", 0),
+    }
+
+
+def run_job(is_id: int, bind=None):
+    """Claims a queued job and runs its importer; any worker process may pick a job up, but only one claims it."""
+    db = database.SessionLocal(bind=bind or database.engine)
+    try:
+        claimed = db.execute(
+            update(models.AktarimIsi)
+            .where(models.AktarimIsi.Is_ID == is_id, models.AktarimIsi.Durum == "queued")
+            .values(Durum="running", Baslama_Tarihi=func.now())
+        ).rowcount
+        db.commit()
+        if not claimed:
+            return
+        job = db.get(models.AktarimIsi, is_id)
+        importer, on_complete = IMPORTERS[job.Tur]
+        path = job.Dosya_Yolu
+
+        try:
+            with open(path, "rb") as upload_file:
+                counts = importer(upload_file, db, job.Sube_ID, lambda progress: _set(db, is_id, **_counts_to_columns(progress)))
+        except Exception as e:
+            db.rollback()
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            logger.error(f"Import job {is_id} ({job.Tur}) failed: {detail}", exc_info=not isinstance(e, HTTPException))
+            _set(db, is_id, Durum="failed", Hata=str(detail), Bitis_Tarihi=func.now())
+            return
+        finally:
+            _remove_file(path)
+
+        _set(db, is_id, Durum="completed", Bitis_Tarihi=func.now(), **_counts_to_columns(counts))
+        if on_complete is not None:
+            try:
+                on_complete(db, job, counts)
+            except Exception as e:
+                logger.error(f"Completion hook of import job {is_id} failed: {e}")
+    finally:
+        db.close()
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def fail_stale_jobs(db: Session) -> int:
+    """
+    Marks jobs still "running" IMPORT_JOB_STALE_MINUTES after they started as
+    failed and deletes their spooled files; their worker died with a crash or
+    restart. They are not requeued because the chunks they committed are
+    already in the tables. Returns how many jobs were failed.
+    """
+    cutoff = datetime.now() - timedelta(minutes=settings.IMPORT_JOB_STALE_MINUTES)
+    stale = db.query(models.AktarimIsi.Is_ID, models.AktarimIsi.Dosya_Yolu).filter(
+        models.AktarimIsi.Durum == "running",
+        models.AktarimIsi.Baslama_Tarihi < cutoff
+    ).all()
+    for is_id, path in stale:
+        failed = db.execute(
+            update(models.AktarimIsi)
+            .where(models.AktarimIsi.Is_ID == is_id, models.AktarimIsi.Durum == "running")
+            .values(Durum="failed", Hata="The import was interrupted by a restart; upload the file again.", Bitis_Tarihi=func.now())
+        ).rowcount
+        db.commit()
+        if failed:
+            logger.warning(f"Import job {is_id} was still running after {settings.IMPORT_JOB_STALE_MINUTES} minutes, marked failed.")
+            _remove_file(path)
+    return len(stale)
+
+
+def remove_orphan_files(db: Session):
+    """Deletes spooled uploads older than IMPORT_JOB_STALE_MINUTES that no queued or running job refers to."""
+    if not os.path.isdir(settings.IMPORT_JOB_PATH):
+        return
+    in_use = {path for path, in db.query(models.AktarimIsi.Dosya_Yolu).filter(models.AktarimIsi.Durum.in_(["queued", "running"]))}
+    cutoff = (datetime.now() - timedelta(minutes=settings.IMPORT_JOB_STALE_MINUTES)).timestamp()
+    for name in os.listdir(settings.IMPORT_JOB_PATH):
+        path = os.path.join(settings.IMPORT_JOB_PATH, name)
+        if path not in in_use and os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+            _remove_file(path)
+
+
+def resume_queued_jobs(bind=None):
+    """
+    Runs at startup: fails the jobs a stopped process left running, removes
+    spooled files nothing refers to and submits the jobs still queued.
+    """
+    db = database.SessionLocal(bind=bind or database.engine)
+    try:
+        fail_stale_jobs(db)
+        remove_orphan_files(db)
+        queued = [is_id for is_id, in db.query(models.AktarimIsi.Is_ID).filter(models.AktarimIsi.Durum == "queued")]
+    finally:
+        db.close()
+    for is_id in queued:
+        _get_executor().submit(run_job, is_id, bind)
@@ -0,0 +1,54 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, List
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from core import compression
+
+MAX_ENTRIES = 256
+
+# ETag -> encoded body. The ETag from deps.table_etag changes with every
+# write to the table, so a write invalidates the entry without any messaging
+# between workers; stale entries simply age out. It also names the encoding,
+# so each compressed variant is its own entry.
+_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_lock = Lock()
+
+
+def _encode(schema, rows, encoding) -> bytes:
+    adapter = TypeAdapter(List[schema])
+    body = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+    return compression.compress(body, encoding) if encoding is not None else body
+
+
+def cached_list_response(request: Request, response: Response, schema, load: Callable[[], list]) -> Response:
+    """
+    Serves a small reference list from memory, already compressed in the
+    negotiated encoding. Must be used on routes guarded by deps.table_etag.
+    """
+    encoding = compression.negotiate_encoding(request.headers.get("accept-encoding", ""))
+    etag = response.headers.get("etag")
+    with _lock:
+        body = _cache.get(etag) if etag else None
+        if body is not None:
+            _cache.move_to_end(etag)
+    if body is None:
+        body = _encode(schema, load(), encoding)
+        if etag:
+            with _lock:
+                _cache[etag] = body
+                while len(_cache) > MAX_ENTRIES:
+                    _cache.popitem(last=False)
+
+    headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+    headers["Vary"] = "Accept-Encoding"
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def clear():
+    with _lock:
+        _cache.clear()
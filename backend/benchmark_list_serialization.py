@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the large list endpoints: rows/sec of the response_model path
+(ORM objects validated and serialized by Pydantic) against the fast path in
+api/v1/fast_json.py (Core result tuples encoded directly to JSON).
+
+Runs against an in-memory SQLite copy of the e_Fatura table:
+
+    python benchmark_list_serialization.py --rows 200000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from db.database import Base
+from db import crud, models
+from api.v1 import fast_json
+from schemas import e_fatura
+
+def seed(db, rows: int):
+    db.add(models.Sube(Sube_ID=1, Sube_Adi="Merkez"))
+    db.commit()
+    start = date(2024, 1, 1)
+    batch = []
+    for i in range(1, rows + 1):
+        batch.append({
+            "Fatura_ID": i,
+            "Fatura_Tarihi": start + timedelta(days=i % 365),
+            "Fatura_Numarasi": f"GIB2025{i:09d}",
+            "Alici_Unvani": f"Tedarikçi {i % 500}",
+            "Alici_VKN_TCKN": f"{i:010d}",
+            "Tutar": Decimal(i % 100000) / 100,
+            "Aciklama": "Fatura açıklaması" if i % 3 else None,
+            "Donem": 2500 + (i % 12) + 1,
+            "Sube_ID": 1,
+            "Kayit_Tarihi": datetime(2025, 1, 1, 12, 0, 0),
+        })
+        if len(batch) == 10000:
+            db.execute(insert(models.EFatura), batch)
+            batch = []
+    if batch:
+        db.execute(insert(models.EFatura), batch)
+    db.commit()
+
+def response_model_path(db) -> bytes:
+    # What FastAPI does for response_model=List[EFaturaInDB]
+    adapter = TypeAdapter(List[e_fatura.EFaturaInDB])
+    return adapter.dump_json(adapter.validate_python(crud.get_efaturalar(db), from_attributes=True))
+
+def fast_path(db) -> bytes:
+    columns = fast_json.schema_columns(e_fatura.EFaturaInDB, models.EFatura)
+    rows = crud.get_efaturalar(db, columns=columns)
+    # EFaturaInDB encodes Decimal as float (json_encoders)
+    return b"".join(fast_json.dump_rows(list(e_fatura.EFaturaInDB.model_fields), rows, float))
+
+def measure(name, func, SessionLocal, rows: int, repeat: int):
+    best = None
+    for _ in range(repeat):
+        db = SessionLocal()
+        started = time.perf_counter()
+        body = func(db)
+        elapsed = time.perf_counter() - started
+        db.close()
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{name:<16} {best:8.2f} s  {rows / best:12,.0f} rows/s  {len(body) / 1024 / 1024:8.1f} MiB")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = SessionLocal()
+    seed(db, args.rows)
+    db.close()
+
+    print(f"e_Fatura, {args.rows:,} rows, orjson {'on' if fast_json.orjson else 'off'}")
+    before = measure("response_model", response_model_path, SessionLocal, args.rows, args.repeat)
+    after = measure("fast_json", fast_path, SessionLocal, args.rows, args.repeat)
+    print(f"speedup          {before / after:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from collections import deque
+from typing import Iterable, List, Optional
+
+
+class Automaton:
+    """
+    Aho–Corasick automaton over a list of patterns. first_match scans a text
+    once and returns the position (in the pattern list) of the earliest
+    listed pattern that occurs in it as a substring, or None.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = list(patterns)
+        self._goto: List[dict] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[Optional[int]] = [None]
+
+        for position, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                node = next_node
+            if self._best[node] is None:
+                self._best[node] = position
+
+        # Breadth-first pass: link each node to its longest proper suffix in the
+        # trie and fold the best pattern reachable through that link into it
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._best[child] = _earliest(self._best[child], self._best[self._fail[child]])
+
+    def first_match(self, text: Optional[str]) -> Optional[int]:
+        if not text:
+            return None
+        goto, fail, best = self._goto, self._fail, self._best
+        node = 0
+        found = None
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            found = _earliest(found, best[node])
+            if found == 0:
+                break
+        return found
+
+
+def _earliest(a: Optional[int], b: Optional[int]) -> Optional[int]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
@@ -0,0 +1,167 @@
+import hashlib
+import importlib
+import io
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Iterator, Optional
+
+from core.config import settings
+
+try:
+    from PIL import Image
+except ImportError:  # Thumbnails are skipped when Pillow is not installed
+    Image = None
+
+THUMBNAIL_SIZE = (320, 320)
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobStore(ABC):
+    """
+    Content-addressed storage for uploaded images. Blobs are keyed by the
+    SHA-256 of their bytes, so storing the same file twice keeps one copy.
+    """
+
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        """Stores data and returns its key; storing an existing blob again marks it as just written."""
+
+    @abstractmethod
+    def get(self, key: str, thumbnail: bool = False) -> Optional[bytes]:
+        """The blob's bytes, or None when it is not stored."""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Removes the blob and its thumbnail; a missing blob is not an error."""
+
+    @abstractmethod
+    def keys(self, written_before: datetime) -> Iterator[str]:
+        """Keys of the blobs last written before written_before."""
+
+    def iter_chunks(self, key: str, thumbnail: bool = False) -> Iterator[bytes]:
+        data = self.get(key, thumbnail=thumbnail)
+        if data is not None:
+            yield data
+
+    def size(self, key: str, thumbnail: bool = False) -> Optional[int]:
+        data = self.get(key, thumbnail=thumbnail)
+        return len(data) if data is not None else None
+
+    def has_thumbnail(self, key: str) -> bool:
+        return self.size(key, thumbnail=True) is not None
+
+
+def make_thumbnail(data: bytes) -> Optional[bytes]:
+    """Returns a JPEG thumbnail, or None for non-image uploads (e.g. PDF receipts)."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.thumbnail(THUMBNAIL_SIZE)
+            output = io.BytesIO()
+            image.convert("RGB").save(output, format="JPEG", quality=80)
+            return output.getvalue()
+    except Exception:
+        return None
+
+
+class LocalBlobStore(BlobStore):
+    """Stores blobs as <root>/<ab>/<cd>/<sha256>, with a <sha256>.thumb.jpg next to image blobs."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str, thumbnail: bool = False) -> str:
+        if len(key) != 64 or any(c not in "0123456789abcdef" for c in key):
+            raise ValueError(f"Invalid blob key: {key}")
+        filename = f"{key}.thumb.jpg" if thumbnail else key
+        return os.path.join(self.root, key[:2], key[2:4], filename)
+
+    def _write(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def put(self, data: bytes) -> str:
+        key = hashlib.sha256(data).hexdigest()
+        path = self._path(key)
+        if os.path.exists(path):
+            # Refreshed so the orphan sweep's grace period covers the new reference too
+            os.utime(path)
+        else:
+            self._write(path, data)
+            thumbnail = make_thumbnail(data)
+            if thumbnail is not None:
+                self._write(self._path(key, thumbnail=True), thumbnail)
+        return key
+
+    def get(self, key: str, thumbnail: bool = False) -> Optional[bytes]:
+        path = self._path(key, thumbnail)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def iter_chunks(self, key: str, thumbnail: bool = False) -> Iterator[bytes]:
+        with open(self._path(key, thumbnail), "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    def size(self, key: str, thumbnail: bool = False) -> Optional[int]:
+        path = self._path(key, thumbnail)
+        return os.path.getsize(path) if os.path.exists(path) else None
+
+    def delete(self, key: str):
+        for path in (self._path(key), self._path(key, thumbnail=True)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def keys(self, written_before: datetime) -> Iterator[str]:
+        cutoff = written_before.timestamp()
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                # Thumbnails and the temporary files of unfinished writes are skipped
+                if len(filename) == 64 and all(c in "0123456789abcdef" for c in filename) \
+                        and os.path.getmtime(os.path.join(directory, filename)) < cutoff:
+                    yield filename
+
+
+BLOB_STORE_BACKENDS = {
+    "local": lambda: LocalBlobStore(settings.BLOB_STORE_PATH),
+}
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """
+    Returns the configured store. BLOB_STORE_BACKEND is either a registered
+    name ("local") or a "module:ClassName" path to a BlobStore subclass.
+    """
+    global _blob_store
+    if _blob_store is None:
+        backend = settings.BLOB_STORE_BACKEND
+        if backend in BLOB_STORE_BACKENDS:
+            _blob_store = BLOB_STORE_BACKENDS[backend]()
+        else:
+            module_name, class_name = backend.split(":")
+            _blob_store = getattr(importlib.import_module(module_name), class_name)()
+    return _blob_store
+
+
+def set_blob_store(store: Optional[BlobStore]):
+    global _blob_store
+    _blob_store = store
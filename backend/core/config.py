@@ -9,6 +9,40 @@ class Settings:
 
     SECRET_KEY: str = os.getenv("SECRET_KEY", "super-secret-key")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+    PASSWORD_HASH_CONCURRENCY: int = int(os.getenv("PASSWORD_HASH_CONCURRENCY", "4"))
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+
+    BLOB_STORE_BACKEND: str = os.getenv("BLOB_STORE_BACKEND", "local")
+    BLOB_STORE_PATH: str = os.getenv(
+        "BLOB_STORE_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "blob_store")
+    )
+    # Blobs no row refers to are deleted at startup once they are this old
+    BLOB_ORPHAN_MINUTES: int = int(os.getenv("BLOB_ORPHAN_MINUTES", "60"))
+
+    # Rows parsed, validated and committed together by the file upload endpoints
+    UPLOAD_CHUNK_ROWS: int = int(os.getenv("UPLOAD_CHUNK_ROWS", "5000"))
+
+    # Background file imports: worker threads per process and where queued uploads wait
+    IMPORT_JOB_WORKERS: int = int(os.getenv("IMPORT_JOB_WORKERS", "2"))
+    IMPORT_JOB_PATH: str = os.getenv(
+        "IMPORT_JOB_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "import_jobs")
+    )
+    # A job still "running" this long after it started is taken to have died with its process
+    IMPORT_JOB_STALE_MINUTES: int = int(os.getenv("IMPORT_JOB_STALE_MINUTES", "120"))
+
+    # Sync watermarks are set back this far, so rows written by transactions that
+    # were still open when the watermark was taken are sent again, not missed
+    SYNC_WATERMARK_MARGIN_SECONDS: int = int(os.getenv("SYNC_WATERMARK_MARGIN_SECONDS", "300"))
+
+    # Email outbox: sends are retried with exponential backoff from EMAIL_RETRY_BASE_SECONDS
+    EMAIL_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+    EMAIL_RETRY_BASE_SECONDS: int = int(os.getenv("EMAIL_RETRY_BASE_SECONDS", "30"))
+    # An email still "sending" this long after it was claimed is requeued at startup
+    EMAIL_SENDING_STALE_MINUTES: int = int(os.getenv("EMAIL_SENDING_STALE_MINUTES", "10"))
+
+    # Responses smaller than this many bytes are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
 
     DATABASE_URL: str = (
         f"mysql+mysqlconnector://{os.getenv('DB_USER')}:"
@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta
 from typing import Any
 
+import anyio
+import anyio.lowlevel
 from jose import jwt
 from passlib.context import CryptContext
 
@@ -9,6 +11,19 @@ from core.config import settings
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 ALGORITHM = "HS256"
+REFRESH_TOKEN_TYPE = "refresh"
+
+# bcrypt is CPU-bound; a few threads are enough and keep logins from
+# exhausting the shared worker-thread pool. One limiter per event loop.
+_password_limiter: anyio.lowlevel.RunVar = anyio.lowlevel.RunVar("_password_limiter")
+
+def _get_password_limiter() -> anyio.CapacityLimiter:
+    try:
+        return _password_limiter.get()
+    except LookupError:
+        limiter = anyio.CapacityLimiter(settings.PASSWORD_HASH_CONCURRENCY)
+        _password_limiter.set(limiter)
+        return limiter
 
 def create_access_token(
     data: dict,
@@ -23,8 +38,18 @@ def create_access_token(
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def create_refresh_token(data: dict) -> str:
+    to_encode = data.copy()
+    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode.update({"exp": expire, "type": REFRESH_TOKEN_TYPE})
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password run in the bounded password thread pool instead of on the event loop."""
+    return await anyio.to_thread.run_sync(verify_password, plain_password, hashed_password, limiter=_get_password_limiter())
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
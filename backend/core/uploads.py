@@ -0,0 +1,153 @@
+import codecs
+import csv
+import hashlib
+import io
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from core.config import settings
+
+
+# Rows of each kind a dry-run preview returns
+PREVIEW_SAMPLE_ROWS = 20
+
+
+def batches(items: Iterable, size: Optional[int] = None) -> Iterator[List]:
+    """Groups a lazy iterable into lists of at most `size` items (UPLOAD_CHUNK_ROWS by default)."""
+    size = size or settings.UPLOAD_CHUNK_ROWS
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_csv_rows(upload_file, delimiter: str = ",") -> Iterator[dict]:
+    """
+    Reads a CSV upload row by row from its spooled file instead of reading
+    and decoding it whole. A UTF-8 BOM is skipped; invalid UTF-8 raises
+    UnicodeDecodeError while iterating.
+    """
+    upload_file.seek(0)
+    text = io.TextIOWrapper(upload_file, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.DictReader(text, delimiter=delimiter)
+    finally:
+        # Leave the spooled file open for the framework to close
+        text.detach()
+
+
+def iter_excel_frames(upload_file, chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yields the first sheet of an .xlsx upload as DataFrames of at most
+    chunk_rows rows. openpyxl's read-only mode streams the sheet, so only one
+    chunk is in memory at a time. The first row is the header.
+    """
+    upload_file.seek(0)
+    workbook = load_workbook(upload_file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name) if name is not None else f"Unnamed: {position}" for position, name in enumerate(header)]
+        width = len(columns)
+        for batch in batches(rows, chunk_rows):
+            yield pd.DataFrame([row[:width] + (None,) * (width - len(row)) for row in batch], columns=columns)
+    finally:
+        workbook.close()
+
+
+def csv_digest(upload_file) -> str:
+    """
+    SHA-256 of a CSV upload's lines with the BOM, line endings, trailing
+    whitespace and blank lines normalized away, so a re-saved copy of the
+    same statement hashes the same.
+    """
+    upload_file.seek(0)
+    digest = hashlib.sha256()
+    for position, line in enumerate(upload_file):
+        if position == 0 and line.startswith(codecs.BOM_UTF8):
+            line = line[len(codecs.BOM_UTF8):]
+        line = line.rstrip()
+        if line:
+            digest.update(line)
+            digest.update(b"\n")
+    upload_file.seek(0)
+    return digest.hexdigest()
+
+
+def excel_digest(upload_file) -> str:
+    """
+    SHA-256 of the cell values of an .xlsx upload's first sheet. Hashing the
+    values rather than the bytes ignores the zip metadata a re-export changes.
+    """
+    upload_file.seek(0)
+    digest = hashlib.sha256()
+    workbook = load_workbook(upload_file, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            row = list(row)
+            while row and row[-1] is None:
+                row.pop()
+            if row:
+                digest.update(repr(row).encode("utf-8"))
+                digest.update(b"\n")
+    finally:
+        workbook.close()
+    upload_file.seek(0)
+    return digest.hexdigest()
+
+
+class PreviewCounts:
+    """
+    Running totals of an upload's dry_run mode, which reads the file chunk by
+    chunk like the import does: how many rows an import would add, skip as
+    duplicates and reject, plus the first PREVIEW_SAMPLE_ROWS new and
+    duplicate rows.
+    """
+
+    def __init__(self):
+        self.parsed = self.new = self.duplicate = self.invalid = self.uncategorized = 0
+        self.sample_new = []
+        self.sample_duplicate = []
+
+    def add(self, parsed: int, new: int, duplicate: int, invalid: int, uncategorized: int,
+            sample_new: list, sample_duplicate: list):
+        self.parsed += parsed
+        self.new += new
+        self.duplicate += duplicate
+        self.invalid += invalid
+        self.uncategorized += uncategorized
+        self.sample_new.extend(sample_new[:PREVIEW_SAMPLE_ROWS - len(self.sample_new)])
+        self.sample_duplicate.extend(sample_duplicate[:PREVIEW_SAMPLE_ROWS - len(self.sample_duplicate)])
+
+    def result(self) -> dict:
+        return {
+            "dry_run": True,
+            "duplicate_file": False,
+            "parsed": self.parsed,
+            "new": self.new,
+            "duplicate": self.duplicate,
+            "invalid": self.invalid,
+            "uncategorized": self.uncategorized,
+            "sample": {"new": self.sample_new, "duplicate": self.sample_duplicate},
+        }
+
+
+def previously_imported_result(counts: dict) -> dict:
+    """The dry_run response for a file the import ledger already has: every valid row would be a duplicate."""
+    return {
+        "dry_run": True,
+        "duplicate_file": True,
+        "parsed": counts["parsed"],
+        "new": 0,
+        "duplicate": counts["parsed"] - counts["errored"],
+        "invalid": counts["errored"],
+        "uncategorized": 0,
+        "sample": {"new": [], "duplicate": []},
+    }
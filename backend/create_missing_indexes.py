@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script to create the composite (Sube_ID, Donem) / (Sube_ID, Tarih) indexes used by
+the filtered list endpoints on an existing database. Indexes that already exist are skipped.
+"""
+
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import func, inspect, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from db.database import Base, engine
+from db import models  # noqa: F401 - registers the tables on Base.metadata
+
+def count_duplicate_keys(index) -> int:
+    """Number of key values that occur more than once in the columns of a unique index."""
+    duplicates = select(*index.columns).group_by(*index.columns).having(func.count() > 1).subquery()
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(duplicates)).scalar()
+
+def create_missing_indexes() -> bool:
+    """
+    Create every index declared in the models that is missing in the database.
+    A unique index over rows that are not unique yet is reported with the
+    number of duplicate keys and skipped; a failing index does not stop the
+    ones after it. Returns False if any index could not be created.
+    """
+    existing = {}
+    ok = True
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            print(f"Ensuring index {index.name} on {table.name}...")
+            try:
+                if table.name not in existing:
+                    existing[table.name] = {ix["name"] for ix in inspect(engine).get_indexes(table.name)}
+                if index.name in existing[table.name]:
+                    continue
+                if index.unique:
+                    duplicates = count_duplicate_keys(index)
+                    if duplicates:
+                        columns = ", ".join(column.name for column in index.columns)
+                        print(f"  Skipped: {duplicates} ({columns}) key(s) occur more than once in {table.name}. "
+                              f"Remove the duplicate rows and run this script again.")
+                        ok = False
+                        continue
+                index.create(bind=engine)
+            except SQLAlchemyError as e:
+                print(f"  Failed: {e}")
+                ok = False
+    print("All indexes are in place." if ok else "Some indexes are missing, see above.")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if create_missing_indexes() else 1)
@@ -0,0 +1,189 @@
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.sql import func
+
+from core.config import settings
+from . import models
+from .crud import donem_to_date_range, get_change_column, image_metadata_columns, with_image_metadata, attach_image_metadata
+
+
+def _normalize_donem(donem: Optional[int]):
+    if donem is not None and len(str(donem)) == 6:
+        return int(str(donem)[2:])
+    return donem
+
+
+class BootstrapScope:
+    """
+    Branch and period window a bootstrap snapshot is restricted to.
+    Tables with a Donem column are filtered by period, tables that only
+    carry a transaction date are filtered by the equivalent date range.
+    With since set only rows written at or after that moment are returned.
+    """
+
+    def __init__(self, sube_id: Optional[int] = None, donem_start: Optional[int] = None, donem_end: Optional[int] = None,
+                 since: Optional[datetime] = None):
+        self.sube_id = sube_id
+        self.since = since
+        self.donem_start = _normalize_donem(donem_start)
+        self.donem_end = _normalize_donem(donem_end)
+        self.start_date = donem_to_date_range(self.donem_start)[0] if self.donem_start else None
+        self.end_date = donem_to_date_range(self.donem_end)[1] if self.donem_end else None
+
+    def apply(self, query, model, donem_column=None, date_column=None):
+        if self.sube_id is not None and hasattr(model, "Sube_ID"):
+            query = query.filter(model.Sube_ID == self.sube_id)
+        if donem_column is not None:
+            if self.donem_start:
+                query = query.filter(donem_column >= self.donem_start)
+            if self.donem_end:
+                query = query.filter(donem_column <= self.donem_end)
+        elif date_column is not None:
+            if self.start_date:
+                query = query.filter(date_column >= self.start_date)
+            if self.end_date:
+                query = query.filter(date_column <= self.end_date)
+        change_column = get_change_column(model)
+        if self.since is not None and change_column is not None:
+            query = query.filter(change_column >= self.since)
+        return query
+
+
+def get_sync_watermark(db: Session):
+    """
+    Database time the client passes back as since on its next delta request.
+    Rows are stamped when they are written, not when their transaction
+    commits, so the watermark is set back by SYNC_WATERMARK_MARGIN_SECONDS:
+    a write still uncommitted while this snapshot is read is picked up by the
+    next delta instead of falling behind the watermark. Rows in the margin
+    are sent twice, which clients apply as idempotent upserts.
+    """
+    return db.query(func.now()).scalar() - timedelta(seconds=settings.SYNC_WATERMARK_MARGIN_SECONDS)
+
+
+def get_deleted_ids(db: Session, scope: BootstrapScope, model):
+    query = db.query(models.SilinenKayit.Kayit_ID).filter(
+        models.SilinenKayit.Tablo_Adi == model.__tablename__,
+        models.SilinenKayit.Silinme_Tarihi >= scope.since
+    )
+    if scope.sube_id is not None:
+        query = query.filter(or_(models.SilinenKayit.Sube_ID == scope.sube_id, models.SilinenKayit.Sube_ID.is_(None)))
+    key_type = model.__mapper__.primary_key[0].type.python_type
+    return [key_type(kayit_id) for (kayit_id,) in query.all()]
+
+
+def _donem_to_str(obj):
+    if obj.Donem is not None:
+        obj.Donem = str(obj.Donem)
+    return obj
+
+
+def get_e_faturalar(db: Session, scope: BootstrapScope):
+    query = db.query(models.EFatura)
+    return scope.apply(query, models.EFatura, donem_column=models.EFatura.Donem).all()
+
+
+def get_b2b_ekstreler(db: Session, scope: BootstrapScope):
+    query = db.query(models.B2BEkstre)
+    ekstreler = scope.apply(query, models.B2BEkstre, donem_column=models.B2BEkstre.Donem).all()
+    return [_donem_to_str(ekstre) for ekstre in ekstreler]
+
+
+def get_diger_harcamalar(db: Session, scope: BootstrapScope):
+    query = with_image_metadata(db.query(models.DigerHarcama), models.DigerHarcama)
+    harcamalar = attach_image_metadata(scope.apply(query, models.DigerHarcama, donem_column=models.DigerHarcama.Donem).all())
+    return [_donem_to_str(harcama) for harcama in harcamalar]
+
+
+def get_stoklar(db: Session, scope: BootstrapScope):
+    return db.query(models.Stok).all()
+
+
+def get_stok_fiyatlar(db: Session, scope: BootstrapScope):
+    query = (
+        db.query(models.StokFiyat, models.Stok.Malzeme_Aciklamasi)
+        .join(models.Stok, models.StokFiyat.Malzeme_Kodu == models.Stok.Malzeme_Kodu)
+    )
+    result = []
+    for sf, malzeme_aciklamasi in scope.apply(query, models.StokFiyat).all():
+        sf.Gecerlilik_Baslangic_Tarih = str(sf.Gecerlilik_Baslangic_Tarih) if sf.Gecerlilik_Baslangic_Tarih is not None else None
+        sf.Fiyat = float(sf.Fiyat) if sf.Fiyat is not None else None
+        sf.Malzeme_Aciklamasi = malzeme_aciklamasi
+        result.append(sf)
+    return result
+
+
+def get_stok_sayimlar(db: Session, scope: BootstrapScope):
+    query = db.query(models.StokSayim)
+    sayimlar = scope.apply(query, models.StokSayim, donem_column=models.StokSayim.Donem).all()
+    return [_donem_to_str(sayim) for sayim in sayimlar]
+
+
+def get_calisanlar(db: Session, scope: BootstrapScope):
+    return scope.apply(db.query(models.Calisan), models.Calisan).all()
+
+
+def get_puantaj_secimleri(db: Session, scope: BootstrapScope):
+    return db.query(models.PuantajSecimi).all()
+
+
+def get_puantajlar(db: Session, scope: BootstrapScope):
+    query = db.query(models.Puantaj)
+    return scope.apply(query, models.Puantaj, date_column=models.Puantaj.Tarih).all()
+
+
+def get_gelirler(db: Session, scope: BootstrapScope):
+    query = db.query(models.Gelir)
+    return scope.apply(query, models.Gelir, date_column=models.Gelir.Tarih).all()
+
+
+def get_gelir_ekstralar(db: Session, scope: BootstrapScope):
+    query = db.query(models.GelirEkstra)
+    return scope.apply(query, models.GelirEkstra, date_column=models.GelirEkstra.Tarih).all()
+
+
+def get_avans_istekler(db: Session, scope: BootstrapScope):
+    query = db.query(models.AvansIstek)
+    return scope.apply(query, models.AvansIstek, donem_column=models.AvansIstek.Donem).all()
+
+
+def get_efatura_referanslar(db: Session, scope: BootstrapScope):
+    return scope.apply(db.query(models.EFaturaReferans), models.EFaturaReferans).all()
+
+
+def get_odeme_referanslar(db: Session, scope: BootstrapScope):
+    return scope.apply(db.query(models.OdemeReferans), models.OdemeReferans).all()
+
+
+def get_nakitler(db: Session, scope: BootstrapScope):
+    query = with_image_metadata(db.query(models.Nakit), models.Nakit)
+    return attach_image_metadata(scope.apply(query, models.Nakit, donem_column=models.Nakit.Donem).all())
+
+
+def get_odemeler(db: Session, scope: BootstrapScope):
+    query = db.query(models.Odeme)
+    return scope.apply(query, models.Odeme, donem_column=models.Odeme.Donem).all()
+
+
+def get_yemek_cekiler(db: Session, scope: BootstrapScope):
+    query = db.query(
+        models.YemekCeki.ID,
+        models.YemekCeki.Kategori_ID,
+        models.YemekCeki.Tarih,
+        models.YemekCeki.Tutar,
+        models.YemekCeki.Odeme_Tarih,
+        models.YemekCeki.Ilk_Tarih,
+        models.YemekCeki.Son_Tarih,
+        models.YemekCeki.Sube_ID,
+        models.YemekCeki.Imaj_Adi,
+        models.YemekCeki.Imaj_Hash,
+        *image_metadata_columns(models.YemekCeki)
+    )
+    return scope.apply(query, models.YemekCeki, date_column=models.YemekCeki.Tarih).all()
+
+
+def get_calisan_talepler(db: Session, scope: BootstrapScope):
+    query = with_image_metadata(db.query(models.CalisanTalep), models.CalisanTalep)
+    return attach_image_metadata(scope.apply(query, models.CalisanTalep).all())
@@ -1,8 +1,16 @@
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import date
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy import and_, bindparam, case, func, insert, literal, literal_column, or_, select, union_all, update
+from sqlalchemy.sql.elements import BindParameter
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, defer
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List, Optional
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 
-from db import models
+from core import uploads
+from db import image_store, models, odeme_matcher, principals, versioning
 from schemas import sube, user, role, permission, kullanici_rol, rol_yetki, e_fatura, b2b_ekstre, diger_harcama, gelir, gelir_ekstra, stok, stok_fiyat, stok_sayim, calisan, puantaj_secimi, puantaj, avans_istek, ust_kategori, kategori, deger, e_fatura_referans, nakit, odeme, odeme_referans, pos_hareketleri, yemek_ceki, calisan_talep, cari
 from core.security import verify_password, get_password_hash
 
@@ -15,6 +23,112 @@ def authenticate_user(db: Session, username: str, password: str):
     return user
     return user
 
+# --- List query helpers ---
+def donem_to_date_range(donem: int):
+    """
+    Converts a YYMM (or YYYYMM) period into its first and last calendar day.
+    """
+    donem_str = str(donem)
+    if len(donem_str) == 6:
+        donem_str = donem_str[2:]
+    if len(donem_str) != 4:
+        raise ValueError("Invalid donem format. Expected YYMM format.")
+
+    year = 2000 + int(donem_str[:2])
+    month = int(donem_str[2:])
+    first_day = date(year, month, 1)
+    if month == 12:
+        last_day = date(year + 1, 1, 1) - timedelta(days=1)
+    else:
+        last_day = date(year, month + 1, 1) - timedelta(days=1)
+    return first_day, last_day
+
+def get_change_column(model):
+    """
+    Returns the last-write timestamp of a table, or None if the table is not
+    tracked and has to be sent in full on every sync.
+    """
+    if model.__tablename__ not in models.TOMBSTONE_TABLES:
+        return None
+    if hasattr(model, "Kayit_Tarihi"):
+        return model.Kayit_Tarihi
+    return model.Kayit_Tarih
+
+def apply_list_filters(query, model, date_column=None, sube_id: Optional[int] = None, donem: Optional[int] = None,
+                       start_date: Optional[date] = None, end_date: Optional[date] = None, since: Optional[datetime] = None):
+    """
+    Pushes the common list filters into SQL. Tables without a Donem column
+    are filtered on the calendar month of the requested period instead.
+    since keeps only the rows inserted or updated at or after that moment.
+    A donem or date filter the table has no column for, or since on a table
+    whose writes are not tracked, is rejected with 400 rather than ignored.
+    """
+    if (donem is not None and not hasattr(model, "Donem") and date_column is None) or \
+            ((start_date is not None or end_date is not None) and date_column is None):
+        raise HTTPException(status_code=400, detail=f"{model.__tablename__} cannot be filtered by period or date.")
+    change_column = get_change_column(model)
+    if since is not None and change_column is None:
+        raise HTTPException(status_code=400, detail=f"{model.__tablename__} does not track changes; request it without since.")
+    if sube_id is not None:
+        query = query.filter(model.Sube_ID == sube_id)
+    if donem is not None:
+        if hasattr(model, "Donem"):
+            donem_str = str(donem)
+            query = query.filter(model.Donem == int(donem_str[2:] if len(donem_str) == 6 else donem_str))
+        else:
+            first_day, last_day = donem_to_date_range(donem)
+            query = query.filter(date_column >= first_day, date_column <= last_day)
+    if date_column is not None:
+        if start_date is not None:
+            query = query.filter(date_column >= start_date)
+        if end_date is not None:
+            query = query.filter(date_column <= end_date)
+    if since is not None:
+        query = query.filter(change_column >= since)
+    return query
+
+def image_metadata_columns(model):
+    # Rows not yet moved to the blob store still carry the image in the Imaj column
+    return (
+        or_(model.Imaj_Hash != None, model.Imaj != None).label('has_imaj'),
+        func.coalesce(model.Imaj_Boyutu, func.length(model.Imaj)).label('Imaj_Boyutu')
+    )
+
+def with_image_metadata(query, model):
+    """
+    Leaves the Imaj blob out of a list query and selects has_imaj and
+    Imaj_Boyutu (bytes) instead; the image itself is served by /{id}/image.
+    """
+    return query.options(defer(model.Imaj)).add_columns(*image_metadata_columns(model))
+
+def attach_image_metadata(rows):
+    result = []
+    for obj, has_imaj, imaj_boyutu in rows:
+        obj.has_imaj = bool(has_imaj)
+        set_committed_value(obj, 'Imaj_Boyutu', imaj_boyutu)
+        result.append(obj)
+    return result
+
+IN_CLAUSE_CHUNK = 1000
+
+def chunked(items, size: int):
+    """Yields consecutive slices of at most `size` items, e.g. to bound IN lists and multi-row INSERTs."""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def apply_keyset(query, key_column, after_id: Optional[int] = None, limit: Optional[int] = None):
+    """
+    Keyset pagination on a monotonically increasing key: the next page is
+    requested with the key of the last row received instead of an OFFSET.
+    """
+    if after_id is not None:
+        query = query.filter(key_column > after_id)
+    query = query.order_by(key_column)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
 # --- Sube CRUD ---
 def get_sube(db: Session, sube_id: int):
     return db.query(models.Sube).filter(models.Sube.Sube_ID == sube_id).first()
@@ -76,6 +190,7 @@ def update_user(db: Session, user_id: int, user: user.UserUpdate):
             setattr(db_user, key, value)
         db.commit()
         db.refresh(db_user)
+        principals.invalidate_user(user_id)
     return db_user
 
 def delete_user(db: Session, user_id: int):
@@ -83,6 +198,7 @@ def delete_user(db: Session, user_id: int):
     if db_user:
         db.delete(db_user)
         db.commit()
+        principals.invalidate_user(user_id)
     return db_user
 
 def get_users_by_role_name(db: Session, role_name: str) -> List[models.Kullanici]:
@@ -205,56 +321,91 @@ def delete_kullanici_rol(db: Session, kullanici_id: int, rol_id: int, sube_id: i
 def get_efatura(db: Session, efatura_id: int):
     return db.query(models.EFatura).filter(models.EFatura.Fatura_ID == efatura_id).first()
 
-def get_efaturalar(db: Session):
-    return db.query(models.EFatura).all()
+def get_efaturalar(db: Session, limit: Optional[int] = None, after_id: Optional[int] = None, columns: Optional[list] = None, **filters):
+    query = apply_list_filters(db.query(*(columns or [models.EFatura])), models.EFatura, models.EFatura.Fatura_Tarihi, **filters)
+    return apply_keyset(query, models.EFatura.Fatura_ID, after_id, limit).all()
+
+EFATURA_INSERT_CHUNK = 500
 
 def create_efaturas_bulk(db: Session, efaturas: List[e_fatura.EFaturaCreate]):
-    added_invoices = []
-    skipped_count = 0
-    error_count = 0
-    
-    for efatura_data in efaturas:
-        print("Processing efatura:", efatura_data)
-        # Skip if Fatura_Numarasi is empty or None
+    """
+    Imports a batch of invoices in one transaction: existing invoice numbers
+    and the referans categories are prefetched with IN queries and new rows
+    are written with multi-row INSERTs. A chunk that fails is retried row by
+    row so one bad invoice only marks itself as an error.
+    """
+    results = [None] * len(efaturas)
+    numaralar = sorted({e.Fatura_Numarasi for e in efaturas if e.Fatura_Numarasi})
+    existing = set()
+    for chunk in chunked(numaralar, IN_CLAUSE_CHUNK):
+        existing.update(
+            numara for numara, in db.query(models.EFatura.Fatura_Numarasi).filter(models.EFatura.Fatura_Numarasi.in_(chunk))
+        )
+
+    referans_map = {}
+    for chunk in chunked(sorted({e.Alici_Unvani for e in efaturas}), IN_CLAUSE_CHUNK):
+        referans_map.update(
+            db.query(models.EFaturaReferans.Alici_Unvani, models.EFaturaReferans.Kategori_ID)
+            .filter(models.EFaturaReferans.Alici_Unvani.in_(chunk)).all()
+        )
+
+    pending = []
+    for index, efatura_data in enumerate(efaturas):
+        result = {"index": index, "Fatura_Numarasi": efatura_data.Fatura_Numarasi}
+        results[index] = result
         if not efatura_data.Fatura_Numarasi:
-            skipped_count += 1
+            result.update(status="skipped", detail="Fatura_Numarasi is empty")
             continue
-
-        # Check if the invoice already exists
-        exists = db.query(models.EFatura).filter(
-            models.EFatura.Fatura_Numarasi == efatura_data.Fatura_Numarasi,
-            models.EFatura.Sube_ID == efatura_data.Sube_ID
-        ).first()
-        
-        if exists:
-            skipped_count += 1
+        # Fatura_Numarasi is unique across all branches
+        if efatura_data.Fatura_Numarasi in existing:
+            result.update(status="skipped", detail="Invoice already exists")
             continue
+        existing.add(efatura_data.Fatura_Numarasi)
 
+        row = efatura_data.dict()
+        if row["Alici_Unvani"] in referans_map:
+            row["Kategori_ID"] = referans_map[row["Alici_Unvani"]]
+        pending.append((index, row))
+
+    inserted = []
+    for chunk in chunked(pending, EFATURA_INSERT_CHUNK):
         try:
-            # Check for existing e_fatura_referans to assign Kategori_ID
-            efatura_referans = db.query(models.EFaturaReferans).filter(
-                models.EFaturaReferans.Alici_Unvani == efatura_data.Alici_Unvani
-            ).first()
+            with db.begin_nested():
+                db.execute(insert(models.EFatura).values([row for _, row in chunk]))
+            inserted.extend(chunk)
+        except SQLAlchemyError:
+            for index, row in chunk:
+                try:
+                    with db.begin_nested():
+                        db.execute(insert(models.EFatura).values(row))
+                    inserted.append((index, row))
+                except SQLAlchemyError as e:
+                    logger.error(f"Error adding invoice {row['Fatura_Numarasi']}: {e}")
+                    results[index].update(status="error", detail=str(e.orig if hasattr(e, "orig") else e))
 
-            if efatura_referans:
-                efatura_data.Kategori_ID = efatura_referans.Kategori_ID
-            
-            db_efatura = models.EFatura(**efatura_data.dict())
-            db.add(db_efatura)
-            db.commit()
-            db.refresh(db_efatura)
-            added_invoices.append(db_efatura)
-        except Exception as e:
-            print(f"Error adding invoice {efatura_data.Fatura_Numarasi}: {e}")
-            db.rollback()
-            error_count += 1
+    added_invoices = []
+    if inserted:
+        for sube_id, donem in {(row["Sube_ID"], row["Donem"]) for _, row in inserted}:
+            versioning.bump_table_version(db, models.EFatura.__tablename__, sube_id, donem)
+
+        index_by_numara = {row["Fatura_Numarasi"]: index for index, row in inserted}
+        added_by_index = {}
+        for chunk in chunked(sorted(index_by_numara), IN_CLAUSE_CHUNK):
+            for db_efatura in db.query(models.EFatura).filter(models.EFatura.Fatura_Numarasi.in_(chunk)):
+                added_by_index[index_by_numara[db_efatura.Fatura_Numarasi]] = db_efatura
+        for index in sorted(added_by_index):
+            results[index].update(status="added", Fatura_ID=added_by_index[index].Fatura_ID)
+            added_invoices.append(added_by_index[index])
+    db.commit()
 
+    logger.info(f"Imported {len(added_invoices)} of {len(efaturas)} e-Fatura rows.")
     return {
         "message": f"Processed {len(efaturas)} invoices.",
         "added": len(added_invoices),
-        "skipped": skipped_count,
-        "errors": error_count,
-        "added_invoices": added_invoices
+        "skipped": sum(1 for result in results if result["status"] == "skipped"),
+        "errors": sum(1 for result in results if result["status"] == "error"),
+        "added_invoices": added_invoices,
+        "results": results
     }
 
 def update_efatura(db: Session, efatura_id: int, efatura: e_fatura.EFaturaUpdate):
@@ -344,8 +495,9 @@ def get_b2b_ekstre(db: Session, ekstre_id: int):
     if ekstre: ekstre.Donem = str(ekstre.Donem)
     return ekstre
 
-def get_b2b_ekstreler(db: Session, skip: int = 0):
-    ekstreler = db.query(models.B2BEkstre).offset(skip).all()
+def get_b2b_ekstreler(db: Session, skip: int = 0, limit: Optional[int] = None, after_id: Optional[int] = None, **filters):
+    query = apply_list_filters(db.query(models.B2BEkstre), models.B2BEkstre, models.B2BEkstre.Tarih, **filters)
+    ekstreler = apply_keyset(query, models.B2BEkstre.Ekstre_ID, after_id, limit).offset(skip).all()
     for ekstre in ekstreler:
         ekstre.Donem = str(ekstre.Donem)
     return ekstreler
@@ -396,35 +548,105 @@ def get_b2b_ekstre_by_unique_fields(db: Session, ekstre: b2b_ekstre.B2BEkstreCre
         models.B2BEkstre.Sube_ID == ekstre.Sube_ID
     ).first()
 
-def create_b2b_ekstre_bulk(db: Session, ekstreler: List[b2b_ekstre.B2BEkstreCreate]):
-    added_count = 0
-    skipped_count = 0
-    logger.info(f"Starting bulk create of B2B Ekstre for {len(ekstreler)} records.")
+def _b2b_ekstre_key(tarih, fis_no, borc, alacak, sube_id):
+    # Amounts arrive as floats from the CSV and as Decimal from the database
+    def money(value):
+        return None if value is None else Decimal(str(value)).quantize(Decimal("0.01"))
+    return (tarih, fis_no, money(borc), money(alacak), sube_id)
 
-    new_ekstreler_mappings = []
+def backfill_efatura_aciklamalari(db: Session, aciklamalar: dict) -> int:
+    """
+    Sets e_Fatura.Aciklama from a {Fatura_Numarasi: Aciklama} map with one
+    UPDATE per IN chunk, only where the invoice has no description yet. Does
+    not commit, so the caller's transaction covers it.
+    """
+    updated = 0
+    for chunk in chunked(sorted(aciklamalar), IN_CLAUSE_CHUNK):
+        updated += db.execute(
+            update(models.EFatura)
+            .where(
+                models.EFatura.Fatura_Numarasi.in_(chunk),
+                or_(models.EFatura.Aciklama.is_(None), models.EFatura.Aciklama == "")
+            )
+            .values(Aciklama=case({numara: aciklamalar[numara] for numara in chunk}, value=models.EFatura.Fatura_Numarasi))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    if updated:
+        versioning.bump_table_version(db, models.EFatura.__tablename__)
+    return updated
+
+def split_new_b2b_ekstreler(db: Session, ekstreler: List[b2b_ekstre.B2BEkstreCreate], seen: Optional[set] = None):
+    """
+    Splits statement rows into those not in B2B_Ekstre yet and duplicates,
+    i.e. rows already in the table or repeated in the list. Duplicates on
+    (Sube_ID, Tarih, Fis_No, Borc, Alacak), the unique key of B2B_Ekstre, are
+    found with one prefetch over the rows' date range. Writes nothing.
+    seen collects the keys of the new rows across calls, so a preview of a
+    file read in chunks finds the repeats the import would.
+    """
+    if not ekstreler:
+        return [], []
+
+    existing = {
+        _b2b_ekstre_key(*row) for row in db.query(
+            models.B2BEkstre.Tarih,
+            models.B2BEkstre.Fis_No,
+            models.B2BEkstre.Borc,
+            models.B2BEkstre.Alacak,
+            models.B2BEkstre.Sube_ID
+        ).filter(
+            models.B2BEkstre.Sube_ID.in_({e.Sube_ID for e in ekstreler}),
+            models.B2BEkstre.Tarih.between(min(e.Tarih for e in ekstreler), max(e.Tarih for e in ekstreler))
+        )
+    }
+
+    seen = set() if seen is None else seen
+    new_ekstreler = []
+    duplicates = []
     for ekstre_data in ekstreler:
-        existing_ekstre = get_b2b_ekstre_by_unique_fields(db, ekstre_data)
-        if existing_ekstre:
-            logger.info(f"Skipping existing record: {ekstre_data.Fis_No}")
-            skipped_count += 1
+        key = _b2b_ekstre_key(ekstre_data.Tarih, ekstre_data.Fis_No, ekstre_data.Borc, ekstre_data.Alacak, ekstre_data.Sube_ID)
+        if key in existing or key in seen:
+            duplicates.append(ekstre_data)
             continue
-        
+        seen.add(key)
+        new_ekstreler.append(ekstre_data)
+    return new_ekstreler, duplicates
+
+def create_b2b_ekstre_bulk(db: Session, ekstreler: List[b2b_ekstre.B2BEkstreCreate], efatura_aciklamalari: Optional[dict] = None):
+    """
+    Inserts the rows of an uploaded B2B statement that are not in the table
+    yet, as split_new_b2b_ekstreler finds them. efatura_aciklamalari is
+    backfilled into e_Fatura in the same transaction.
+    """
+    logger.info(f"Starting bulk create of B2B Ekstre for {len(ekstreler)} records.")
+    if not ekstreler and not efatura_aciklamalari:
+        return {"added": 0, "skipped": 0, "efatura_updated": 0}
+
+    new_ekstreler, duplicates = split_new_b2b_ekstreler(db, ekstreler)
+    for ekstre_data in duplicates:
+        logger.info(f"Skipping existing record: {ekstre_data.Fis_No}")
+
+    new_ekstreler_mappings = []
+    for ekstre_data in new_ekstreler:
         ekstre_dict = ekstre_data.dict()
         ekstre_dict['Donem'] = int(ekstre_dict['Donem'])
         new_ekstreler_mappings.append(ekstre_dict)
-        added_count += 1
+    added_count = len(new_ekstreler_mappings)
 
-    if new_ekstreler_mappings:
-        try:
+    try:
+        if new_ekstreler_mappings:
             db.bulk_insert_mappings(models.B2BEkstre, new_ekstreler_mappings)
-            db.commit()
-            logger.info(f"Successfully committed {added_count} new B2B Ekstre records.")
-        except Exception as e:
-            logger.error(f"Error committing B2B Ekstre records: {e}")
-            db.rollback()
-            raise
+            for sube_id, donem in {(m['Sube_ID'], m['Donem']) for m in new_ekstreler_mappings}:
+                versioning.bump_table_version(db, models.B2BEkstre.__tablename__, sube_id, donem)
+        efatura_updated = backfill_efatura_aciklamalari(db, efatura_aciklamalari or {})
+        db.commit()
+        logger.info(f"Successfully committed {added_count} new B2B Ekstre records and {efatura_updated} e-Fatura descriptions.")
+    except Exception as e:
+        logger.error(f"Error committing B2B Ekstre records: {e}")
+        db.rollback()
+        raise
         
-    return {"added": added_count, "skipped": skipped_count}
+    return {"added": added_count, "skipped": len(duplicates), "efatura_updated": efatura_updated}
 
 
 # --- DigerHarcama CRUD ---
@@ -435,17 +657,21 @@ def get_diger_harcama(db: Session, harcama_id: int):
     if harcama:
         if harcama.Donem is not None:
             harcama.Donem = str(harcama.Donem)
+        image_store.load_imaj(harcama)
         if harcama.Imaj is not None:
             harcama.Imaj = base64.b64encode(harcama.Imaj).decode('utf-8')
     return harcama
 
-def get_diger_harcamalar(db: Session, skip: int = 0):
-    harcamalar = db.query(models.DigerHarcama).offset(skip).all()
+def get_diger_harcamalar(db: Session, skip: int = 0, limit: Optional[int] = None, after_id: Optional[int] = None, columns: Optional[list] = None, **filters):
+    if columns:
+        query = apply_list_filters(db.query(*columns), models.DigerHarcama, models.DigerHarcama.Belge_Tarihi, **filters)
+        return apply_keyset(query, models.DigerHarcama.Harcama_ID, after_id, limit).offset(skip).all()
+    query = with_image_metadata(db.query(models.DigerHarcama), models.DigerHarcama)
+    query = apply_list_filters(query, models.DigerHarcama, models.DigerHarcama.Belge_Tarihi, **filters)
+    harcamalar = attach_image_metadata(apply_keyset(query, models.DigerHarcama.Harcama_ID, after_id, limit).offset(skip).all())
     for harcama in harcamalar:
         if harcama.Donem is not None:
             harcama.Donem = str(harcama.Donem)
-        if harcama.Imaj is not None:
-            harcama.Imaj = base64.b64encode(harcama.Imaj).decode('utf-8')
     return harcamalar
 
 async def create_diger_harcama(db: Session, harcama: diger_harcama.DigerHarcamaCreate):
@@ -461,6 +687,7 @@ async def create_diger_harcama(db: Session, harcama: diger_harcama.DigerHarcamaC
     # Convert Donem back to string and Imaj to base64 for the response
     if db_harcama.Donem is not None:
         db_harcama.Donem = str(db_harcama.Donem)
+    image_store.load_imaj(db_harcama)
     if db_harcama.Imaj is not None:
         db_harcama.Imaj = base64.b64encode(db_harcama.Imaj).decode('utf-8')
         
@@ -497,6 +724,7 @@ async def update_diger_harcama(db: Session, harcama_id: int, harcama: diger_harc
             db_harcama.Donem = str(db_harcama.Donem)
 
         # Convert Imaj to base64 for the response
+        image_store.load_imaj(db_harcama)
         if db_harcama.Imaj is not None:
             db_harcama.Imaj = base64.b64encode(db_harcama.Imaj).decode('utf-8')
             
@@ -513,8 +741,9 @@ def delete_diger_harcama(db: Session, harcama_id: int):
 def get_gelir(db: Session, gelir_id: int):
     return db.query(models.Gelir).filter(models.Gelir.Gelir_ID == gelir_id).first()
 
-def get_gelirler(db: Session, skip: int = 0, limit: int | None = None):
-    return db.query(models.Gelir).offset(skip).limit(limit).all()
+def get_gelirler(db: Session, skip: int = 0, limit: int | None = None, after_id: Optional[int] = None, columns: Optional[list] = None, **filters):
+    query = apply_list_filters(db.query(*(columns or [models.Gelir])), models.Gelir, models.Gelir.Tarih, **filters)
+    return apply_keyset(query, models.Gelir.Gelir_ID, after_id, limit).offset(skip).all()
 
 def create_gelir(db: Session, gelir: gelir.GelirCreate):
     db_gelir = models.Gelir(**gelir.dict())
@@ -561,8 +790,9 @@ def get_nakit_gelir_by_date_range(db: Session, start_date: date, end_date: date,
 def get_gelir_ekstra(db: Session, gelir_ekstra_id: int):
     return db.query(models.GelirEkstra).filter(models.GelirEkstra.GelirEkstra_ID == gelir_ekstra_id).first()
 
-def get_gelir_ekstralar(db: Session, skip: int = 0, limit: int | None = None):
-    return db.query(models.GelirEkstra).offset(skip).limit(limit).all()
+def get_gelir_ekstralar(db: Session, skip: int = 0, limit: int | None = None, after_id: Optional[int] = None, **filters):
+    query = apply_list_filters(db.query(models.GelirEkstra), models.GelirEkstra, models.GelirEkstra.Tarih, **filters)
+    return apply_keyset(query, models.GelirEkstra.GelirEkstra_ID, after_id, limit).offset(skip).all()
 
 def create_gelir_ekstra(db: Session, gelir_ekstra: gelir_ekstra.GelirEkstraCreate):
     db_gelir_ekstra = models.GelirEkstra(
@@ -646,15 +876,16 @@ def get_stok_fiyat(db: Session, fiyat_id: int):
         return sf
     return None
 
-def get_stok_fiyatlar(db: Session, skip: int = 0):
-    stok_fiyatlar_with_details = (
+def get_stok_fiyatlar(db: Session, skip: int = 0, limit: Optional[int] = None, after_id: Optional[int] = None, **filters):
+    query = (
         db.query(
             models.StokFiyat,
             models.Stok.Malzeme_Aciklamasi
         )
         .join(models.Stok, models.StokFiyat.Malzeme_Kodu == models.Stok.Malzeme_Kodu)
-        .offset(skip).all()
     )
+    query = apply_list_filters(query, models.StokFiyat, models.StokFiyat.Gecerlilik_Baslangic_Tarih, **filters)
+    stok_fiyatlar_with_details = apply_keyset(query, models.StokFiyat.Fiyat_ID, after_id, limit).offset(skip).all()
 
     # Manually construct the response to include Malzeme_Aciklamasi and handle type conversions
     result = []
@@ -716,8 +947,9 @@ def get_stok_sayim(db: Session, sayim_id: int):
         return stok_sayim_details
     return None
 
-def get_stok_sayimlar(db: Session, skip: int = 0):
-    stok_sayimlar = db.query(models.StokSayim).offset(skip).all()
+def get_stok_sayimlar(db: Session, skip: int = 0, limit: Optional[int] = None, after_id: Optional[int] = None, **filters):
+    query = apply_list_filters(db.query(models.StokSayim), models.StokSayim, **filters)
+    stok_sayimlar = apply_keyset(query, models.StokSayim.Sayim_ID, after_id, limit).offset(skip).all()
     for ss in stok_sayimlar:
         if ss.Donem is not None:
             ss.Donem = str(ss.Donem)
@@ -760,8 +992,11 @@ def get_calisan(db: Session, tc_no: str):
 def get_calisan_by_tc_no(db: Session, tc_no: str):
     return db.query(models.Calisan).filter(models.Calisan.TC_No == tc_no).first()
 
-def get_calisanlar(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Calisan).offset(skip).limit(limit).all()
+def get_calisanlar(db: Session, skip: int = 0, limit: int = 100, sube_id: Optional[int] = None):
+    query = db.query(models.Calisan)
+    if sube_id is not None:
+        query = query.filter(models.Calisan.Sube_ID == sube_id)
+    return query.order_by(models.Calisan.TC_No).offset(skip).limit(limit).all()
 
 def create_calisan(db: Session, calisan: calisan.CalisanCreate):
     db_calisan = models.Calisan(
@@ -799,13 +1034,15 @@ def delete_calisan(db: Session, tc_no: str):
 
 # --- CalisanTalep CRUD ---
 def get_calisan_talep(db: Session, talep_id: int):
-    return db.query(models.CalisanTalep).filter(models.CalisanTalep.Calisan_Talep_ID == talep_id).first()
+    return image_store.load_imaj(db.query(models.CalisanTalep).filter(models.CalisanTalep.Calisan_Talep_ID == talep_id).first())
 
 def get_calisan_talep_by_tc_no(db: Session, tc_no: str):
-    return db.query(models.CalisanTalep).filter(models.CalisanTalep.TC_No == tc_no).first()
+    return image_store.load_imaj(db.query(models.CalisanTalep).filter(models.CalisanTalep.TC_No == tc_no).first())
 
-def get_calisan_talepler(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.CalisanTalep).offset(skip).limit(limit).all()
+def get_calisan_talepler(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, **filters):
+    query = with_image_metadata(db.query(models.CalisanTalep), models.CalisanTalep)
+    query = apply_list_filters(query, models.CalisanTalep, **filters)
+    return attach_image_metadata(apply_keyset(query, models.CalisanTalep.Calisan_Talep_ID, after_id, limit).offset(skip).all())
 
 def create_calisan_talep(db: Session, talep: calisan_talep.CalisanTalepCreate):
     talep_data = talep.dict()
@@ -819,7 +1056,7 @@ def create_calisan_talep(db: Session, talep: calisan_talep.CalisanTalepCreate):
     db.add(db_talep)
     db.commit()
     db.refresh(db_talep)
-    return db_talep
+    return image_store.load_imaj(db_talep)
 
 def update_calisan_talep(db: Session, talep_id: int, talep: calisan_talep.CalisanTalepUpdate):
     db_talep = db.query(models.CalisanTalep).filter(models.CalisanTalep.Calisan_Talep_ID == talep_id).first()
@@ -943,8 +1180,9 @@ def delete_puantaj_secimi(db: Session, secim_id: int):
 def get_puantaj(db: Session, puantaj_id: int):
     return db.query(models.Puantaj).filter(models.Puantaj.Puantaj_ID == puantaj_id).first()
 
-def get_puantajlar(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Puantaj).offset(skip).limit(limit).all()
+def get_puantajlar(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, **filters):
+    query = apply_list_filters(db.query(models.Puantaj), models.Puantaj, models.Puantaj.Tarih, **filters)
+    return apply_keyset(query, models.Puantaj.Puantaj_ID, after_id, limit).offset(skip).all()
 
 def create_puantaj(db: Session, puantaj: puantaj.PuantajCreate):
     db_puantaj = models.Puantaj(**puantaj.dict())
@@ -973,8 +1211,9 @@ def delete_puantaj(db: Session, puantaj_id: int):
 def get_avans_istek(db: Session, avans_id: int):
     return db.query(models.AvansIstek).filter(models.AvansIstek.Avans_ID == avans_id).first()
 
-def get_avans_istekler(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.AvansIstek).offset(skip).limit(limit).all()
+def get_avans_istekler(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, **filters):
+    query = apply_list_filters(db.query(models.AvansIstek), models.AvansIstek, **filters)
+    return apply_keyset(query, models.AvansIstek.Avans_ID, after_id, limit).offset(skip).all()
 
 def create_avans_istek(db: Session, avans_istek: avans_istek.AvansIstekCreate):
     db_avans_istek = models.AvansIstek(**avans_istek.dict())
@@ -1125,22 +1364,21 @@ def delete_efatura_referans(db: Session, alici_unvani: str):
 
 # --- Nakit CRUD ---
 def get_nakit(db: Session, nakit_id: int):
-    return db.query(models.Nakit).filter(models.Nakit.Nakit_ID == nakit_id).first()
+    return image_store.load_imaj(db.query(models.Nakit).filter(models.Nakit.Nakit_ID == nakit_id).first())
 
 from typing import List, Optional
 
-def get_nakit_entries(db: Session, skip: int = 0, limit: int = 10000, sube_id: Optional[int] = None):
-    query = db.query(models.Nakit)
-    if sube_id:
-        query = query.filter(models.Nakit.Sube_ID == sube_id)
-    return query.offset(skip).limit(limit).all()
+def get_nakit_entries(db: Session, skip: int = 0, limit: int = 10000, after_id: Optional[int] = None, **filters):
+    query = with_image_metadata(db.query(models.Nakit), models.Nakit)
+    query = apply_list_filters(query, models.Nakit, models.Nakit.Tarih, **filters)
+    return attach_image_metadata(apply_keyset(query, models.Nakit.Nakit_ID, after_id, limit).offset(skip).all())
 
 def create_nakit(db: Session, nakit: nakit.NakitCreate):
     db_nakit = models.Nakit(**nakit.dict())
     db.add(db_nakit)
     db.commit()
     db.refresh(db_nakit)
-    return db_nakit
+    return image_store.load_imaj(db_nakit)
 
 def update_nakit(db: Session, nakit_id: int, nakit: nakit.NakitUpdate):
     db_nakit = db.query(models.Nakit).filter(models.Nakit.Nakit_ID == nakit_id).first()
@@ -1150,7 +1388,7 @@ def update_nakit(db: Session, nakit_id: int, nakit: nakit.NakitUpdate):
             setattr(db_nakit, key, value)
         db.commit()
         db.refresh(db_nakit)
-    return db_nakit
+    return image_store.load_imaj(db_nakit)
 
 def delete_nakit(db: Session, nakit_id: int):
     db_nakit = db.query(models.Nakit).filter(models.Nakit.Nakit_ID == nakit_id).first()
@@ -1162,12 +1400,13 @@ def delete_nakit(db: Session, nakit_id: int):
 # --- YemekCeki CRUD ---
 def get_yemek_ceki(db: Session, yemek_ceki_id: int):
     yemek_ceki = db.query(models.YemekCeki).filter(models.YemekCeki.ID == yemek_ceki_id).first()
+    image_store.load_imaj(yemek_ceki)
     if yemek_ceki and yemek_ceki.Imaj is not None:
         yemek_ceki.Imaj = base64.b64encode(yemek_ceki.Imaj).decode('utf-8')
     return yemek_ceki
 
-def get_yemek_cekiler(db: Session, skip: int = 0, limit: int = 100):
-    results = db.query(
+def get_yemek_cekiler(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, **filters):
+    query = db.query(
         models.YemekCeki.ID,
         models.YemekCeki.Kategori_ID,
         models.YemekCeki.Tarih,
@@ -1177,9 +1416,11 @@ def get_yemek_cekiler(db: Session, skip: int = 0, limit: int = 100):
         models.YemekCeki.Son_Tarih,
         models.YemekCeki.Sube_ID,
         models.YemekCeki.Imaj_Adi,
-        (models.YemekCeki.Imaj != None).label('has_imaj')
-    ).offset(skip).limit(limit).all()
-    return results
+        models.YemekCeki.Imaj_Hash,
+        *image_metadata_columns(models.YemekCeki)
+    )
+    query = apply_list_filters(query, models.YemekCeki, models.YemekCeki.Tarih, **filters)
+    return apply_keyset(query, models.YemekCeki.ID, after_id, limit).offset(skip).all()
 
 async def create_yemek_ceki(db: Session, yemek_ceki_data: yemek_ceki.YemekCekiCreate):
     yemek_ceki_dict = yemek_ceki_data.dict(exclude_unset=True)
@@ -1189,6 +1430,7 @@ async def create_yemek_ceki(db: Session, yemek_ceki_data: yemek_ceki.YemekCekiCr
     db.commit()
     db.refresh(db_yemek_ceki)
     
+    image_store.load_imaj(db_yemek_ceki)
     if db_yemek_ceki.Imaj is not None:
         db_yemek_ceki.Imaj = base64.b64encode(db_yemek_ceki.Imaj).decode('utf-8')
         
@@ -1214,6 +1456,7 @@ async def update_yemek_ceki(db: Session, yemek_ceki_id: int, yemek_ceki_data: ye
         db.commit()
         db.refresh(db_yemek_ceki)
         
+        image_store.load_imaj(db_yemek_ceki)
         if db_yemek_ceki.Imaj is not None:
             db_yemek_ceki.Imaj = base64.b64encode(db_yemek_ceki.Imaj).decode('utf-8')
             
@@ -1230,8 +1473,9 @@ def delete_yemek_ceki(db: Session, yemek_ceki_id: int):
 def get_odeme(db: Session, odeme_id: int):
     return db.query(models.Odeme).filter(models.Odeme.Odeme_ID == odeme_id).first()
 
-def get_odemeler(db: Session, skip: int = 0, limit: int | None = None):
-    return db.query(models.Odeme).all()
+def get_odemeler(db: Session, skip: int = 0, limit: int | None = None, after_id: Optional[int] = None, columns: Optional[list] = None, **filters):
+    query = apply_list_filters(db.query(*(columns or [models.Odeme])), models.Odeme, models.Odeme.Tarih, **filters)
+    return apply_keyset(query, models.Odeme.Odeme_ID, after_id, limit).offset(skip).all()
 
 def create_odeme(db: Session, odeme: odeme.OdemeCreate):
     db_odeme = models.Odeme(**odeme.dict())
@@ -1249,31 +1493,110 @@ def get_odeme_by_unique_fields(db: Session, odeme_data: odeme.OdemeCreate):
         models.Odeme.Sube_ID == odeme_data.Sube_ID
     ).first()
 
-def create_odemeler_bulk(db: Session, odemeler: List[odeme.OdemeCreate]):
-    added_count = 0
-    skipped_count = 0
-    logger.info(f"Starting bulk create of Odeme for {len(odemeler)} records.")
-    
+ODEME_INSERT_CHUNK = 500
+
+def _odeme_key(tarih, hesap_adi, aciklama, tutar, sube_id):
+    return (tarih, hesap_adi, aciklama, Decimal(str(tutar)).quantize(Decimal("0.01")), sube_id)
+
+def split_new_odemeler(db: Session, odemeler: List[odeme.OdemeCreate], seen: Optional[set] = None):
+    """
+    Splits bank lines into those not in Odeme yet and duplicates, i.e. lines
+    already in the table or repeated in the list. Existing (Tarih, Hesap_Adi,
+    Aciklama, Tutar, Sube_ID) keys are prefetched with one query over the
+    lines' date window. Writes nothing. seen collects the keys of the new
+    lines across calls, as for split_new_b2b_ekstreler.
+    """
+    if not odemeler:
+        return [], []
+
+    existing = {
+        _odeme_key(*row) for row in db.query(
+            models.Odeme.Tarih,
+            models.Odeme.Hesap_Adi,
+            models.Odeme.Aciklama,
+            models.Odeme.Tutar,
+            models.Odeme.Sube_ID
+        ).filter(
+            models.Odeme.Sube_ID.in_({o.Sube_ID for o in odemeler}),
+            models.Odeme.Tarih.between(min(o.Tarih for o in odemeler), max(o.Tarih for o in odemeler))
+        )
+    }
+
+    seen = set() if seen is None else seen
+    new_odemeler = []
+    duplicates = []
     for odeme_data in odemeler:
-        existing_odeme = get_odeme_by_unique_fields(db, odeme_data)
-        if existing_odeme:
-            logger.info(f"Skipping existing record: {odeme_data.Aciklama[:30]}")
-            skipped_count += 1
+        key = _odeme_key(odeme_data.Tarih, odeme_data.Hesap_Adi, odeme_data.Aciklama, odeme_data.Tutar, odeme_data.Sube_ID)
+        if key in existing or key in seen:
+            duplicates.append(odeme_data)
             continue
-        
-        db_odeme = models.Odeme(**odeme_data.dict())
-        db.add(db_odeme)
-        added_count += 1
-    
+        seen.add(key)
+        new_odemeler.append(odeme_data)
+    return new_odemeler, duplicates
+
+def create_odemeler_bulk(db: Session, odemeler: List[odeme.OdemeCreate]):
+    """
+    Inserts the bank lines that are not in Odeme yet, as split_new_odemeler
+    finds them, with multi-row INSERTs in one transaction.
+    """
+    logger.info(f"Starting bulk create of Odeme for {len(odemeler)} records.")
+    if not odemeler:
+        return {"added": 0, "skipped": 0}
+
+    new_odemeler, duplicates = split_new_odemeler(db, odemeler)
+    for odeme_data in duplicates:
+        logger.info(f"Skipping existing record: {(odeme_data.Aciklama or '')[:30]}")
+    rows = [odeme_data.dict() for odeme_data in new_odemeler]
+
     try:
+        for chunk in chunked(rows, ODEME_INSERT_CHUNK):
+            db.execute(insert(models.Odeme).values(chunk))
+        for sube_id, donem in {(row["Sube_ID"], row["Donem"]) for row in rows}:
+            versioning.bump_table_version(db, models.Odeme.__tablename__, sube_id, donem)
         db.commit()
-        logger.info(f"Successfully committed {added_count} new Odeme records.")
+        logger.info(f"Successfully committed {len(rows)} new Odeme records.")
     except Exception as e:
         logger.error(f"Error committing Odeme records: {e}")
         db.rollback()
         raise
-        
-    return {"added": added_count, "skipped": skipped_count}
+
+    return {"added": len(rows), "skipped": len(duplicates)}
+
+def reclassify_odemeler(db: Session, sube_id: Optional[int] = None, donem: Optional[int] = None, only_uncategorized: bool = True):
+    """
+    Re-runs the Odeme_Referans categorization over stored payments, e.g. after
+    new references were added. Payments whose description matches no active
+    reference keep their category; with only_uncategorized only rows without
+    a Kategori_ID are touched.
+    """
+    matcher = odeme_matcher.get_matcher(db)
+    query = db.query(models.Odeme.Odeme_ID, models.Odeme.Aciklama, models.Odeme.Kategori_ID, models.Odeme.Sube_ID, models.Odeme.Donem)
+    if sube_id is not None:
+        query = query.filter(models.Odeme.Sube_ID == sube_id)
+    if donem is not None:
+        query = query.filter(models.Odeme.Donem == donem)
+    if only_uncategorized:
+        query = query.filter(models.Odeme.Kategori_ID.is_(None))
+
+    checked = 0
+    changes = []
+    scopes = set()
+    for row in query.yield_per(IN_CLAUSE_CHUNK):
+        checked += 1
+        kategori_id = matcher.kategori_for(row.Aciklama)
+        if kategori_id is not None and kategori_id != row.Kategori_ID:
+            changes.append({"odeme_id": row.Odeme_ID, "kategori_id": kategori_id})
+            scopes.add((row.Sube_ID, row.Donem))
+
+    statement = update(models.Odeme).where(models.Odeme.Odeme_ID == bindparam("odeme_id")).values(Kategori_ID=bindparam("kategori_id"))
+    for chunk in chunked(changes, ODEME_INSERT_CHUNK):
+        db.connection().execute(statement, chunk)
+    for scope_sube_id, scope_donem in scopes:
+        versioning.bump_table_version(db, models.Odeme.__tablename__, scope_sube_id, scope_donem)
+    db.commit()
+
+    logger.info(f"Reclassified {len(changes)} of {checked} Odeme records.")
+    return {"checked": checked, "updated": len(changes)}
 
 def update_odeme(db: Session, odeme_id: int, odeme: odeme.OdemeUpdate):
     db_odeme = db.query(models.Odeme).filter(models.Odeme.Odeme_ID == odeme_id).first()
@@ -1619,8 +1942,9 @@ def get_pos_kontrol_dashboard_data(db: Session, sube_id: int, donem: int, skip:
 def get_pos_hareket(db: Session, pos_id: int):
     return db.query(models.POSHareketleri).filter(models.POSHareketleri.ID == pos_id).first()
 
-def get_pos_hareketleri(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.POSHareketleri).offset(skip).limit(limit).all()
+def get_pos_hareketleri(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, **filters):
+    query = apply_list_filters(db.query(models.POSHareketleri), models.POSHareketleri, models.POSHareketleri.Islem_Tarihi, **filters)
+    return apply_keyset(query, models.POSHareketleri.ID, after_id, limit).offset(skip).all()
 
 def is_duplicate_pos_hareket(db: Session, pos_hareket: pos_hareketleri.POSHareketleriCreate):
     """
@@ -1699,44 +2023,143 @@ def delete_pos_hareket(db: Session, pos_id: int):
         db.commit()
     return db_pos
 
+POS_HAREKET_KEY = ["Islem_Tarihi", "Hesaba_Gecis", "Para_Birimi", "Islem_Tutari", "Sube_ID"]
+POS_HAREKET_AMOUNTS = ["Islem_Tutari", "Kesinti_Tutari", "Net_Tutar"]
+POS_HAREKET_INSERT_CHUNK = 500
+
+def _pos_frame_to_kurus(frame):
+    """Amounts as integer kuruş so file values and stored DECIMAL(15, 2) values compare exactly."""
+    for column in POS_HAREKET_AMOUNTS:
+        frame[column] = (frame[column] * 100).round().astype("int64")
+    return frame
+
+def validate_pos_hareketleri_frame(frame):
+    """
+    Coerces a frame with the POS_Hareketleri column names to typed columns and
+    drops the rows the POSHareketleriCreate schema would reject. Kesinti_Tutari
+    defaults to 0 and Net_Tutar to Islem_Tutari - Kesinti_Tutari.
+    Returns (valid rows with amounts in kuruş, number of rejected rows).
+    """
+    frame = pd.DataFrame({
+        "Islem_Tarihi": pd.to_datetime(frame["Islem_Tarihi"], dayfirst=True, errors="coerce").dt.normalize(),
+        "Hesaba_Gecis": pd.to_datetime(frame["Hesaba_Gecis"], dayfirst=True, errors="coerce").dt.normalize(),
+        "Para_Birimi": frame["Para_Birimi"].astype("string").str.strip(),
+        "Islem_Tutari": pd.to_numeric(frame["Islem_Tutari"], errors="coerce"),
+        "Kesinti_Tutari": pd.to_numeric(frame.get("Kesinti_Tutari", pd.Series(0.0, index=frame.index)), errors="coerce").fillna(0.0),
+        "Net_Tutar": pd.to_numeric(frame.get("Net_Tutar", pd.Series(float("nan"), index=frame.index)), errors="coerce"),
+        "Sube_ID": frame["Sube_ID"],
+    })
+    frame["Net_Tutar"] = frame["Net_Tutar"].fillna(frame["Islem_Tutari"] - frame["Kesinti_Tutari"])
+
+    valid = (
+        frame["Islem_Tarihi"].notna()
+        & frame["Hesaba_Gecis"].notna()
+        & frame["Para_Birimi"].str.len().between(1, 5).fillna(False).astype(bool)
+        & frame["Islem_Tutari"].notna()
+        & frame["Sube_ID"].notna()
+        & (frame["Kesinti_Tutari"] >= 0)
+        & (frame["Net_Tutar"] >= 0)
+        & (frame["Islem_Tutari"] >= frame["Kesinti_Tutari"])
+    )
+    frame = frame[valid].copy()
+    frame["Sube_ID"] = frame["Sube_ID"].astype("int64")
+    return _pos_frame_to_kurus(frame), int((~valid).sum())
+
+def split_new_pos_hareketleri(db: Session, frame, written=None):
+    """
+    Splits validated rows (amounts in kuruş) into those not in POS_Hareketleri
+    yet and duplicates, i.e. rows whose key is already in the table. Rows
+    repeated within the file are real, identical sales and are all kept. The
+    existing keys of the frame's branches and date range are fetched once and
+    anti-joined away. written, a Counter of the keys earlier chunks of the same
+    file inserted, keeps those rows from counting as already stored. Writes
+    nothing.
+    """
+    if frame.empty:
+        return frame, frame
+
+    key_columns = [getattr(models.POSHareketleri, column) for column in POS_HAREKET_KEY]
+    existing = pd.DataFrame(
+        db.query(*key_columns, func.count()).filter(
+            models.POSHareketleri.Sube_ID.in_(frame["Sube_ID"].unique().tolist()),
+            models.POSHareketleri.Islem_Tarihi.between(frame["Islem_Tarihi"].min().date(), frame["Islem_Tarihi"].max().date())
+        ).group_by(*key_columns).all(),
+        columns=POS_HAREKET_KEY + ["Adet"]
+    )
+    if not existing.empty:
+        existing["Islem_Tarihi"] = pd.to_datetime(existing["Islem_Tarihi"])
+        existing["Hesaba_Gecis"] = pd.to_datetime(existing["Hesaba_Gecis"])
+        existing["Para_Birimi"] = existing["Para_Birimi"].astype("string")
+        existing["Islem_Tutari"] = (existing["Islem_Tutari"].astype(float) * 100).round().astype("int64")
+        existing["Sube_ID"] = existing["Sube_ID"].astype("int64")
+        if written:
+            existing["Adet"] -= [written.get(key, 0) for key in zip(*(existing[column] for column in POS_HAREKET_KEY))]
+            existing = existing[existing["Adet"] > 0]
+    if existing.empty:
+        return frame, frame.iloc[0:0]
+
+    merged = frame.merge(existing[POS_HAREKET_KEY], on=POS_HAREKET_KEY, how="left", indicator=True)
+    duplicates = merged[merged["_merge"] == "both"].drop(columns="_merge")
+    return merged[merged["_merge"] == "left_only"].drop(columns="_merge"), duplicates
+
+def pos_hareketleri_records(frame) -> List[dict]:
+    """Turns validated rows (amounts in kuruş) back into POS_Hareketleri column values."""
+    return [
+        {
+            "Islem_Tarihi": islem_tarihi.date(),
+            "Hesaba_Gecis": hesaba_gecis.date(),
+            "Para_Birimi": para_birimi,
+            "Islem_Tutari": Decimal(int(islem_tutari)).scaleb(-2),
+            "Kesinti_Tutari": Decimal(int(kesinti_tutari)).scaleb(-2),
+            "Net_Tutar": Decimal(int(net_tutar)).scaleb(-2),
+            "Sube_ID": int(sube_id),
+        }
+        for islem_tarihi, hesaba_gecis, para_birimi, islem_tutari, kesinti_tutari, net_tutar, sube_id in zip(
+            frame["Islem_Tarihi"], frame["Hesaba_Gecis"], frame["Para_Birimi"], frame["Islem_Tutari"],
+            frame["Kesinti_Tutari"], frame["Net_Tutar"], frame["Sube_ID"]
+        )
+    ]
+
+def create_pos_hareketleri_from_frame(db: Session, frame, see_dates=None, written=None):
+    """
+    Imports a POS statement held in a DataFrame without leaving pandas: rows
+    are validated with column operations, duplicates are split off with
+    split_new_pos_hareketleri, and the remaining rows are written with
+    multi-row INSERTs in one transaction. see_dates, if given, is called with
+    the Islem_Tarihi column of the valid rows.
+    A file imported in several chunks passes the same written Counter to each
+    call, so its own rows from earlier chunks are not taken for duplicates.
+    """
+    frame, skipped_count = validate_pos_hareketleri_frame(frame)
+    if see_dates is not None:
+        see_dates(frame["Islem_Tarihi"])
+    if frame.empty:
+        return {"added": 0, "skipped": skipped_count}
+
+    frame, duplicates = split_new_pos_hareketleri(db, frame, written)
+    skipped_count += len(duplicates)
+
+    records = pos_hareketleri_records(frame)
+    try:
+        for chunk in chunked(records, POS_HAREKET_INSERT_CHUNK):
+            db.execute(insert(models.POSHareketleri).values(chunk))
+        for sube_id in {record["Sube_ID"] for record in records}:
+            versioning.bump_table_version(db, models.POSHareketleri.__tablename__, sube_id)
+        db.commit()
+    except Exception as e:
+        logger.error(f"Error committing POS_Hareketleri records: {e}")
+        db.rollback()
+        raise
+    if written is not None:
+        written.update(zip(*(frame[column] for column in POS_HAREKET_KEY)))
+
+    logger.info(f"Imported {len(records)} POS_Hareketleri rows, skipped {skipped_count}.")
+    return {"added": len(records), "skipped": skipped_count}
+
 def create_pos_hareketleri_bulk(db: Session, pos_hareketleri_list: List[pos_hareketleri.POSHareketleriCreate]):
-    added_count = 0
-    skipped_count = 0
-    
-    for pos_hareket in pos_hareketleri_list:
-        try:
-            # Check for duplicates
-            if is_duplicate_pos_hareket(db, pos_hareket):
-                skipped_count += 1
-                continue
-            
-            # Calculate Net_Tutar if not provided
-            net_tutar = pos_hareket.Net_Tutar
-            if net_tutar is None:
-                net_tutar = pos_hareket.Islem_Tutari - pos_hareket.Kesinti_Tutari
-            
-            # Validate that Islem_Tutari >= Kesinti_Tutari
-            if pos_hareket.Islem_Tutari < pos_hareket.Kesinti_Tutari:
-                skipped_count += 1
-                continue
-            
-            db_pos_hareket = models.POSHareketleri(
-                Islem_Tarihi=pos_hareket.Islem_Tarihi,
-                Hesaba_Gecis=pos_hareket.Hesaba_Gecis,
-                Para_Birimi=pos_hareket.Para_Birimi,
-                Islem_Tutari=pos_hareket.Islem_Tutari,
-                Kesinti_Tutari=pos_hareket.Kesinti_Tutari,
-                Net_Tutar=net_tutar,
-                Sube_ID=pos_hareket.Sube_ID
-            )
-            db.add(db_pos_hareket)
-            added_count += 1
-        except Exception as e:
-            skipped_count += 1
-            continue
-    
-    db.commit()
-    return {"added": added_count, "skipped": skipped_count}
+    if not pos_hareketleri_list:
+        return {"added": 0, "skipped": 0}
+    return create_pos_hareketleri_from_frame(db, pd.DataFrame([pos_hareket.dict() for pos_hareket in pos_hareketleri_list]))
 
 # --- OdemeReferans CRUD ---
 def get_odeme_referans(db: Session, referans_id: int):
@@ -2533,67 +2956,106 @@ def get_odeme_rapor(db: Session, donem_list: Optional[List[int]] = None, kategor
         )
         return empty_response
 
-import pandas as pd
 from fastapi import UploadFile
 
 
+def _parse_date_cell(value):
+    for parse in (lambda: pd.to_datetime(value), lambda: pd.to_datetime(str(value), format='%d-%m-%Y %H:%M:%S')):
+        try:
+            return parse()
+        except (ValueError, TypeError, OverflowError):
+            pass
+    return pd.NaT
+
+def _apply_tabak_sayisi_chunk(db: Session, df, tarih_col: str, tabak_col: str, sube_id: int, first_row: int):
+    """Applies one chunk of the Tabak Sayisi sheet; returns (updated dates, unmatched dates, errors)."""
+    # One format is inferred for the whole column; cells written in another
+    # format are parsed one by one, as every cell was before
+    tarihler = pd.to_datetime(df[tarih_col], errors='coerce')
+    unparsed = tarihler.isna() & df[tarih_col].notna()
+    if unparsed.any():
+        tarihler[unparsed] = [_parse_date_cell(value) for value in df.loc[unparsed, tarih_col]]
+    tabaklar = pd.to_numeric(df[tabak_col], errors='coerce')
+
+    invalid = tarihler.isna() | tabaklar.isna()
+    errors = [
+        f"Row {first_row + position}: invalid {'date' if pd.isna(tarihler.iloc[position]) else 'plate count'}"
+        for position in invalid.to_numpy().nonzero()[0]
+    ]
+
+    # The last line of a day wins, as when the rows were applied one by one
+    counts = pd.Series(tabaklar[~invalid].astype("int64").to_numpy(), index=tarihler[~invalid].dt.date)
+    counts = counts[~counts.index.duplicated(keep='last')]
+    if counts.empty:
+        return set(), set(), errors
+
+    records = {
+        tarih: (gelir_ekstra_id, tabak_sayisi)
+        for gelir_ekstra_id, tarih, tabak_sayisi in db.query(
+            models.GelirEkstra.GelirEkstra_ID, models.GelirEkstra.Tarih, models.GelirEkstra.Tabak_Sayisi
+        ).filter(
+            models.GelirEkstra.Sube_ID == sube_id,
+            models.GelirEkstra.Tarih.between(min(counts.index), max(counts.index))
+        )
+    }
+    mappings = [
+        {"GelirEkstra_ID": records[tarih][0], "Tabak_Sayisi": int(tabak_sayisi)}
+        for tarih, tabak_sayisi in counts.items()
+        if tarih in records and records[tarih][1] != tabak_sayisi
+    ]
+    if mappings:
+        db.bulk_update_mappings(models.GelirEkstra, mappings)
+        versioning.bump_table_version(db, models.GelirEkstra.__tablename__, sube_id)
+    db.commit()
+    return set(counts.index) & set(records), set(counts.index) - set(records), errors
+
 def process_tabak_sayisi_excel(db: Session, file: UploadFile, sube_id: int):
+    """
+    Copies the daily plate counts of an Excel export into GelirEkstra.Tabak_Sayisi.
+    The sheet is streamed in UPLOAD_CHUNK_ROWS row chunks; for each chunk the
+    date column is parsed in one pass, the branch's GelirEkstra rows for its
+    date range are fetched once, and the changed counts are written with a
+    single bulk update. Dates without a GelirEkstra row are reported.
+    """
     try:
-        df = pd.read_excel(file.file, header=0)  # Assuming the first row is the header
-
-        # Strip any whitespace from column names
-        df.columns = [col.strip() for col in df.columns]
-        print(f"Excel columns: {df.columns}")
-
-        # Find the required columns dynamically
-        tarih_col = next((col for col in df.columns if 'Tarih' in col), None)
-        tabak_col = next((col for col in df.columns if 'Toplam Tabak' in col), None)
-
-        if not tarih_col or not tabak_col:
-            missing = []
-            if not tarih_col: missing.append("'Tarih' içeren bir sütun")
-            if not tabak_col: missing.append("'Toplam Tabak' içeren bir sütun")
-            return {"error": f"Excel dosyasında gerekli sütunlar eksik: {', '.join(missing)}"}
-
-        updated_count = 0  
-        not_found_count = 0  
-        errors = []  
-
-        for index, row in df.iterrows():  
-            try:  
-                plate_count = row[tabak_col]
-                # Try to parse the date with multiple formats
-                try:
-                    event_date = pd.to_datetime(row[tarih_col]).date()
-                except Exception:
-                    event_date = pd.to_datetime(row[tarih_col], format='%%d-%%m-%%Y %%H:%%M:%%S').date()  
-
-                gelir_ekstra_record = db.query(models.GelirEkstra).filter(  
-                    models.GelirEkstra.Sube_ID == sube_id,  
-                    models.GelirEkstra.Tarih == event_date  
-                ).first()  
-  
-                if gelir_ekstra_record:  
-                    gelir_ekstra_record.Tabak_Sayisi = int(plate_count)  
-                    updated_count += 1  
-                else:  
-                    not_found_count += 1  
-  
-            except Exception as e:  
-                errors.append(f"Row {index + 2}: {str(e)}")  
-  
-        db.commit()  
-  
-        return {  
-            "message": "File processed successfully.",  
-            "updated_records": updated_count,  
-            "records_not_found": not_found_count,  
-            "errors": errors  
-        }  
-  
-    except Exception as e:  
-        db.rollback()  
-        return {"error": f"Failed to process Excel file: {str(e)}"}  
+        updated = set()
+        unmatched = set()
+        errors = []
+        tarih_col = tabak_col = None
+        first_row = 2  # Row 1 is the header
+        for df in uploads.iter_excel_frames(file.file):
+            # Strip any whitespace from column names
+            df.columns = [str(col).strip() for col in df.columns]
+
+            if tarih_col is None or tabak_col is None:
+                # Find the required columns dynamically
+                tarih_col = next((col for col in df.columns if 'Tarih' in col), None)
+                tabak_col = next((col for col in df.columns if 'Toplam Tabak' in col), None)
+
+                if not tarih_col or not tabak_col:
+                    missing = []
+                    if not tarih_col: missing.append("'Tarih' içeren bir sütun")
+                    if not tabak_col: missing.append("'Toplam Tabak' içeren bir sütun")
+                    return {"error": f"Excel dosyasında gerekli sütunlar eksik: {', '.join(missing)}"}
+
+            chunk_updated, chunk_unmatched, chunk_errors = _apply_tabak_sayisi_chunk(db, df, tarih_col, tabak_col, sube_id, first_row)
+            updated |= chunk_updated
+            unmatched |= chunk_unmatched
+            errors.extend(chunk_errors)
+            first_row += len(df)
+
+        unmatched -= updated
+        return {
+            "message": "File processed successfully.",
+            "updated_records": len(updated),
+            "records_not_found": len(unmatched),
+            "unmatched_dates": [tarih.isoformat() for tarih in sorted(unmatched)],
+            "errors": errors
+        }
+
+    except Exception as e:
+        db.rollback()
+        return {"error": f"Failed to process Excel file: {str(e)}"}
 
 def get_depo_kira_rapor(db: Session, year: int, sube_id: int):
     from sqlalchemy import text
@@ -3063,6 +3525,141 @@ def get_yemek_ceki_donem_toplam(db: Session, donem: int, sube_id: int) -> float:
     
     return result or 0.0
 
+# Figures of the Özet Kontrol Raporu, in the order the report page shows them
+OZET_KONTROL_KALEMLERI = [
+    "robotpos_tutar", "toplam_satis_gelirleri", "nakit", "gunluk_harcama_efatura", "gunluk_harcama_diger",
+    "nakit_girisi_toplam", "bankaya_yatan", "gelir_pos", "pos_hareketleri", "gelir_toplam", "virman_toplam",
+    "aylik_gelir", "toplam_donem",
+]
+
+def _yymm(date_column):
+    # YYMM Donem of a date; extract() renders on both MySQL and SQLite
+    return (func.extract("year", date_column) % literal_column("100")) * literal_column("100") + func.extract("month", date_column)
+
+def _ozet_kontrol_part(sube_column, donem_column, **sums):
+    """One table's contribution to the report: its figures summed per branch and period, zero for the rest."""
+    # A constant Donem, as the Yemek Çeki parts use, is bound and not grouped on
+    return select(
+        sube_column.label("Sube_ID"),
+        donem_column.label("Donem"),
+        *[sums.get(kalem, literal_column("0")).label(kalem) for kalem in OZET_KONTROL_KALEMLERI]
+    ).group_by(sube_column, *([] if isinstance(donem_column, BindParameter) else [donem_column]))
+
+def get_ozet_kontrol_raporlari(db: Session, sube_ids: List[int], donemler: List[int]) -> List[dict]:
+    """
+    Computes all Özet Kontrol Raporu figures for every branch and period
+    combination in one statement. Each table is scanned once over the date
+    range the periods span, its figures are taken with conditional sums, and
+    categories are matched by name in the same query. Periods may be YYMM or
+    YYYYMM; rows come back in Sube_ID, Donem order with Donem as YYMM.
+    """
+    donemler = sorted({int(str(donem)[2:]) if len(str(donem)) == 6 else int(donem) for donem in donemler})
+    sube_ids = sorted(set(sube_ids))
+    if not donemler or not sube_ids:
+        return []
+
+    first, last = donemler[0], donemler[-1]
+    start = date(2000 + first // 100, first % 100, 1)
+    end = date(2000 + last // 100 + (last % 100) // 12, (last % 100) % 12 + 1, 1)
+
+    def in_range(date_column):
+        return and_(date_column >= start, date_column < end, _yymm(date_column).in_(donemler))
+
+    def tutar_if(condition, column):
+        return func.sum(case((condition, column), else_=0))
+
+    gelir_donem = _yymm(models.Gelir.Tarih)
+    ust_kategori = models.UstKategori.UstKategori_Adi
+    parts = [
+        _ozet_kontrol_part(
+            models.GelirEkstra.Sube_ID, _yymm(models.GelirEkstra.Tarih),
+            robotpos_tutar=func.sum(models.GelirEkstra.RobotPos_Tutar)
+        ).where(models.GelirEkstra.Sube_ID.in_(sube_ids), in_range(models.GelirEkstra.Tarih)),
+        _ozet_kontrol_part(
+            models.Gelir.Sube_ID, gelir_donem,
+            toplam_satis_gelirleri=tutar_if(ust_kategori.in_(['E-Ticaret Kredi Kart', 'Kredi Kartı', 'Nakit', 'Yemek Çeki']), models.Gelir.Tutar),
+            nakit=tutar_if(ust_kategori == 'Nakit', models.Gelir.Tutar),
+            gelir_pos=tutar_if(models.Kategori.Kategori_Adi == 'POS', models.Gelir.Tutar),
+            gelir_toplam=tutar_if(ust_kategori == 'E-Ticaret Kredi Kart', models.Gelir.Tutar),
+            aylik_gelir=tutar_if(ust_kategori == 'Yemek Çeki', models.Gelir.Tutar),
+        ).select_from(models.Gelir).join(
+            models.Kategori, models.Kategori.Kategori_ID == models.Gelir.Kategori_ID
+        ).outerjoin(
+            models.UstKategori, models.UstKategori.UstKategori_ID == models.Kategori.Ust_Kategori_ID
+        ).where(models.Gelir.Sube_ID.in_(sube_ids), in_range(models.Gelir.Tarih)),
+        _ozet_kontrol_part(
+            models.EFatura.Sube_ID, models.EFatura.Donem,
+            gunluk_harcama_efatura=func.sum(models.EFatura.Tutar)
+        ).where(models.EFatura.Sube_ID.in_(sube_ids), models.EFatura.Donem.in_(donemler), models.EFatura.Gunluk_Harcama == True),
+        _ozet_kontrol_part(
+            models.DigerHarcama.Sube_ID, models.DigerHarcama.Donem,
+            gunluk_harcama_diger=func.sum(models.DigerHarcama.Tutar)
+        ).where(models.DigerHarcama.Sube_ID.in_(sube_ids), models.DigerHarcama.Donem.in_(donemler), models.DigerHarcama.Gunluk_Harcama == True),
+        _ozet_kontrol_part(
+            models.Nakit.Sube_ID, models.Nakit.Donem,
+            nakit_girisi_toplam=func.sum(models.Nakit.Tutar)
+        ).where(models.Nakit.Sube_ID.in_(sube_ids), models.Nakit.Donem.in_(donemler), models.Nakit.Tip == 'Bankaya Yatan'),
+        _ozet_kontrol_part(
+            models.Odeme.Sube_ID, models.Odeme.Donem,
+            bankaya_yatan=func.sum(models.Odeme.Tutar)
+        ).select_from(models.Odeme).join(
+            models.Kategori, models.Kategori.Kategori_ID == models.Odeme.Kategori_ID
+        ).where(models.Odeme.Sube_ID.in_(sube_ids), models.Odeme.Donem.in_(donemler), models.Kategori.Kategori_Adi == 'ATM Para Yatırma'),
+        _ozet_kontrol_part(
+            models.POSHareketleri.Sube_ID, _yymm(models.POSHareketleri.Islem_Tarihi),
+            pos_hareketleri=func.sum(models.POSHareketleri.Islem_Tutari)
+        ).where(models.POSHareketleri.Sube_ID.in_(sube_ids), in_range(models.POSHareketleri.Islem_Tarihi)),
+        _ozet_kontrol_part(
+            models.B2BEkstre.Sube_ID, models.B2BEkstre.Donem,
+            virman_toplam=-func.sum(models.B2BEkstre.Alacak)
+        ).where(models.B2BEkstre.Sube_ID.in_(sube_ids), models.B2BEkstre.Donem.in_(donemler), models.B2BEkstre.Aciklama.like('%Online Alacak Virman%')),
+    ]
+
+    # Yemek Çeki for the period: the vouchers valid in it, less the income
+    # booked against them in other periods of their validity
+    for donem in donemler:
+        donem_value = literal(donem)
+        aktif = and_(
+            models.YemekCeki.Sube_ID.in_(sube_ids),
+            _yymm(models.YemekCeki.Ilk_Tarih) <= donem_value,
+            _yymm(models.YemekCeki.Son_Tarih) >= donem_value
+        )
+        parts.append(_ozet_kontrol_part(
+            models.YemekCeki.Sube_ID, donem_value,
+            toplam_donem=func.sum(models.YemekCeki.Tutar)
+        ).where(aktif))
+        parts.append(_ozet_kontrol_part(
+            models.YemekCeki.Sube_ID, donem_value,
+            toplam_donem=-func.sum(models.Gelir.Tutar)
+        ).select_from(models.YemekCeki).join(models.Gelir, and_(
+            models.Gelir.Kategori_ID == models.YemekCeki.Kategori_ID,
+            models.Gelir.Sube_ID == models.YemekCeki.Sube_ID,
+            models.Gelir.Tarih >= models.YemekCeki.Ilk_Tarih,
+            models.Gelir.Tarih <= models.YemekCeki.Son_Tarih,
+            gelir_donem != donem_value
+        )).where(aktif))
+
+    combined = union_all(*parts).subquery()
+    rows = db.execute(
+        select(combined.c.Sube_ID, combined.c.Donem, *[func.sum(combined.c[kalem]).label(kalem) for kalem in OZET_KONTROL_KALEMLERI])
+        .group_by(combined.c.Sube_ID, combined.c.Donem)
+    ).all()
+    totals = {(int(row.Sube_ID), int(row.Donem)): row for row in rows}
+
+    raporlar = []
+    for sube_id in sube_ids:
+        for donem in donemler:
+            row = totals.get((sube_id, donem))
+            rapor = {"Sube_ID": sube_id, "Donem": donem}
+            for kalem in OZET_KONTROL_KALEMLERI:
+                rapor[kalem] = float(getattr(row, kalem) or 0) if row is not None else 0.0
+            rapor["kalan_nakit"] = rapor["nakit"] - rapor["gunluk_harcama_efatura"] - rapor["gunluk_harcama_diger"]
+            raporlar.append(rapor)
+    return raporlar
+
+def get_ozet_kontrol_raporu_data(db: Session, sube_id: int, donem: int) -> dict:
+    return get_ozet_kontrol_raporlari(db, [sube_id], [donem])[0]
+
 def get_mutabakat_rapor(db: Session):
     from sqlalchemy import text
     sql_query = """
@@ -0,0 +1,165 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock, Timer
+from typing import Iterable, List, Optional, Protocol
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from . import database, models
+
+logger = logging.getLogger(__name__)
+
+
+class Transport(Protocol):
+    def send(self, recipients: List[str], subject: str, body: str) -> str:
+        """Sends one message to all recipients and returns the provider's message id."""
+
+
+# Sends happen on one background thread, so the transport and its client are
+# never used concurrently from this module. A Timer wakes the dispatcher when
+# the earliest retry is due.
+_transport: Optional[Transport] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_timer: Optional[Timer] = None
+_lock = Lock()
+
+
+def get_transport() -> Transport:
+    global _transport
+    with _lock:
+        if _transport is None:
+            # The Google client libraries load when the first email goes out; the
+            # outbox shares send_email's client instead of authorizing a second one
+            from send_email import _transport as gmail_transport
+            _transport = gmail_transport
+        return _transport
+
+
+def set_transport(transport: Optional[Transport]):
+    """Replaces the sender, e.g. with a local fake in tests; None restores the Gmail transport."""
+    global _transport
+    with _lock:
+        _transport = transport
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="email-outbox")
+        return _executor
+
+
+def enqueue(db: Session, recipients: Iterable[str], subject: str, body: str) -> Optional[models.EpostaKuyrugu]:
+    """
+    Queues one message to all recipients and wakes the dispatcher; the caller
+    does not wait for the send. Returns None when there is nobody to send to.
+    """
+    recipients = list(dict.fromkeys(recipient.strip() for recipient in recipients if recipient and recipient.strip()))
+    if not recipients:
+        return None
+    mail = models.EpostaKuyrugu(Alicilar=",".join(recipients), Konu=subject, Icerik=body, Durum="queued")
+    db.add(mail)
+    db.commit()
+    db.refresh(mail)
+    wake(db.get_bind())
+    return mail
+
+
+def wake(bind=None):
+    _get_executor().submit(dispatch_pending, bind)
+
+
+def requeue_interrupted(bind=None) -> int:
+    """
+    Puts emails left in "sending" for EMAIL_SENDING_STALE_MINUTES back in the
+    queue; the process sending them stopped before it recorded the result.
+    Called at startup before wake(). Returns how many were requeued.
+    """
+    db = database.SessionLocal(bind=bind or database.engine)
+    try:
+        cutoff = datetime.now() - timedelta(minutes=settings.EMAIL_SENDING_STALE_MINUTES)
+        requeued = db.execute(
+            update(models.EpostaKuyrugu)
+            .where(models.EpostaKuyrugu.Durum == "sending",
+                   or_(models.EpostaKuyrugu.Sonraki_Deneme.is_(None), models.EpostaKuyrugu.Sonraki_Deneme < cutoff))
+            .values(Durum="queued", Sonraki_Deneme=None)
+        ).rowcount
+        db.commit()
+    finally:
+        db.close()
+    if requeued:
+        logger.warning(f"Requeued {requeued} email(s) interrupted while sending.")
+    return requeued
+
+
+def _schedule(when: datetime, bind=None):
+    global _timer
+    with _lock:
+        if _timer is not None:
+            _timer.cancel()
+        _timer = Timer(max((when - datetime.now()).total_seconds(), 0), wake, args=(bind,))
+        _timer.daemon = True
+        _timer.start()
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def _set(db: Session, eposta_id: int, **values):
+    db.execute(update(models.EpostaKuyrugu).where(models.EpostaKuyrugu.Eposta_ID == eposta_id).values(**values))
+    db.commit()
+
+
+def dispatch_pending(bind=None) -> int:
+    """
+    Sends the queued emails that are due and returns how many went out. A
+    failed send is retried after EMAIL_RETRY_BASE_SECONDS, doubling each time,
+    and marked failed after EMAIL_MAX_ATTEMPTS.
+    """
+    db = database.SessionLocal(bind=bind or database.engine)
+    sent = 0
+    try:
+        due = [eposta_id for eposta_id, in db.query(models.EpostaKuyrugu.Eposta_ID).filter(
+            models.EpostaKuyrugu.Durum == "queued",
+            or_(models.EpostaKuyrugu.Sonraki_Deneme.is_(None), models.EpostaKuyrugu.Sonraki_Deneme <= datetime.now())
+        ).order_by(models.EpostaKuyrugu.Eposta_ID)]
+
+        for eposta_id in due:
+            # Another process's dispatcher may have taken it meanwhile. While
+            # sending, Sonraki_Deneme holds the claim time for requeue_interrupted
+            claimed = db.execute(
+                update(models.EpostaKuyrugu)
+                .where(models.EpostaKuyrugu.Eposta_ID == eposta_id, models.EpostaKuyrugu.Durum == "queued")
+                .values(Durum="sending", Sonraki_Deneme=datetime.now())
+            ).rowcount
+            db.commit()
+            if not claimed:
+                continue
+
+            mail = db.get(models.EpostaKuyrugu, eposta_id)
+            attempts = mail.Deneme_Sayisi + 1
+            try:
+                get_transport().send(mail.Alicilar.split(","), mail.Konu, mail.Icerik)
+            except Exception as e:
+                failed = attempts >= settings.EMAIL_MAX_ATTEMPTS
+                logger.warning(f"Sending email {eposta_id} failed (attempt {attempts}): {e}")
+                _set(db, eposta_id, Durum="failed" if failed else "queued", Deneme_Sayisi=attempts, Hata=str(e),
+                     Sonraki_Deneme=None if failed else datetime.now() + _backoff(attempts))
+                continue
+            _set(db, eposta_id, Durum="sent", Deneme_Sayisi=attempts, Hata=None, Sonraki_Deneme=None, Gonderim_Tarihi=datetime.now())
+            sent += 1
+
+        next_retry = db.query(func.min(models.EpostaKuyrugu.Sonraki_Deneme)).filter(
+            models.EpostaKuyrugu.Durum == "queued"
+        ).scalar()
+    finally:
+        db.close()
+
+    if next_retry is not None:
+        _schedule(next_retry, bind)
+    return sent
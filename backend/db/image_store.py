@@ -0,0 +1,75 @@
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from core.blob_store import get_blob_store
+from core.config import settings
+from . import database, models
+
+logger = logging.getLogger(__name__)
+
+# Tables whose Imaj column is kept in the blob store; the row only holds Imaj_Hash and Imaj_Boyutu
+IMAGE_MODELS = (models.DigerHarcama, models.Nakit, models.YemekCeki, models.CalisanTalep)
+
+
+def _store_imaj(target, value, oldvalue, initiator):
+    # Uploaded bytes go to the blob store and the column itself stays NULL.
+    # Strings are the base64 copies the crud layer puts on objects for responses.
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        target.Imaj_Hash = get_blob_store().put(data)
+        target.Imaj_Boyutu = len(data)
+        return None
+    if value is None:
+        target.Imaj_Hash = None
+        target.Imaj_Boyutu = None
+    return value
+
+
+for _model in IMAGE_MODELS:
+    event.listen(_model.Imaj, "set", _store_imaj, retval=True)
+
+
+def load_imaj(obj):
+    """
+    Puts the stored image bytes on obj.Imaj for endpoints that still return
+    the image inline. The object is not marked as modified.
+    """
+    if obj is not None and obj.Imaj is None and obj.Imaj_Hash:
+        set_committed_value(obj, "Imaj", get_blob_store().get(obj.Imaj_Hash))
+    return obj
+
+
+def remove_orphan_blobs(db: Session) -> int:
+    """
+    Deletes blobs no row refers to: blobs are stored when Imaj is set, before
+    the row commits, so a rolled back transaction leaves its blob behind, as
+    does replacing or deleting an image. Blobs written in the last
+    BLOB_ORPHAN_MINUTES are kept for transactions still open. Returns how
+    many blobs were deleted.
+    """
+    store = get_blob_store()
+    referenced = set()
+    for model in IMAGE_MODELS:
+        referenced.update(key for key, in db.query(model.Imaj_Hash).filter(model.Imaj_Hash.isnot(None)).distinct())
+    cutoff = datetime.now() - timedelta(minutes=settings.BLOB_ORPHAN_MINUTES)
+    removed = 0
+    for key in list(store.keys(written_before=cutoff)):
+        if key not in referenced:
+            store.delete(key)
+            removed += 1
+    if removed:
+        logger.info(f"Removed {removed} orphaned image blob(s).")
+    return removed
+
+
+def sweep(bind=None):
+    """Runs remove_orphan_blobs in its own session; called at startup."""
+    db = database.SessionLocal(bind=bind or database.engine)
+    try:
+        remove_orphan_blobs(db)
+    finally:
+        db.close()
@@ -0,0 +1,115 @@
+import hashlib
+import logging
+from datetime import date
+from typing import Callable, List, Optional
+
+import pandas as pd
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+
+class ImportScope:
+    """
+    The date span of the file being imported, recorded with its ledger entry.
+    Earlier entries' spans are not used to skip rows: the statement of another
+    account or POS bank can cover the same days for the same branch, so every
+    row of a new file still goes through the per-row duplicate check.
+    """
+
+    def __init__(self):
+        self.first: Optional[date] = None
+        self.last: Optional[date] = None
+
+    def _see(self, first: date, last: date):
+        self.first = first if self.first is None else min(self.first, first)
+        self.last = last if self.last is None else max(self.last, last)
+
+    def see(self, day: date):
+        self._see(day, day)
+
+    def see_dates(self, days: pd.Series):
+        """see() for every date of a datetime64 Series."""
+        if days.notna().any():
+            self._see(days.min().date(), days.max().date())
+
+
+def fingerprint(table_name: str, sube_id: Optional[int], content_digest: str) -> str:
+    return hashlib.sha256(f"{table_name}|{sube_id}|{content_digest}".encode("utf-8")).hexdigest()
+
+
+def _valid_entries(db: Session, table_name: str, sube_id: Optional[int]) -> List[models.AktarimKaydi]:
+    """
+    Ledger entries of a table and branch recorded after the last deletion from
+    it; a row deleted since an import means that file has to run again.
+    """
+    last_deleted = db.query(func.max(models.SilinenKayit.Silinme_Tarihi)).filter(
+        models.SilinenKayit.Tablo_Adi == table_name,
+        or_(models.SilinenKayit.Sube_ID == sube_id, models.SilinenKayit.Sube_ID.is_(None))
+    ).scalar()
+    query = db.query(models.AktarimKaydi).filter(
+        models.AktarimKaydi.Tablo_Adi == table_name,
+        models.AktarimKaydi.Sube_ID == sube_id
+    )
+    if last_deleted is not None:
+        query = query.filter(models.AktarimKaydi.Olusturma_Tarihi > last_deleted)
+    return query.all()
+
+
+def _record(db: Session, table_name: str, sube_id: Optional[int], key: str, scope: ImportScope, counts: dict):
+    values = {
+        "Tablo_Adi": table_name,
+        "Sube_ID": sube_id,
+        "Ilk_Tarih": scope.first,
+        "Son_Tarih": scope.last,
+        "Okunan": counts.get("parsed", 0),
+        "Eklenen": counts.get("added", 0),
+        "Atlanan": counts.get("skipped", 0),
+        "Hatali": counts.get("errored", 0),
+        "Olusturma_Tarihi": func.now(),
+    }
+    try:
+        # An entry invalidated by a later deletion is refreshed in place
+        updated = db.query(models.AktarimKaydi).filter(models.AktarimKaydi.Parmak_Izi == key).update(
+            values, synchronize_session=False
+        )
+        if not updated:
+            db.add(models.AktarimKaydi(Parmak_Izi=key, **values))
+        db.commit()
+    except IntegrityError:
+        # The same file finished on another worker first
+        db.rollback()
+
+
+def counts_of(entry: models.AktarimKaydi) -> dict:
+    return {"parsed": entry.Okunan, "added": entry.Eklenen, "skipped": entry.Atlanan, "errored": entry.Hatali}
+
+
+def lookup(db: Session, table_name: str, sube_id: Optional[int], key: str) -> Optional[models.AktarimKaydi]:
+    """Returns the still valid ledger entry of the file with this fingerprint, if any."""
+    return next((entry for entry in _valid_entries(db, table_name, sube_id) if entry.Parmak_Izi == key), None)
+
+
+def run(db: Session, table_name: str, sube_id: Optional[int], content_digest: str,
+        import_rows: Callable[[ImportScope], dict]) -> dict:
+    """
+    Imports a statement file once per table and branch. A file whose
+    fingerprint is already in the ledger returns the counts recorded for it,
+    marked "duplicate". Otherwise import_rows(scope) runs, with every row
+    checked for duplicates as usual, and should pass the row dates it reads to
+    scope; its counts are recorded once it returns.
+    """
+    key = fingerprint(table_name, sube_id, content_digest)
+    previous = lookup(db, table_name, sube_id, key)
+    if previous is not None:
+        logger.info(f"{table_name} file for Sube_ID {sube_id} was already imported at {previous.Olusturma_Tarihi}.")
+        return {**counts_of(previous), "duplicate": True}
+
+    scope = ImportScope()
+    counts = import_rows(scope)
+    _record(db, table_name, sube_id, key, scope, counts)
+    return counts
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Boolean, DECIMAL, Enum, ForeignKey, LargeBinary
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Boolean, DECIMAL, Enum, ForeignKey, LargeBinary, Index
+from sqlalchemy import event
+from sqlalchemy.orm import relationship, Session
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -125,6 +126,10 @@ class Kategori(Base):
 
 class EFatura(Base):
     __tablename__ = "e_Fatura"
+    __table_args__ = (
+        Index('ix_e_fatura_sube_id_donem', 'Sube_ID', 'Donem'),
+        Index('ix_e_fatura_sube_id_fatura_tarihi', 'Sube_ID', 'Fatura_Tarihi'),
+    )
 
     Fatura_ID = Column(Integer, primary_key=True, index=True)
     Fatura_Tarihi = Column(Date, nullable=False)
@@ -139,13 +144,19 @@ class EFatura(Base):
     Gunluk_Harcama = Column(Boolean, default=False)
     Giden_Fatura = Column(Boolean, default=False)
     Sube_ID = Column(Integer, ForeignKey("Sube.Sube_ID"), nullable=False)
-    Kayit_Tarihi = Column(DateTime, default=func.now())
+    Kayit_Tarihi = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
 
     kategori = relationship("Kategori", back_populates="e_faturalar")
     sube = relationship("Sube", back_populates="e_faturalar")
 
 class B2BEkstre(Base):
     __tablename__ = "B2B_Ekstre"
+    __table_args__ = (
+        Index('ix_b2b_ekstre_sube_id_donem', 'Sube_ID', 'Donem'),
+        Index('ix_b2b_ekstre_sube_id_tarih', 'Sube_ID', 'Tarih'),
+        # Upload dedup key; existing duplicate rows must be cleaned up before this index can be created
+        Index('ux_b2b_ekstre_dedup', 'Sube_ID', 'Tarih', 'Fis_No', 'Borc', 'Alacak', unique=True),
+    )
 
     Ekstre_ID = Column(Integer, primary_key=True, index=True)
     Tarih = Column(Date, nullable=False)
@@ -160,13 +171,16 @@ class B2BEkstre(Base):
     Donem = Column(Integer, nullable=False) # Stored as INT in DB, but often handled as string 'YYMM'
     Kategori_ID = Column(Integer, ForeignKey("Kategori.Kategori_ID"), nullable=True)
     Sube_ID = Column(Integer, ForeignKey("Sube.Sube_ID"), nullable=False)
-    Kayit_Tarihi = Column(DateTime, default=func.now())
+    Kayit_Tarihi = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
 
     kategori = relationship("Kategori", back_populates="b2b_ekstreler")
     sube = relationship("Sube", back_populates="b2b_ekstreler")
 
 class DigerHarcama(Base):
     __tablename__ = "Diger_Harcama"
+    __table_args__ = (
+        Index('ix_diger_harcama_sube_id_donem', 'Sube_ID', 'Donem'),
+    )
 
     Harcama_ID = Column(Integer, primary_key=True, index=True)
     Alici_Adi = Column(String(200), nullable=False)
@@ -179,28 +193,36 @@ class DigerHarcama(Base):
     Gunluk_Harcama = Column(Boolean, default=False)
     Sube_ID = Column(Integer, ForeignKey("Sube.Sube_ID"), nullable=False)
     Açıklama = Column(String(45), nullable=True)
-    Kayit_Tarihi = Column(DateTime, default=func.now())
+    Kayit_Tarihi = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
     Imaj = Column(LargeBinary, nullable=True)
     Imaj_Adi = Column(String(255), nullable=True)
+    Imaj_Hash = Column(String(64), nullable=True)
+    Imaj_Boyutu = Column(Integer, nullable=True)
 
     kategori = relationship("Kategori", back_populates="diger_harcamalar")
     sube = relationship("Sube", back_populates="diger_harcamalar")
 
 class Gelir(Base):
     __tablename__ = "Gelir"
+    __table_args__ = (
+        Index('ix_gelir_sube_id_tarih', 'Sube_ID', 'Tarih'),
+    )
 
     Gelir_ID = Column(Integer, primary_key=True, index=True)
     Sube_ID = Column(Integer, ForeignKey("Sube.Sube_ID"), nullable=False)
     Tarih = Column(Date, nullable=False)
     Kategori_ID = Column(Integer, ForeignKey("Kategori.Kategori_ID"), nullable=False)
     Tutar = Column(DECIMAL(15, 2), nullable=False)
-    Kayit_Tarihi = Column(DateTime, default=func.now())
+    Kayit_Tarihi = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
 
     sube = relationship("Sube", back_populates="gelirler")
     kategori = relationship("Kategori", back_populates="gelirler")
 
 class GelirEkstra(Base):
     __tablename__ = "GelirEkstra"
+    __table_args__ = (
+        Index('ix_gelirekstra_sube_id_tarih', 'Sube_ID', 'Tarih'),
+    )
 
     GelirEkstra_ID = Column(Integer, primary_key=True, index=True)
     Sube_ID = Column(Integer, ForeignKey("Sube.Sube_ID"), nullable=False)
@@ -209,7 +231,7 @@ class GelirEkstra(Base):
     
     ZRapor_Tutar = Column(DECIMAL(15, 2), nullable=False, default=0.00)
     Tabak_Sayisi = Column(Integer, nullable=False, default=0)
-    Kayit_Tarihi = Column(DateTime, default=func.now())
+    Kayit_Tarihi = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
 
     sube = relationship("Sube", back_populates="gelir_ekstralar")
 
@@ -242,13 +264,16 @@ class StokFiyat(Base):
 
 class StokSayim(Base):
     __tablename__ = "Stok_Sayim"
+    __table_args__ = (
+        Index('ix_stok_sayim_sube_id_donem', 'Sube_ID', 'Donem'),
+    )
 
     Sayim_ID = Column(Integer, primary_key=True, index=True)
     Malzeme_Kodu = Column(String(50), ForeignKey("Stok.Malzeme_Kodu"), nullable=False)
     Donem = Column(Integer, nullable=False) # Stored as INT in DB, but often handled as string 'YYMM'
     Miktar = Column(DECIMAL(10, 0), nullable=False)
     Sube_ID = Column(Integer, ForeignKey("Sube.Sube_ID"), nullable=False)
-    Kayit_Tarihi = Column(DateTime, default=func.now())
+    Kayit_Tarihi = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
 
     stok = relationship("Stok", back_populates="stok_sayimlar")
     sube = relationship("Sube", back_populates="stok_sayimlar")
@@ -284,13 +309,16 @@ class PuantajSecimi(Base):
 
 class Puantaj(Base):
     __tablename__ = "Puantaj"
+    __table_args__ = (
+        Index('ix_puantaj_sube_id_tarih', 'Sube_ID', 'Tarih'),
+    )
 
     Puantaj_ID = Column(Integer, primary_key=True, index=True)
     Tarih = Column(Date, nullable=False)
     TC_No = Column(String(11), ForeignKey("Calisan.TC_No"), nullable=False)
     Secim_ID = Column(Integer, ForeignKey("Puantaj_Secimi.Secim_ID"), nullable=False)
     Sube_ID = Column(Integer, ForeignKey("Sube.Sube_ID"), nullable=False)
-    Kayit_Tarihi = Column(DateTime, default=func.now())
+    Kayit_Tarihi = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
 
     calisan = relationship("Calisan", back_populates="puantajlar")
     secim = relationship("PuantajSecimi", back_populates="puantajlar")
@@ -298,6 +326,9 @@ class Puantaj(Base):
 
 class AvansIstek(Base):
     __tablename__ = "Avans_Istek"
+    __table_args__ = (
+        Index('ix_avans_istek_sube_id_donem', 'Sube_ID', 'Donem'),
+    )
 
     Avans_ID = Column(Integer, primary_key=True, index=True)
     Donem = Column(Integer, nullable=False) # Stored as INT in DB, but often handled as string 'YYMM'
@@ -305,7 +336,7 @@ class AvansIstek(Base):
     Tutar = Column(DECIMAL(10, 2), nullable=False)
     Aciklama = Column(Text, nullable=True)
     Sube_ID = Column(Integer, ForeignKey("Sube.Sube_ID"), nullable=False)
-    Kayit_Tarihi = Column(DateTime, default=func.now())
+    Kayit_Tarihi = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
 
     calisan = relationship("Calisan", back_populates="avans_istekler")
     sube = relationship("Sube", back_populates="avans_istekler")
@@ -318,27 +349,36 @@ class EFaturaReferans(Base):
     Kategori_ID = Column(Integer, ForeignKey("Kategori.Kategori_ID"), nullable=True)
     Aciklama = Column(Text, nullable=True)
     Aktif_Pasif = Column(Boolean, default=True)
-    Kayit_Tarihi = Column(DateTime, default=func.now())
+    Kayit_Tarihi = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
 
     kategori = relationship("Kategori")
 
 class Nakit(Base):
     __tablename__ = "Nakit"
+    __table_args__ = (
+        Index('ix_nakit_sube_id_donem', 'Sube_ID', 'Donem'),
+    )
 
     Nakit_ID = Column(Integer, primary_key=True, index=True)
     Tarih = Column(Date, nullable=False)
-    Kayit_Tarih = Column(DateTime, server_default=func.now())
+    Kayit_Tarih = Column(DateTime, server_default=func.now(), onupdate=func.now(), index=True)
     Tutar = Column(DECIMAL(15, 2), nullable=False)
     Tip = Column(String(50), default='Bankaya Yatan')
     Donem = Column(Integer, nullable=False)
     Sube_ID = Column(Integer, ForeignKey("Sube.Sube_ID"), nullable=False)
     Imaj_Adı = Column(String(255), nullable=True)
     Imaj = Column(LargeBinary, nullable=True)
+    Imaj_Hash = Column(String(64), nullable=True)
+    Imaj_Boyutu = Column(Integer, nullable=True)
 
     sube = relationship("Sube", back_populates="nakitler")
 
 class Odeme(Base):
     __tablename__ = "Odeme"
+    __table_args__ = (
+        Index('ix_odeme_sube_id_donem', 'Sube_ID', 'Donem'),
+        Index('ix_odeme_sube_id_tarih', 'Sube_ID', 'Tarih'),
+    )
 
     Odeme_ID = Column(Integer, primary_key=True, index=True)
     Tip = Column(String(50), nullable=False)
@@ -349,7 +389,7 @@ class Odeme(Base):
     Kategori_ID = Column(Integer, ForeignKey("Kategori.Kategori_ID"), nullable=True)
     Donem = Column(Integer, nullable=True)
     Sube_ID = Column(Integer, ForeignKey("Sube.Sube_ID"), default=1)
-    Kayit_Tarihi = Column(DateTime, default=func.now())
+    Kayit_Tarihi = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
 
     kategori = relationship("Kategori", back_populates="odemeler")
     sube = relationship("Sube", back_populates="odemeler")
@@ -361,12 +401,15 @@ class OdemeReferans(Base):
     Referans_Metin = Column(String(50), nullable=False, unique=True)
     Kategori_ID = Column(Integer, ForeignKey("Kategori.Kategori_ID"), nullable=False)
     Aktif_Pasif = Column(Boolean, default=True)
-    Kayit_Tarihi = Column(DateTime, default=func.now())
+    Kayit_Tarihi = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
 
     kategori = relationship("Kategori", back_populates="odeme_referanslar")
 
 class POSHareketleri(Base):
     __tablename__ = "POS_Hareketleri"
+    __table_args__ = (
+        Index('ix_pos_hareketleri_sube_id_islem_tarihi', 'Sube_ID', 'Islem_Tarihi'),
+    )
 
     ID = Column(Integer, primary_key=True, index=True, autoincrement=True)
     Islem_Tarihi = Column(Date, nullable=False)
@@ -375,13 +418,16 @@ class POSHareketleri(Base):
     Islem_Tutari = Column(DECIMAL(15, 2), nullable=False)
     Kesinti_Tutari = Column(DECIMAL(15, 2), default=0.00)
     Net_Tutar = Column(DECIMAL(15, 2), nullable=True)
-    Kayit_Tarihi = Column(DateTime, default=func.now())
+    Kayit_Tarihi = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
     Sube_ID = Column(Integer, ForeignKey("Sube.Sube_ID"), nullable=True)
 
     sube = relationship("Sube", back_populates="pos_hareketleri")
 
 class YemekCeki(Base):
     __tablename__ = "Yemek_Ceki"
+    __table_args__ = (
+        Index('ix_yemek_ceki_sube_id_tarih', 'Sube_ID', 'Tarih'),
+    )
 
     ID = Column(Integer, primary_key=True, index=True, autoincrement=True)
     Kategori_ID = Column(Integer, ForeignKey("Kategori.Kategori_ID"), nullable=False)
@@ -393,7 +439,9 @@ class YemekCeki(Base):
     Sube_ID = Column(Integer, ForeignKey("Sube.Sube_ID"), nullable=False, default=1)
     Imaj = Column(LargeBinary, nullable=True)
     Imaj_Adi = Column(String(255), nullable=True)
-    Kayit_Tarihi = Column(DateTime, default=func.now())
+    Imaj_Hash = Column(String(64), nullable=True)
+    Imaj_Boyutu = Column(Integer, nullable=True)
+    Kayit_Tarihi = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
 
     kategori = relationship("Kategori")
     sube = relationship("Sube")
@@ -431,7 +479,9 @@ class CalisanTalep(Base):
     Sube_ID = Column(Integer, ForeignKey("Sube.Sube_ID"), nullable=False)
     Imaj_Adi = Column(String(255), nullable=True)
     Imaj = Column(LargeBinary, nullable=True)
-    Kayit_Tarih = Column(DateTime, default=func.now())
+    Imaj_Hash = Column(String(64), nullable=True)
+    Imaj_Boyutu = Column(Integer, nullable=True)
+    Kayit_Tarih = Column(DateTime, default=func.now(), onupdate=func.now(), index=True)
 
     sube = relationship("Sube", back_populates="calisan_talepler")
     is_onay_veren_kullanici = relationship("Kullanici", foreign_keys=[Is_Onay_Veren_Kullanici_ID], back_populates="is_onay_veren_talepler")
@@ -456,3 +506,110 @@ class Mutabakat(Base):
     Cari_ID = Column(Integer, ForeignKey("Cari.Cari_ID"), nullable=False)
     Mutabakat_Tarihi = Column(Date, nullable=False)
     Tutar = Column(DECIMAL(15, 2), nullable=False)
+
+class SilinenKayit(Base):
+    __tablename__ = "Silinen_Kayit"
+    __table_args__ = (
+        Index('ix_silinen_kayit_tablo_adi_silinme_tarihi', 'Tablo_Adi', 'Silinme_Tarihi'),
+    )
+
+    ID = Column(Integer, primary_key=True, autoincrement=True)
+    Tablo_Adi = Column(String(50), nullable=False)
+    Kayit_ID = Column(String(50), nullable=False)
+    Sube_ID = Column(Integer, nullable=True)
+    Silinme_Tarihi = Column(DateTime, default=func.now())
+
+class TabloVersiyon(Base):
+    __tablename__ = "Tablo_Versiyon"
+
+    # Sube_ID / Donem 0 is the table's own counter, moved by writes without a branch
+    # and bulk statements; versioning.any_write_key adds the branch counters to it
+    Tablo_Adi = Column(String(50), primary_key=True)
+    Sube_ID = Column(Integer, primary_key=True, default=0)
+    Donem = Column(Integer, primary_key=True, default=0)
+    Versiyon = Column(Integer, nullable=False, default=0)
+
+class AktarimIsi(Base):
+    """A file upload queued for import by the background worker pool (api/v1/import_jobs.py)."""
+    __tablename__ = "Aktarim_Isi"
+
+    Is_ID = Column(Integer, primary_key=True, autoincrement=True)
+    Tur = Column(String(30), nullable=False)
+    # queued -> running -> completed / failed
+    Durum = Column(String(20), nullable=False, default="queued", index=True)
+    Dosya_Adi = Column(String(255), nullable=False)
+    Dosya_Yolu = Column(String(500), nullable=False)
+    Sube_ID = Column(Integer, nullable=True)
+    Okunan = Column(Integer, nullable=False, default=0)
+    Eklenen = Column(Integer, nullable=False, default=0)
+    Atlanan = Column(Integer, nullable=False, default=0)
+    Hatali = Column(Integer, nullable=False, default=0)
+    Hata = Column(Text, nullable=True)
+    Olusturma_Tarihi = Column(DateTime, default=func.now())
+    Baslama_Tarihi = Column(DateTime, nullable=True)
+    Bitis_Tarihi = Column(DateTime, nullable=True)
+
+class AktarimKaydi(Base):
+    """A statement file that was imported in full, keyed by its content fingerprint (db/import_ledger.py)."""
+    __tablename__ = "Aktarim_Kaydi"
+    __table_args__ = (
+        Index('ix_aktarim_kaydi_tablo_sube', 'Tablo_Adi', 'Sube_ID'),
+    )
+
+    Kayit_ID = Column(Integer, primary_key=True, autoincrement=True)
+    Tablo_Adi = Column(String(50), nullable=False)
+    Sube_ID = Column(Integer, nullable=True)
+    # SHA-256 of Tablo_Adi, Sube_ID and the normalized file content
+    Parmak_Izi = Column(String(64), nullable=False, unique=True)
+    # Earliest and latest row date in the file
+    Ilk_Tarih = Column(Date, nullable=True)
+    Son_Tarih = Column(Date, nullable=True)
+    Okunan = Column(Integer, nullable=False, default=0)
+    Eklenen = Column(Integer, nullable=False, default=0)
+    Atlanan = Column(Integer, nullable=False, default=0)
+    Hatali = Column(Integer, nullable=False, default=0)
+    Olusturma_Tarihi = Column(DateTime, default=func.now())
+
+class EpostaKuyrugu(Base):
+    """An email waiting to be sent by the outbox dispatcher (db/email_outbox.py)."""
+    __tablename__ = "Eposta_Kuyrugu"
+
+    Eposta_ID = Column(Integer, primary_key=True, autoincrement=True)
+    # Comma-separated; one message goes to all of them
+    Alicilar = Column(Text, nullable=False)
+    Konu = Column(String(255), nullable=False)
+    Icerik = Column(Text, nullable=False)
+    # queued -> sending -> sent, or back to queued until EMAIL_MAX_ATTEMPTS, then failed
+    Durum = Column(String(20), nullable=False, default="queued", index=True)
+    Deneme_Sayisi = Column(Integer, nullable=False, default=0)
+    # When queued the earliest retry, when sending the moment the send was claimed
+    Sonraki_Deneme = Column(DateTime, nullable=True)
+    Hata = Column(Text, nullable=True)
+    Olusturma_Tarihi = Column(DateTime, default=func.now())
+    Gonderim_Tarihi = Column(DateTime, nullable=True)
+
+# Tables the frontend syncs incrementally; deleting one of their rows leaves a
+# Silinen_Kayit tombstone so delta requests can report the removal.
+TOMBSTONE_TABLES = {
+    "e_Fatura", "B2B_Ekstre", "Diger_Harcama", "Gelir", "GelirEkstra", "Stok_Sayim", "Puantaj",
+    "Avans_Istek", "e_Fatura_Referans", "Nakit", "Odeme", "Odeme_Referans", "POS_Hareketleri",
+    "Yemek_Ceki", "Calisan_Talep",
+}
+
+@event.listens_for(Session, "before_flush")
+def record_tombstones(session, flush_context, instances):
+    # Compared by table name so a second import of this module does not record twice
+    pending = {(obj.Tablo_Adi, obj.Kayit_ID) for obj in session.new
+               if getattr(obj, "__tablename__", None) == "Silinen_Kayit"}
+    for obj in list(session.deleted):
+        table_name = getattr(obj, "__tablename__", None)
+        if table_name not in TOMBSTONE_TABLES:
+            continue
+        key = str(obj.__mapper__.primary_key_from_instance(obj)[0])
+        if (table_name, key) in pending:
+            continue
+        session.add(SilinenKayit(
+            Tablo_Adi=table_name,
+            Kayit_ID=key,
+            Sube_ID=getattr(obj, "Sube_ID", None),
+        ))
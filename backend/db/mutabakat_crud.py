@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import List
 
+from db import versioning
 from schemas.mutabakat import Mutabakat, MutabakatUpdate, MutabakatCreate
 from datetime import datetime
 
@@ -49,6 +50,8 @@ def create_mutabakat(db: Session, mutabakat_data: MutabakatCreate) -> Mutabakat:
     }
     result = db.execute(query, params)
     new_mutabakat_id = result.lastrowid
+    # Raw SQL skips the flush hooks that bump the table version
+    versioning.bump_table_version(db, "Mutabakat", mutabakat_data.Sube_ID)
     db.commit()
 
     # Fetch the newly created record with Alici_Unvani
@@ -94,6 +97,7 @@ def update_mutabakat(db: Session, mutabakat_id: int, mutabakat_data: MutabakatUp
         "aciklama": mutabakat_data.Aciklama,
         "kayit_tarihi": datetime.now()
     })
+    versioning.bump_table_version(db, "Mutabakat")
     db.commit()
 
     # Re-fetch the full mutabakat data with Alici_Unvani from Cari table
@@ -126,5 +130,6 @@ def update_mutabakat(db: Session, mutabakat_id: int, mutabakat_data: MutabakatUp
 
 def delete_mutabakat(db: Session, mutabakat_id: int):
     db.execute(text("DELETE FROM SilverCloud.Mutabakat WHERE Mutabakat_ID = :mutabakat_id"), {"mutabakat_id": mutabakat_id})
+    versioning.bump_table_version(db, "Mutabakat")
     db.commit()
     return {"ok": True}
\ No newline at end of file
@@ -0,0 +1,55 @@
+from threading import Lock
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from core.aho_corasick import Automaton
+from . import models, versioning
+
+
+class OdemeMatcher:
+    """
+    Categorizes bank line descriptions with the active Odeme_Referans texts.
+    A description gets the category of the lowest Referans_ID whose text it
+    contains, found in one pass over the description.
+    """
+
+    def __init__(self, referanslar: List[tuple]):
+        self._kategoriler = [kategori_id for _, kategori_id in referanslar]
+        self._automaton = Automaton(metin for metin, _ in referanslar)
+
+    def kategori_for(self, aciklama: Optional[str]) -> Optional[int]:
+        position = self._automaton.first_match(aciklama)
+        return None if position is None else self._kategoriler[position]
+
+
+# (table version, matcher). Rebuilt when Odeme_Referans is written on any worker.
+_cached: Optional[tuple] = None
+_lock = Lock()
+
+
+def load_matcher(db: Session) -> OdemeMatcher:
+    rows = db.query(models.OdemeReferans.Referans_Metin, models.OdemeReferans.Kategori_ID).filter(
+        models.OdemeReferans.Aktif_Pasif == True
+    ).order_by(models.OdemeReferans.Referans_ID).all()
+    return OdemeMatcher([tuple(row) for row in rows])
+
+
+def get_matcher(db: Session) -> OdemeMatcher:
+    global _cached
+    version = versioning.get_table_versions(db, [versioning.any_write_key(models.OdemeReferans.__tablename__)])[0]
+    with _lock:
+        cached = _cached
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    matcher = load_matcher(db)
+    with _lock:
+        _cached = (version, matcher)
+    return matcher
+
+
+def clear_cache():
+    global _cached
+    with _lock:
+        _cached = None
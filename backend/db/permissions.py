@@ -0,0 +1,46 @@
+from threading import Lock
+from typing import FrozenSet
+
+from sqlalchemy.orm import Session
+
+from . import models, versioning
+
+# Tables whose writes can change what a user is allowed to do
+PERMISSION_TABLES = ("Kullanici_Rol", "Rol_Yetki", "Yetki")
+
+# Kullanici_ID -> (table versions, permission names). Entries are checked
+# against the shared version counters, so a write on any worker invalidates
+# them everywhere on the next request.
+_cache: dict = {}
+_lock = Lock()
+
+
+def load_user_permissions(db: Session, kullanici_id: int) -> FrozenSet[str]:
+    """Names of every active permission granted to the user through any role, in one query."""
+    rows = db.query(models.Yetki.Yetki_Adi).join(
+        models.RolYetki, models.RolYetki.Yetki_ID == models.Yetki.Yetki_ID
+    ).join(
+        models.KullaniciRol, models.KullaniciRol.Rol_ID == models.RolYetki.Rol_ID
+    ).filter(
+        models.KullaniciRol.Kullanici_ID == kullanici_id,
+        models.RolYetki.Aktif_Pasif == True
+    ).distinct().all()
+    return frozenset(row[0] for row in rows)
+
+
+def get_user_permissions(db: Session, kullanici_id: int) -> FrozenSet[str]:
+    versions = tuple(versioning.get_table_versions(db, [versioning.any_write_key(table) for table in PERMISSION_TABLES]))
+    with _lock:
+        cached = _cache.get(kullanici_id)
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+
+    permissions = load_user_permissions(db, kullanici_id)
+    with _lock:
+        _cache[kullanici_id] = (versions, permissions)
+    return permissions
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
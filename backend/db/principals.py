@@ -0,0 +1,66 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from threading import Lock
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from . import models
+
+MAX_ENTRIES = 1024
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The parts of a Kullanici row that authentication and authorization need."""
+    Kullanici_ID: int
+    Kullanici_Adi: str
+    Aktif_Pasif: bool
+    Expire_Date: Optional[date]
+
+
+# Token subject -> (expires at, Principal). update_user/delete_user drop the
+# entry on the worker that ran them; other workers pick the change up once
+# PRINCIPAL_CACHE_TTL_SECONDS has passed.
+_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_lock = Lock()
+
+
+def get_principal(db: Session, username: str) -> Optional[Principal]:
+    now = time.monotonic()
+    with _lock:
+        cached = _cache.get(username)
+        if cached is not None and cached[0] > now:
+            _cache.move_to_end(username)
+            return cached[1]
+
+    row = db.query(
+        models.Kullanici.Kullanici_ID,
+        models.Kullanici.Kullanici_Adi,
+        models.Kullanici.Aktif_Pasif,
+        models.Kullanici.Expire_Date
+    ).filter(models.Kullanici.Kullanici_Adi == username).first()
+    if row is None:
+        return None
+
+    principal = Principal(*row)
+    with _lock:
+        _cache[username] = (now + settings.PRINCIPAL_CACHE_TTL_SECONDS, principal)
+        _cache.move_to_end(username)
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return principal
+
+
+def invalidate_user(kullanici_id: int):
+    with _lock:
+        for username in [name for name, (_, principal) in _cache.items() if principal.Kullanici_ID == kullanici_id]:
+            del _cache[username]
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
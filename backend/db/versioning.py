@@ -0,0 +1,154 @@
+from sqlalchemy import event, insert, inspect, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Iterable, List, Optional
+
+from . import models
+
+# Bookkeeping tables written from the flush hooks themselves, the import job queue,
+# the import ledger and the email outbox
+UNVERSIONED_TABLES = {"Tablo_Versiyon", "Silinen_Kayit", "Aktarim_Isi", "Aktarim_Kaydi", "Eposta_Kuyrugu"}
+
+
+def _normalize_donem(donem) -> int:
+    try:
+        donem_str = str(int(donem))
+    except (TypeError, ValueError):
+        return 0
+    return int(donem_str[2:]) if len(donem_str) == 6 else int(donem_str)
+
+
+def _has_donem(table_name: str) -> bool:
+    table = models.Base.metadata.tables.get(table_name)
+    return table is not None and "Donem" in table.c
+
+
+def any_write_key(table_name: str) -> tuple:
+    """
+    Key of the version that changes with every write to table_name, in any
+    branch; get_table_versions sums it from the table's counters.
+    """
+    return (table_name, None, None)
+
+
+def version_keys(table_name: str, sube_id: Optional[int] = None, donem: Optional[int] = None) -> List[tuple]:
+    """
+    Counters a read of table_name scoped to (sube_id, donem) depends on. A
+    scoped read depends on its branch/period counters and the table's own
+    counter, so bulk writes invalidate every scope while a write in another
+    branch does not. An unscoped read depends on every write to the table.
+    """
+    if not sube_id:
+        return [any_write_key(table_name)]
+    keys = [(table_name, 0, 0), (table_name, int(sube_id), 0)]
+    if donem and _has_donem(table_name):
+        keys.append((table_name, int(sube_id), _normalize_donem(donem)))
+    return keys
+
+
+def _written_keys(table_name: str, sube_id: Optional[int] = None, donem: Optional[int] = None) -> List[tuple]:
+    """
+    Counters a write to (sube_id, donem) increments. A write with a branch
+    leaves the (table, 0, 0) row alone, so concurrent writers to different
+    branches do not queue on its row lock until commit; the version of any
+    write to the table is derived from all counters in get_table_versions.
+    """
+    if not sube_id:
+        return [(table_name, 0, 0)]
+    keys = [(table_name, int(sube_id), 0)]
+    if donem and _has_donem(table_name):
+        keys.append((table_name, int(sube_id), _normalize_donem(donem)))
+    return keys
+
+
+def _increment(connection, key: tuple):
+    tablo_adi, sube_id, donem = key
+    condition = (
+        (models.TabloVersiyon.Tablo_Adi == tablo_adi)
+        & (models.TabloVersiyon.Sube_ID == sube_id)
+        & (models.TabloVersiyon.Donem == donem)
+    )
+    increment = update(models.TabloVersiyon).where(condition).values(Versiyon=models.TabloVersiyon.Versiyon + 1)
+    if connection.execute(increment).rowcount:
+        return
+    try:
+        connection.execute(insert(models.TabloVersiyon).values(
+            Tablo_Adi=tablo_adi, Sube_ID=sube_id, Donem=donem, Versiyon=1
+        ))
+    except IntegrityError:
+        # Another transaction created the counter first
+        connection.execute(increment)
+
+
+def bump_table_version(connection, table_name: str, sube_id: Optional[int] = None, donem: Optional[int] = None):
+    """
+    Increments the counters of a written row's table, branch and period in the
+    current transaction. Use directly after writes that bypass the ORM flush,
+    e.g. bulk_insert_mappings.
+    """
+    if isinstance(connection, Session):
+        connection = connection.connection()
+    for key in _written_keys(table_name, sube_id, donem):
+        _increment(connection, key)
+
+
+def get_table_versions(db: Session, keys: Iterable[tuple]) -> List[int]:
+    """
+    Current values of the given counters. (table, 0, 0) is the table's own
+    counter, moved by writes without a branch and by bulk statements; the
+    any_write_key of a table is that counter plus every branch counter.
+    """
+    keys = list(keys)
+    rows = db.query(models.TabloVersiyon).filter(
+        models.TabloVersiyon.Tablo_Adi.in_({key[0] for key in keys})
+    ).all()
+    versions = {(row.Tablo_Adi, row.Sube_ID, row.Donem): row.Versiyon for row in rows}
+    for row in rows:
+        # Branch/period counters move together with their branch counter, so Donem 0 rows suffice
+        if not row.Donem:
+            total = any_write_key(row.Tablo_Adi)
+            versions[total] = versions.get(total, 0) + row.Versiyon
+    return [versions.get(key, 0) for key in keys]
+
+
+def _row_scopes(obj):
+    """(Sube_ID, Donem) pairs a row belonged to before and after the flush."""
+    state = inspect(obj)
+    sube_ids = {getattr(obj, "Sube_ID", None)}
+    donemler = {getattr(obj, "Donem", None)}
+    if "Sube_ID" in state.attrs:
+        sube_ids.update(state.attrs.Sube_ID.history.deleted or ())
+    if "Donem" in state.attrs:
+        donemler.update(state.attrs.Donem.history.deleted or ())
+    return {(sube_id, donem) for sube_id in sube_ids for donem in donemler}
+
+
+@event.listens_for(Session, "before_flush")
+def collect_written_scopes(session, flush_context, instances):
+    written = session.info.setdefault("written_scopes", set())
+    dirty = [obj for obj in session.dirty if session.is_modified(obj)]
+    for obj in list(session.new) + dirty + list(session.deleted):
+        table_name = getattr(obj, "__tablename__", None)
+        if table_name is None or table_name in UNVERSIONED_TABLES:
+            continue
+        for sube_id, donem in _row_scopes(obj):
+            written.add((table_name, sube_id, donem))
+
+
+@event.listens_for(Session, "after_flush")
+def bump_written_scopes(session, flush_context):
+    keys = set()
+    for table_name, sube_id, donem in session.info.pop("written_scopes", set()):
+        keys.update(_written_keys(table_name, sube_id, donem))
+    connection = session.connection()
+    for key in sorted(keys):
+        _increment(connection, key)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def bump_bulk_statements(orm_execute_state):
+    # query.update() / query.delete() do not go through the flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        table_name = orm_execute_state.statement.table.name
+        if table_name not in UNVERSIONED_TABLES:
+            bump_table_version(orm_execute_state.session.connection(), table_name)
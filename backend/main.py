@@ -1,20 +1,40 @@
 import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
 
+from core.compression import CompressionMiddleware
+from core.config import settings
+from api.v1 import import_jobs
+from db import email_outbox, image_store
 from db.database import engine, Base
 from api.v1.endpoints import (
     sube, users, roles, permissions, kullanici_rol, rol_yetki, e_fatura,
-    b2b_ekstre, diger_harcama, gelir, gelir_ekstra, stok, stok_fiyat, calisan, puantaj_secimi, puantaj, avans_istek, kategori, ust_kategori, token, deger, e_fatura_referans, nakit, odeme, odeme_referans, report, fatura_diger_harcama_rapor, pos_hareketleri, yemek_ceki, fatura_bolme, calisan_talep, rapor, email, cari, mutabakat
+    b2b_ekstre, diger_harcama, gelir, gelir_ekstra, stok, stok_fiyat, calisan, puantaj_secimi, puantaj, avans_istek, kategori, ust_kategori, token, deger, e_fatura_referans, nakit, odeme, odeme_referans, report, fatura_diger_harcama_rapor, pos_hareketleri, yemek_ceki, fatura_bolme, calisan_talep, rapor, email, cari, mutabakat, bootstrap, jobs, ozet_kontrol_raporu
 )
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Uploads queued before a restart are still on disk; pick them up again and
+    # fail the ones a stopped process left running
+    import_jobs.resume_queued_jobs()
+    # Send what was still queued, or waiting for a retry, when the process stopped,
+    # and what it stopped in the middle of sending
+    email_outbox.requeue_interrupted()
+    email_outbox.wake()
+    # Images of rows that were rolled back, replaced or deleted
+    image_store.sweep()
+    yield
+
 app = FastAPI(
     title="SilverCloud Backend API",
     version="1.0.0",
-    description="API for SilverCloud application"
+    description="API for SilverCloud application",
+    lifespan=lifespan
 )
 
 
@@ -35,8 +55,11 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS", "HEAD"], # Explicitly list all common methods
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Deleted-Ids", "X-Sync-Watermark"],
 )
 
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
 # Include routers
 app.include_router(sube.router, prefix="/api/v1", tags=["Sube"])
 app.include_router(users.router, prefix="/api/v1", tags=["Users"])
@@ -75,6 +98,9 @@ app.include_router(rapor.router, prefix="/api/v1", tags=["Raporlar"])
 app.include_router(fatura_diger_harcama_rapor.router, prefix="/api/v1/fatura-diger-harcama-rapor", tags=["Reports"])
 app.include_router(email.router, prefix="/api/v1", tags=["Email"])
 app.include_router(mutabakat.router, prefix="/api/v1", tags=["Mutabakat"])
+app.include_router(bootstrap.router, prefix="/api/v1", tags=["Bootstrap"])
+app.include_router(jobs.router, prefix="/api/v1", tags=["Import Jobs"])
+app.include_router(ozet_kontrol_raporu.router, prefix="/api/v1", tags=["Ozet Kontrol Raporu"])
 
 @app.get("/", tags=["Root"])
 async def read_root():
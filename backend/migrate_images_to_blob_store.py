@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+One-shot migration that moves the receipt images of Diger_Harcama, Nakit,
+Yemek_Ceki and Calisan_Talep out of MySQL into the blob store.
+
+Adds the Imaj_Hash / Imaj_Boyutu columns when they are missing, then writes
+every Imaj blob to the store and clears the column. Run it before deploying
+the code that reads Imaj_Hash; it can be re-run safely.
+"""
+
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect, text
+
+from db.database import SessionLocal, engine
+from db.image_store import IMAGE_MODELS
+
+BATCH_SIZE = 100
+
+def add_missing_columns():
+    """Add the Imaj_Hash and Imaj_Boyutu columns to the image tables if they do not exist."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for model in IMAGE_MODELS:
+            table = model.__tablename__
+            existing = {column["name"] for column in inspector.get_columns(table)}
+            if "Imaj_Hash" not in existing:
+                print(f"Adding Imaj_Hash to {table}...")
+                conn.execute(text(f"ALTER TABLE `{table}` ADD COLUMN `Imaj_Hash` VARCHAR(64) NULL"))
+            if "Imaj_Boyutu" not in existing:
+                print(f"Adding Imaj_Boyutu to {table}...")
+                conn.execute(text(f"ALTER TABLE `{table}` ADD COLUMN `Imaj_Boyutu` INT NULL"))
+
+def migrate_images():
+    """Move every Imaj blob into the blob store, one batch of rows at a time."""
+    db = SessionLocal()
+    try:
+        for model in IMAGE_MODELS:
+            key_column = model.__mapper__.primary_key[0]
+            ids = [row[0] for row in db.query(key_column).filter(model.Imaj != None).order_by(key_column).all()]
+            print(f"{model.__tablename__}: {len(ids)} images to move")
+            for start in range(0, len(ids), BATCH_SIZE):
+                batch = db.query(model).filter(key_column.in_(ids[start:start + BATCH_SIZE])).all()
+                for obj in batch:
+                    # Re-assigning the bytes stores them and clears the column (see db.image_store)
+                    obj.Imaj = obj.Imaj
+                db.commit()
+                db.expunge_all()
+                print(f"  moved {min(start + BATCH_SIZE, len(ids))}/{len(ids)}")
+        print("All images are in the blob store.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    add_missing_columns()
+    migrate_images()
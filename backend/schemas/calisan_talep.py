@@ -51,3 +51,13 @@ class CalisanTalep(CalisanTalepBase):
 
     class Config:
         from_attributes = True
+
+class CalisanTalepList(CalisanTalepBase):
+    Calisan_Talep_ID: int
+    Kayit_Tarih: datetime
+    has_imaj: bool
+    Imaj_Boyutu: Optional[int] = None
+    Imaj_Hash: Optional[str] = None
+
+    class Config:
+        from_attributes = True
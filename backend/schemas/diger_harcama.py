@@ -14,11 +14,10 @@ class DigerHarcamaBase(BaseModel):
     Sube_ID: int
     Açıklama: Optional[str] = Field(None, max_length=45)
     Kayit_Tarihi: Optional[datetime] = None
-    Imaj: Optional[str] = None
     Imaj_Adi: Optional[str] = Field(None, max_length=255)
 
 class DigerHarcamaCreate(DigerHarcamaBase):
-    pass
+    Imaj: Optional[str] = None
 
 class DigerHarcamaUpdate(BaseModel):
     Alici_Adi: Optional[str] = Field(None, max_length=200)
@@ -36,6 +35,16 @@ class DigerHarcamaUpdate(BaseModel):
 
 class DigerHarcamaInDB(DigerHarcamaBase):
     Harcama_ID: int
+    Imaj: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class DigerHarcamaList(DigerHarcamaBase):
+    Harcama_ID: int
+    has_imaj: bool
+    Imaj_Boyutu: Optional[int] = None
+    Imaj_Hash: Optional[str] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -40,9 +40,17 @@ class EFaturaInDB(EFaturaBase):
             Decimal: lambda v: float(v)
         }
 
+class EFaturaBulkRowResult(BaseModel):
+    index: int # Position of the row in the request
+    Fatura_Numarasi: Optional[str] = None
+    status: str # 'added', 'skipped' or 'error'
+    detail: Optional[str] = None
+    Fatura_ID: Optional[int] = None
+
 class EFaturaBulkResponse(BaseModel):
     message: str
     added: int
     skipped: int
     errors: int
     added_invoices: List[EFaturaInDB]
+    results: List[EFaturaBulkRowResult] = []
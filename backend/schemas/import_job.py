@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class ImportJobInDB(BaseModel):
+    Is_ID: int
+    Tur: str
+    Durum: str
+    Dosya_Adi: str
+    Sube_ID: Optional[int] = None
+    Okunan: int
+    Eklenen: int
+    Atlanan: int
+    Hatali: int
+    Hata: Optional[str] = None
+    Olusturma_Tarihi: Optional[datetime] = None
+    Baslama_Tarihi: Optional[datetime] = None
+    Bitis_Tarihi: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -10,20 +10,31 @@ class NakitBase(BaseModel):
     Donem: int
     Sube_ID: int
     Imaj_Adı: Optional[str] = None
-    Imaj: Optional[bytes] = None
 
 class NakitCreate(NakitBase):
-    pass
+    Imaj: Optional[bytes] = None
 
 class NakitUpdate(NakitBase):
     Tarih: Optional[date] = None
     Tutar: Optional[Decimal] = Field(None, ge=0)
     Tip: Optional[str] = None
     Donem: Optional[int] = None
+    Imaj: Optional[bytes] = None
 
 class NakitInDB(NakitBase):
     Nakit_ID: int
     Kayit_Tarih: datetime
+    Imaj: Optional[bytes] = None
+
+    class Config:
+        from_attributes = True
+
+class NakitList(NakitBase):
+    Nakit_ID: int
+    Kayit_Tarih: datetime
+    has_imaj: bool
+    Imaj_Boyutu: Optional[int] = None
+    Imaj_Hash: Optional[str] = None
 
     class Config:
         from_attributes = True
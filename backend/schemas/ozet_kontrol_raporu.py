@@ -1,12 +1,15 @@
 from pydantic import BaseModel
 
 class OzetKontrolRaporuData(BaseModel):
+    Sube_ID: int
+    Donem: int
     robotpos_tutar: float
     toplam_satis_gelirleri: float
     nakit: float
     gunluk_harcama_efatura: float
     gunluk_harcama_diger: float
     kalan_nakit: float
+    nakit_girisi_toplam: float
     bankaya_yatan: float
     gelir_pos: float
     pos_hareketleri: float
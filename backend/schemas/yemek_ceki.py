@@ -37,6 +37,8 @@ class YemekCekiInDB(YemekCekiBase):
 class YemekCekiList(YemekCekiBase):
     ID: int
     has_imaj: bool
+    Imaj_Boyutu: Optional[int] = None
+    Imaj_Hash: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -1,6 +1,7 @@
 import base64
 import os
 from email.message import EmailMessage
+from threading import Lock
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -10,72 +11,78 @@ from googleapiclient.errors import HttpError
 # Gerekli API scope'u
 SCOPES = ['https://www.googleapis.com/auth/gmail.send']
 
-def gmail_send_message(to_email, subject, body):
+class GmailTransport:
     """
-    Gmail API kullanarak bir e-posta oluşturur ve gönderir.
-    Kimlik bilgilerini ortam değişkenlerinden (environment variables) okur.
+    Gmail API üzerinden e-posta gönderir. Yetkili servis ilk gönderimde bir kez
+    oluşturulur ve sonraki gönderimlerde yeniden kullanılır; erişim token'ının
+    süresi dolduğunda google-auth onu kendisi yeniler.
     """
-    print("[EMAIL_DEBUG] Adım 1: 'gmail_send_message' fonksiyonuna girildi.")
-    creds = None
-    
-    # Kimlik bilgilerini ortam değişkenlerinden al
-    client_id = os.environ.get('GMAIL_CLIENT_ID')
-    client_secret = os.environ.get('GMAIL_CLIENT_SECRET')
-    refresh_token = os.environ.get('GMAIL_REFRESH_TOKEN')
-    print(f"[EMAIL_DEBUG] Adım 2: Ortam değişkenleri okundu. client_id var mı: {bool(client_id)}, client_secret var mı: {bool(client_secret)}, refresh_token var mı: {bool(refresh_token)}")
-
-    if not (client_id and client_secret and refresh_token):
-        print("[EMAIL_DEBUG] HATA: Gerekli ortam değişkenlerinden biri veya daha fazlası eksik. Fonksiyondan çıkılıyor.")
-        return
 
-    print("[EMAIL_DEBUG] Adım 3: Credentials nesnesi oluşturuluyor.")
-    creds = Credentials(
-        token=None,
-        refresh_token=refresh_token,
-        token_uri="https://oauth2.googleapis.com/token",
-        client_id=client_id,
-        client_secret=client_secret,
-        scopes=SCOPES
-    )
+    def __init__(self):
+        self._service = None
+        self._lock = Lock()
 
-    print(f"[EMAIL_DEBUG] Adım 4: Kimlik bilgileri kontrol ediliyor. Geçerli mi: {creds.valid}, Refresh Token var mı: {bool(creds.refresh_token)}")
-    if creds and not creds.valid and creds.refresh_token:
-        try:
-            print("[EMAIL_DEBUG] Adım 5: Kimlik bilgileri geçerli değil, yenileme denemesi yapılıyor.")
-            creds.refresh(Request())
-            print("[EMAIL_DEBUG] Adım 6: Yenileme başarılı.")
-        except Exception as e:
-            print(f"[EMAIL_DEBUG] HATA - Adım 7: Token yenileme başarısız oldu: {e}")
-            return
+    def _build_service(self):
+        # Kimlik bilgilerini ortam değişkenlerinden al
+        client_id = os.environ.get('GMAIL_CLIENT_ID')
+        client_secret = os.environ.get('GMAIL_CLIENT_SECRET')
+        refresh_token = os.environ.get('GMAIL_REFRESH_TOKEN')
+        if not (client_id and client_secret and refresh_token):
+            raise RuntimeError("GMAIL_CLIENT_ID, GMAIL_CLIENT_SECRET veya GMAIL_REFRESH_TOKEN ortam değişkenleri ayarlanmamış.")
 
-    print(f"[EMAIL_DEBUG] Adım 8: Yenileme sonrası kimlik bilgileri kontrol ediliyor. Geçerli mi: {creds.valid}")
-    if not creds or not creds.valid:
-        print("[EMAIL_DEBUG] HATA - Adım 9: Kimlik bilgileri hala geçerli değil. Fonksiyondan çıkılıyor.")
-        return
-
-    try:
-        print("[EMAIL_DEBUG] Adım 10: Gmail API servisi oluşturuluyor.")
-        service = build('gmail', 'v1', credentials=creds)
+        creds = Credentials(
+            token=None,
+            refresh_token=refresh_token,
+            token_uri="https://oauth2.googleapis.com/token",
+            client_id=client_id,
+            client_secret=client_secret,
+            scopes=SCOPES
+        )
+        creds.refresh(Request())
+        return build('gmail', 'v1', credentials=creds, cache_discovery=False)
 
-        print("[EMAIL_DEBUG] Adım 11: E-posta mesajı oluşturuluyor ve gönderiliyor.")
+    def send(self, recipients, subject, body):
+        """
+        Tek bir mesajı tüm alıcılara gönderir ve Gmail mesaj ID'sini döndürür.
+        Birden fazla alıcı Bcc'ye yazılır, alıcılar birbirinin adresini görmez.
+        """
         message = EmailMessage()
         message.set_content(body)
-        message['To'] = to_email
+        if len(recipients) == 1:
+            message['To'] = recipients[0]
+        else:
+            message['Bcc'] = ", ".join(recipients)
         message['Subject'] = subject
+        create_message = {'raw': base64.urlsafe_b64encode(message.as_bytes()).decode()}
 
-        encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
-        create_message = {'raw': encoded_message}
-        
-        send_message = (
-            service.users().messages().send(userId="me", body=create_message).execute()
-        )
-        print(f"[EMAIL_DEBUG] BAŞARILI - Adım 12: Mesaj gönderildi. Message ID: {send_message['id']}")
+        # googleapiclient servisleri thread-safe değil
+        with self._lock:
+            if self._service is None:
+                self._service = self._build_service()
+            try:
+                send_message = self._service.users().messages().send(userId="me", body=create_message).execute()
+            except HttpError as error:
+                if error.resp.status == 401:
+                    # Yetki geri alınmış olabilir; bir sonraki gönderim servisi yeniden kurar
+                    self._service = None
+                raise
+        return send_message['id']
 
-    except HttpError as error:
-        print(f"[EMAIL_DEBUG] HATA - Adım 13: Mesaj gönderimi sırasında HttpError oluştu: {error}")
-        send_message = None
-    
-    return send_message
+
+_transport = GmailTransport()
+
+def gmail_send_message(to_email, subject, body):
+    """
+    Gmail API kullanarak bir e-posta oluşturur ve gönderir.
+    Kimlik bilgilerini ortam değişkenlerinden (environment variables) okur.
+    """
+    try:
+        message_id = _transport.send([to_email], subject, body)
+        print(f"[EMAIL_DEBUG] BAŞARILI: Mesaj gönderildi. Message ID: {message_id}")
+        return {'id': message_id}
+    except Exception as error:
+        print(f"[EMAIL_DEBUG] HATA: Mesaj gönderilemedi: {error}")
+        return None
 
 if __name__ == "__main__":
     from dotenv import load_dotenv
@@ -0,0 +1,114 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.database import Base, get_db
+from db import crud, models, versioning
+from schemas import b2b_ekstre
+from api.v1.endpoints import b2b_ekstre as b2b_ekstre_endpoint
+
+
+def row(fis_no, tarih=date(2025, 8, 1), borc=0.0, alacak=0.0, sube_id=1):
+    return b2b_ekstre.B2BEkstreCreate(Tarih=tarih, Fis_No=fis_no, Borc=borc, Alacak=alacak,
+                                      Donem="2508", Sube_ID=sube_id)
+
+
+class TestB2BEkstreBulk(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        db.add_all([
+            models.Sube(Sube_ID=1, Sube_Adi="Merkez"),
+            models.Sube(Sube_ID=2, Sube_Adi="Sube 2"),
+            models.B2BEkstre(Tarih=date(2025, 8, 1), Fis_No="A1", Borc=Decimal("10.50"), Alacak=Decimal("0.00"),
+                             Donem=2508, Sube_ID=1),
+            models.EFatura(Fatura_Tarihi=date(2025, 8, 1), Fatura_Numarasi="FT1", Alici_Unvani="A", Tutar=Decimal("1.00"),
+                           Donem=2508, Sube_ID=1),
+            models.EFatura(Fatura_Tarihi=date(2025, 8, 1), Fatura_Numarasi="FT2", Alici_Unvani="A", Tutar=Decimal("1.00"),
+                           Aciklama="Elle girildi", Donem=2508, Sube_ID=1),
+        ])
+        db.commit()
+        db.close()
+
+        app = FastAPI()
+        app.include_router(b2b_ekstre_endpoint.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def test_duplicates_are_skipped(self):
+        db = self.SessionLocal()
+        result = crud.create_b2b_ekstre_bulk(db, [
+            row("A1", borc=10.5),                 # already in the table
+            row("A1", borc=10.5, sube_id=2),      # same receipt on another branch
+            row("A1", borc=11.0),                 # different amount
+            row("A2"),
+            row("A2"),                            # repeated in the upload
+        ])
+        self.assertEqual((result["added"], result["skipped"]), (3, 2))
+        self.assertEqual(db.query(models.B2BEkstre).count(), 4)
+        self.assertEqual(versioning.get_table_versions(db, [("B2B_Ekstre", 2, 2508)]), [1])
+        db.close()
+
+    def test_existing_rows_are_fetched_in_one_query(self):
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(self.engine, "before_cursor_execute", listener)
+        db = self.SessionLocal()
+        try:
+            crud.create_b2b_ekstre_bulk(db, [row(f"N{i}", tarih=date(2025, 8, 1 + i % 28)) for i in range(100)])
+        finally:
+            db.close()
+            event.remove(self.engine, "before_cursor_execute", listener)
+        selects = [s for s in statements if s.startswith("SELECT") and '"B2B_Ekstre"' in s]
+        self.assertEqual(len(selects), 1)
+
+    def test_upload_backfills_invoice_descriptions_in_one_update(self):
+        csv = "\n".join([
+            "Tarih,Fis No,Aciklama,Borc,Alacak",
+            "02.08.2025,FT1,Agustos faturasi,100,0",
+            "03.08.2025,FT1,Ikinci satir,50,0",
+            "04.08.2025,FT2,Baska metin,0,10",
+            "tarih yok,FT3,Bilinmeyen fatura,0,0",
+        ]).encode("utf-8")
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            response = self.client.post("/api/v1/b2b-ekstreler/upload/", data={"sube_id": "1"},
+                                        files={"file": ("ekstre.csv", csv, "text/csv")})
+        finally:
+            event.remove(self.engine, "before_cursor_execute", listener)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["added"], 3)
+        self.assertEqual(len([s for s in statements if s.startswith('UPDATE "e_Fatura"')]), 1)
+
+        db = self.SessionLocal()
+        aciklamalar = dict(db.query(models.EFatura.Fatura_Numarasi, models.EFatura.Aciklama))
+        self.assertEqual(aciklamalar, {"FT1": "Agustos faturasi", "FT2": "Elle girildi"})
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import gzip
+import json
+import unittest
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.database import Base, get_db
+from db import models
+from db.bootstrap_crud import BootstrapScope, donem_to_date_range
+from api.v1.endpoints import bootstrap
+
+
+class TestBootstrap(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        db = self.SessionLocal()
+
+        db.add_all([
+            models.Sube(Sube_ID=1, Sube_Adi="Merkez"),
+            models.Sube(Sube_ID=2, Sube_Adi="Sube 2"),
+            models.Kategori(Kategori_ID=1, Kategori_Adi="POS", Tip="Gelir"),
+        ])
+        db.add_all([
+            models.EFatura(Fatura_Tarihi=date(2025, 8, 5), Fatura_Numarasi="F1", Alici_Unvani="A",
+                           Tutar=Decimal("10.50"), Donem=2508, Sube_ID=1),
+            models.EFatura(Fatura_Tarihi=date(2025, 7, 5), Fatura_Numarasi="F2", Alici_Unvani="A",
+                           Tutar=Decimal("20.00"), Donem=2507, Sube_ID=1),
+            models.EFatura(Fatura_Tarihi=date(2025, 8, 6), Fatura_Numarasi="F3", Alici_Unvani="B",
+                           Tutar=Decimal("30.00"), Donem=2508, Sube_ID=2),
+            models.Gelir(Sube_ID=1, Tarih=date(2025, 8, 31), Kategori_ID=1, Tutar=Decimal("5.00")),
+            models.Gelir(Sube_ID=1, Tarih=date(2025, 9, 1), Kategori_ID=1, Tutar=Decimal("6.00")),
+            models.B2BEkstre(Tarih=date(2025, 8, 1), Fis_No="B1", Donem=2508, Sube_ID=1),
+        ])
+        db.commit()
+        db.close()
+
+        app = FastAPI()
+        app.include_router(bootstrap.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def test_donem_to_date_range(self):
+        self.assertEqual(donem_to_date_range(2502), (date(2025, 2, 1), date(2025, 2, 28)))
+        self.assertEqual(donem_to_date_range(202512), (date(2025, 12, 1), date(2025, 12, 31)))
+        with self.assertRaises(ValueError):
+            donem_to_date_range(25)
+
+    def test_scope_normalizes_six_digit_donem(self):
+        scope = BootstrapScope(sube_id=1, donem_start=202507, donem_end=202508)
+        self.assertEqual(scope.donem_start, 2507)
+        self.assertEqual(scope.start_date, date(2025, 7, 1))
+        self.assertEqual(scope.end_date, date(2025, 8, 31))
+
+    @patch("api.v1.endpoints.bootstrap.crud.get_depo_kira_rapor")
+    def test_bootstrap_is_scoped_to_sube_and_donem(self, mock_depo_kira):
+        # Depo Kira report uses MySQL-specific SQL, mock it for SQLite
+        mock_depo_kira.return_value = [{"Donem": 2508, "Toplam_Tutar": 100.0}]
+
+        response = self.client.get("/api/v1/bootstrap", params={"sube_id": 1, "donem_start": 2508, "donem_end": 2508},
+                                   headers={"Accept-Encoding": "identity"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        datasets = data["datasets"]
+
+        self.assertEqual(data["scope"], {"sube_id": 1, "donem_start": 2508, "donem_end": 2508})
+        self.assertEqual([f["Fatura_Numarasi"] for f in datasets["e_faturalar"]], ["F1"])
+        self.assertEqual([g["Tutar"] for g in datasets["gelirler"]], [5.0])
+        self.assertEqual(datasets["b2b_ekstreler"][0]["Donem"], "2508")
+        self.assertEqual(datasets["depo_kira_rapor"], [{"Donem": 2508, "Toplam_Tutar": 100.0}])
+        mock_depo_kira.assert_called_once()
+        self.assertEqual(mock_depo_kira.call_args.kwargs["year"], 2025)
+
+    def test_bootstrap_is_gzip_compressed_when_accepted(self):
+        response = self.client.get("/api/v1/bootstrap", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        # The test client transparently decodes gzip, so parse the decoded body
+        data = response.json()
+        self.assertEqual(len(data["datasets"]["e_faturalar"]), 3)
+
+    def test_bootstrap_is_not_gzipped_when_refused(self):
+        for accept_encoding in ("gzip;q=0", "identity, gzip;q=0"):
+            response = self.client.get("/api/v1/bootstrap", headers={"Accept-Encoding": accept_encoding})
+            self.assertNotIn("content-encoding", response.headers, accept_encoding)
+
+    def test_gzip_chunks_round_trip(self):
+        chunks = [b'{"a":', b'[1,2,3]', b'}']
+        compressed = b"".join(bootstrap.gzip_chunks(iter(chunks)))
+        self.assertEqual(json.loads(gzip.decompress(compressed)), {"a": [1, 2, 3]})
+
+    def test_delta_sync_returns_changes_and_tombstones(self):
+        db = self.SessionLocal()
+        db.query(models.EFatura).update({models.EFatura.Kayit_Tarihi: datetime(2020, 1, 1)})
+        db.commit()
+        f1 = db.query(models.EFatura).filter(models.EFatura.Fatura_Numarasi == "F1").first()
+        f1.Aciklama = "changed"
+        f2 = db.query(models.EFatura).filter(models.EFatura.Fatura_Numarasi == "F2").first()
+        f2_id = f2.Fatura_ID
+        db.delete(f2)
+        db.commit()
+        db.close()
+
+        response = self.client.get("/api/v1/bootstrap", params={"since": "2024-01-01T00:00:00"},
+                                   headers={"Accept-Encoding": "identity"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+
+        self.assertEqual([f["Fatura_Numarasi"] for f in data["datasets"]["e_faturalar"]], ["F1"])
+        self.assertEqual(data["deleted"]["e_faturalar"], [f2_id])
+        self.assertIn("stoklar", data["full"])
+        self.assertNotIn("e_faturalar", data["full"])
+        self.assertIsNotNone(data["watermark"])
+
+    def test_full_snapshot_has_no_tombstones(self):
+        data = self.client.get("/api/v1/bootstrap", headers={"Accept-Encoding": "identity"}).json()
+        self.assertIsNone(data["since"])
+        self.assertNotIn("deleted", data)
+
+    def test_invalid_donem_is_rejected(self):
+        response = self.client.get("/api/v1/bootstrap", params={"donem_start": 25})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core.compression import CompressionMiddleware, negotiate_encoding
+from db.database import Base, get_db
+from db import models
+from api.v1 import reference_cache
+from api.v1.endpoints import kategori
+
+
+class TestNegotiateEncoding(unittest.TestCase):
+    def test_prefers_brotli(self):
+        self.assertEqual(negotiate_encoding("gzip, deflate, br"), "br")
+        self.assertEqual(negotiate_encoding("gzip"), "gzip")
+        self.assertEqual(negotiate_encoding("br;q=0.5, gzip"), "gzip")
+        self.assertEqual(negotiate_encoding("*"), "br")
+        self.assertIsNone(negotiate_encoding(""))
+        self.assertIsNone(negotiate_encoding("identity"))
+
+
+class TestCompressionMiddleware(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+        @app.get("/large")
+        def large():
+            return JSONResponse([{"Aciklama": "Fatura", "Tutar": i} for i in range(500)])
+
+        @app.get("/small")
+        def small():
+            return JSONResponse({"ok": True})
+
+        @app.get("/precompressed")
+        def precompressed():
+            return Response(content=b"x" * 2048, headers={"Content-Encoding": "identity"})
+
+        self.client = TestClient(app)
+
+    def test_large_response_is_compressed(self):
+        for accept, encoding in (("gzip, br", "br"), ("gzip", "gzip")):
+            response = self.client.get("/large", headers={"Accept-Encoding": accept})
+            self.assertEqual(response.headers["content-encoding"], encoding)
+            self.assertEqual(len(response.json()), 500)
+            self.assertIn("Accept-Encoding", response.headers["vary"])
+
+    def test_small_and_encoded_responses_are_untouched(self):
+        response = self.client.get("/small", headers={"Accept-Encoding": "gzip, br"})
+        self.assertNotIn("content-encoding", response.headers)
+
+        response = self.client.get("/precompressed", headers={"Accept-Encoding": "gzip, br"})
+        self.assertEqual(response.headers["content-encoding"], "identity")
+
+
+class TestReferenceCache(unittest.TestCase):
+    def setUp(self):
+        reference_cache.clear()
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        db.add(models.Kategori(Kategori_ID=1, Kategori_Adi="Kira", Tip="Gider"))
+        db.commit()
+        db.close()
+
+        app = FastAPI()
+        app.include_router(kategori.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def test_served_precompressed_from_memory(self):
+        response = self.client.get("/api/v1/kategoriler/", headers={"Accept-Encoding": "br"})
+        self.assertEqual(response.headers["content-encoding"], "br")
+        self.assertEqual([k["Kategori_Adi"] for k in response.json()], ["Kira"])
+        br_etag = response.headers["etag"]
+
+        response = self.client.get("/api/v1/kategoriler/", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        gzip_etag = response.headers["etag"]
+        response = self.client.get("/api/v1/kategoriler/", headers={"Accept-Encoding": ""})
+        self.assertNotIn("content-encoding", response.headers)
+        # Each encoding is its own representation with its own ETag and cache entry
+        self.assertEqual(len({br_etag, gzip_etag, response.headers["etag"]}), 3)
+        self.assertEqual(len(reference_cache._cache), 3)
+
+        response = self.client.get("/api/v1/kategoriler/", headers={"Accept-Encoding": "gzip", "If-None-Match": gzip_etag})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get("/api/v1/kategoriler/", headers={"Accept-Encoding": "br", "If-None-Match": gzip_etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_write_invalidates_cached_list(self):
+        self.client.get("/api/v1/kategoriler/")
+
+        db = self.SessionLocal()
+        db.add(models.Kategori(Kategori_ID=2, Kategori_Adi="Elektrik", Tip="Gider"))
+        db.commit()
+        db.close()
+
+        response = self.client.get("/api/v1/kategoriler/", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(len(response.json()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.database import Base, get_db
+from db import crud, models, versioning
+from api.v1.endpoints import e_fatura
+from schemas import e_fatura as e_fatura_schema
+
+
+def invoice(numara, alici="Tedarikçi", sube_id=1, **kwargs):
+    return {"Fatura_Tarihi": "2025-08-01", "Fatura_Numarasi": numara, "Alici_Unvani": alici,
+            "Tutar": "100.00", "Donem": 2508, "Sube_ID": sube_id, **kwargs}
+
+
+class TestEFaturaBulk(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        db.add_all([
+            models.Sube(Sube_ID=1, Sube_Adi="Merkez"),
+            models.Sube(Sube_ID=2, Sube_Adi="Sube 2"),
+            models.Kategori(Kategori_ID=7, Kategori_Adi="Elektrik", Tip="Gider"),
+            models.EFaturaReferans(Alici_Unvani="Enerji AŞ", Referans_Kodu="E", Kategori_ID=7),
+            models.EFatura(Fatura_ID=1, Fatura_Tarihi=date(2025, 8, 1), Fatura_Numarasi="F1", Alici_Unvani="A",
+                           Tutar=Decimal("1.00"), Donem=2508, Sube_ID=1),
+        ])
+        db.commit()
+        db.close()
+
+        app = FastAPI()
+        app.include_router(e_fatura.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def test_bulk_import_reports_per_row_outcome(self):
+        response = self.client.post("/api/v1/e-faturalar/", json=[
+            invoice("F1"),                   # already in the table
+            invoice("F1", sube_id=2),        # invoice numbers are unique across branches
+            invoice(""),                     # no invoice number
+            invoice("F2", alici="Enerji AŞ", sube_id=2),
+            invoice("F2", alici="Enerji AŞ", sube_id=2),  # repeated in the upload
+            invoice("F3"),
+        ])
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual((body["added"], body["skipped"], body["errors"]), (2, 4, 0))
+        self.assertEqual([r["status"] for r in body["results"]], ["skipped", "skipped", "skipped", "added", "skipped", "added"])
+        self.assertEqual([i["Fatura_Numarasi"] for i in body["added_invoices"]], ["F2", "F3"])
+        self.assertEqual(body["added_invoices"][0]["Kategori_ID"], 7)
+        self.assertEqual(body["results"][3]["Fatura_ID"], body["added_invoices"][0]["Fatura_ID"])
+
+        db = self.SessionLocal()
+        self.assertEqual(db.query(models.EFatura).count(), 3)
+        self.assertEqual(versioning.get_table_versions(db, [("e_Fatura", 2, 2508)]), [1])
+        db.close()
+
+    def test_rows_are_inserted_with_multi_row_statements(self):
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(self.engine, "before_cursor_execute", listener)
+        db = self.SessionLocal()
+        try:
+            crud.create_efaturas_bulk(db, [e_fatura_schema.EFaturaCreate(**invoice(f"N{i}")) for i in range(50)])
+        finally:
+            db.close()
+            event.remove(self.engine, "before_cursor_execute", listener)
+        inserts = [s for s in statements if s.startswith('INSERT INTO "e_Fatura"')]
+        self.assertEqual(len(inserts), 1)
+
+    def test_failing_row_does_not_abort_batch(self):
+        broken = e_fatura_schema.EFaturaCreate.model_construct(**{**invoice("BAD"), "Tutar": None, "Fatura_Tarihi": date(2025, 8, 1)})
+        good = e_fatura_schema.EFaturaCreate(**invoice("OK"))
+        db = self.SessionLocal()
+        result = crud.create_efaturas_bulk(db, [broken, good])
+        db.close()
+        self.assertEqual([r["status"] for r in result["results"]], ["error", "added"])
+
+        db = self.SessionLocal()
+        self.assertEqual({f.Fatura_Numarasi for f in db.query(models.EFatura)}, {"F1", "OK"})
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core.config import settings
+from db.database import Base, get_db
+from db import email_outbox, models
+from api.v1.endpoints import b2b_ekstre
+
+
+class FakeTransport:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.sent = []
+
+    def send(self, recipients, subject, body):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("smtp down")
+        self.sent.append((recipients, subject, body))
+        return f"m{len(self.sent)}"
+
+
+class TestEmailOutbox(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        db.add_all([
+            models.Sube(Sube_ID=1, Sube_Adi="Merkez"),
+            models.Rol(Rol_ID=1, Rol_Adi="Admin"),
+            models.Kullanici(Kullanici_ID=1, Adi_Soyadi="A", Kullanici_Adi="a", Password="x", Email="a@example.com"),
+            models.Kullanici(Kullanici_ID=2, Adi_Soyadi="B", Kullanici_Adi="b", Password="x", Email="b@example.com"),
+            models.Kullanici(Kullanici_ID=3, Adi_Soyadi="C", Kullanici_Adi="c", Password="x"),
+            models.KullaniciRol(Kullanici_ID=1, Rol_ID=1, Sube_ID=1),
+            models.KullaniciRol(Kullanici_ID=2, Rol_ID=1, Sube_ID=1),
+            models.KullaniciRol(Kullanici_ID=3, Rol_ID=1, Sube_ID=1),
+        ])
+        db.commit()
+        db.close()
+
+        # Dispatch runs when the test calls it, not on a background thread
+        self.woken = []
+        patches = [
+            mock.patch.object(email_outbox, "wake", side_effect=self.woken.append),
+            mock.patch.object(email_outbox, "_schedule"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.transport = FakeTransport()
+        email_outbox.set_transport(self.transport)
+        self.addCleanup(email_outbox.set_transport, None)
+
+        app = FastAPI()
+        app.include_router(b2b_ekstre.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def mail(self):
+        db = self.SessionLocal()
+        try:
+            return db.query(models.EpostaKuyrugu).one()
+        finally:
+            db.close()
+
+    def test_upload_queues_one_email_for_all_admins(self):
+        content = "Tarih,Fis No,Borc,Alacak\n01.08.2025,F1,10,0\n".encode("utf-8")
+        response = self.client.post("/api/v1/b2b-ekstreler/upload/", data={"sube_id": "1"},
+                                    files={"file": ("ekstre.csv", content, "text/csv")})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.transport.sent, [])
+        self.assertEqual(len(self.woken), 1)
+
+        self.assertEqual(email_outbox.dispatch_pending(self.engine), 1)
+        self.assertEqual(self.transport.sent, [(["a@example.com", "b@example.com"], "B2B Ekstre Yükleme", "'ekstre.csv' Yüklendi.")])
+        self.assertEqual(self.mail().Durum, "sent")
+
+    def test_failed_send_is_retried_with_backoff(self):
+        self.transport.failures = 1
+        db = self.SessionLocal()
+        email_outbox.enqueue(db, ["a@example.com"], "Konu", "Metin")
+        db.close()
+
+        self.assertEqual(email_outbox.dispatch_pending(self.engine), 0)
+        mail = self.mail()
+        self.assertEqual((mail.Durum, mail.Deneme_Sayisi), ("queued", 1))
+        self.assertGreater(mail.Sonraki_Deneme, datetime.now() + timedelta(seconds=settings.EMAIL_RETRY_BASE_SECONDS - 5))
+        email_outbox._schedule.assert_called_once()
+
+        # Not due yet
+        self.assertEqual(email_outbox.dispatch_pending(self.engine), 0)
+
+        db = self.SessionLocal()
+        db.query(models.EpostaKuyrugu).update({"Sonraki_Deneme": datetime.now() - timedelta(seconds=1)})
+        db.commit()
+        db.close()
+        self.assertEqual(email_outbox.dispatch_pending(self.engine), 1)
+        self.assertEqual((self.mail().Durum, self.mail().Deneme_Sayisi), ("sent", 2))
+
+    def test_gives_up_after_max_attempts(self):
+        self.transport.failures = settings.EMAIL_MAX_ATTEMPTS
+        db = self.SessionLocal()
+        email_outbox.enqueue(db, ["a@example.com"], "Konu", "Metin")
+        db.close()
+
+        for _ in range(settings.EMAIL_MAX_ATTEMPTS):
+            db = self.SessionLocal()
+            db.query(models.EpostaKuyrugu).update({"Sonraki_Deneme": None})
+            db.commit()
+            db.close()
+            email_outbox.dispatch_pending(self.engine)
+
+        mail = self.mail()
+        self.assertEqual((mail.Durum, mail.Deneme_Sayisi, mail.Hata), ("failed", settings.EMAIL_MAX_ATTEMPTS, "smtp down"))
+        self.assertEqual(self.transport.sent, [])
+
+    def test_interrupted_send_is_requeued_at_startup(self):
+        db = self.SessionLocal()
+        email_outbox.enqueue(db, ["a@example.com"], "Konu", "Metin")
+        email_outbox.enqueue(db, ["b@example.com"], "Konu", "Metin")
+        stale = datetime.now() - timedelta(minutes=settings.EMAIL_SENDING_STALE_MINUTES + 1)
+        db.query(models.EpostaKuyrugu).filter(models.EpostaKuyrugu.Eposta_ID == 1).update({"Durum": "sending", "Sonraki_Deneme": stale})
+        # Claimed just now, possibly by another process that is still sending it
+        db.query(models.EpostaKuyrugu).filter(models.EpostaKuyrugu.Eposta_ID == 2).update({"Durum": "sending", "Sonraki_Deneme": datetime.now()})
+        db.commit()
+        db.close()
+
+        self.assertEqual(email_outbox.requeue_interrupted(self.engine), 1)
+        self.assertEqual(email_outbox.dispatch_pending(self.engine), 1)
+        self.assertEqual(self.transport.sent, [(["a@example.com"], "Konu", "Metin")])
+
+
+if __name__ == "__main__":
+    unittest.main()
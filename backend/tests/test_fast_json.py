@@ -0,0 +1,121 @@
+import json
+import unittest
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.database import Base, get_db
+from db import models
+from api.v1 import fast_json
+from api.v1.endpoints import e_fatura, gelir, odeme
+from schemas import e_fatura as e_fatura_schema, gelir as gelir_schema, odeme as odeme_schema
+
+
+class TestFastJson(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        kayit = datetime(2025, 8, 1, 10, 30, 15)
+        db.add_all([
+            models.Sube(Sube_ID=1, Sube_Adi="Merkez"),
+            models.Kategori(Kategori_ID=1, Kategori_Adi="Satış", Tip="Gelir"),
+            models.EFatura(Fatura_ID=1, Fatura_Tarihi=date(2025, 8, 1), Fatura_Numarasi="F1", Alici_Unvani="Şirket A",
+                           Tutar=Decimal("1234.50"), Donem=2508, Sube_ID=1, Kayit_Tarihi=kayit),
+            models.EFatura(Fatura_ID=2, Fatura_Tarihi=date(2025, 8, 2), Fatura_Numarasi="F2", Alici_Unvani="B",
+                           Tutar=Decimal("10.00"), Kategori_ID=1, Aciklama="not", Donem=2508, Sube_ID=1, Ozel=True,
+                           Kayit_Tarihi=kayit),
+            models.Gelir(Gelir_ID=1, Sube_ID=1, Kategori_ID=1, Tarih=date(2025, 8, 1), Tutar=Decimal("99.90"),
+                         Kayit_Tarihi=kayit),
+            models.Odeme(Odeme_ID=1, Tip="Havale", Hesap_Adi="Banka", Tarih=date(2025, 8, 1), Aciklama="Kira",
+                         Tutar=Decimal("-500.25"), Donem=2508, Sube_ID=1, Kayit_Tarihi=kayit),
+        ])
+        db.commit()
+        db.close()
+
+        app = FastAPI()
+        app.include_router(e_fatura.router, prefix="/api/v1")
+        app.include_router(gelir.router, prefix="/api/v1")
+        app.include_router(odeme.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def assert_matches_response_model(self, url, schema, model):
+        db = self.SessionLocal()
+        adapter = TypeAdapter(List[schema])
+        expected = adapter.dump_json(adapter.validate_python(db.query(model).all(), from_attributes=True))
+        db.close()
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/json")
+        self.assertEqual(response.json(), json.loads(expected))
+
+    def test_output_matches_pydantic_serialization(self):
+        self.assert_matches_response_model("/api/v1/e-faturalar/", e_fatura_schema.EFaturaInDB, models.EFatura)
+        self.assert_matches_response_model("/api/v1/gelirler/", gelir_schema.GelirInDB, models.Gelir)
+        self.assert_matches_response_model("/api/v1/Odeme/", odeme_schema.OdemeInDB, models.Odeme)
+
+    def test_filters_and_etag_still_apply(self):
+        response = self.client.get("/api/v1/e-faturalar/", params={"after_id": 1})
+        self.assertEqual([row["Fatura_ID"] for row in response.json()], [2])
+
+        etag = response.headers["etag"]
+        response = self.client.get("/api/v1/e-faturalar/", params={"after_id": 1}, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_fields_limit_selected_columns(self):
+        response = self.client.get("/api/v1/e-faturalar/", params={"fields": "Fatura_ID,Fatura_Numarasi,Tutar,Kategori_ID"})
+        self.assertEqual(response.json(), [
+            {"Fatura_ID": 1, "Fatura_Numarasi": "F1", "Tutar": 1234.5, "Kategori_ID": None},
+            {"Fatura_ID": 2, "Fatura_Numarasi": "F2", "Tutar": 10.0, "Kategori_ID": 1},
+        ])
+
+        response = self.client.get("/api/v1/Odeme/", params={"fields": "Odeme_ID, Tutar"})
+        self.assertEqual(response.json(), [{"Odeme_ID": 1, "Tutar": "-500.25"}])
+
+    def test_fields_change_etag(self):
+        full = self.client.get("/api/v1/gelirler/")
+        sparse = self.client.get("/api/v1/gelirler/", params={"fields": "Gelir_ID"})
+        self.assertNotEqual(full.headers["etag"], sparse.headers["etag"])
+        self.assertEqual(sparse.json(), [{"Gelir_ID": 1}])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get("/api/v1/e-faturalar/", params={"fields": "Fatura_ID,Sifre"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_rows_are_written_in_chunks(self):
+        rows = [(i, Decimal("1.50")) for i in range(5)]
+        original = fast_json.CHUNK_ROWS
+        fast_json.CHUNK_ROWS = 2
+        try:
+            body = b"".join(fast_json.dump_rows(["ID", "Tutar"], rows, float))
+        finally:
+            fast_json.CHUNK_ROWS = original
+        self.assertEqual(json.loads(body), [{"ID": i, "Tutar": 1.5} for i in range(5)])
+        self.assertEqual(b"".join(fast_json.dump_rows(["ID"], [])), b"[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
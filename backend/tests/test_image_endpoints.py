@@ -0,0 +1,180 @@
+import base64
+import hashlib
+import io
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from datetime import date
+from decimal import Decimal
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core import blob_store
+from core.config import settings
+from db.database import Base, get_db
+from db import crud, image_store, models
+from api.v1.endpoints import diger_harcama, nakit
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+def make_jpeg(size=(800, 600)):
+    from PIL import Image
+    output = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(output, format="JPEG")
+    return output.getvalue()
+
+
+class TestImageEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.store_dir = tempfile.mkdtemp()
+        blob_store.set_blob_store(blob_store.LocalBlobStore(self.store_dir))
+        self.addCleanup(blob_store.set_blob_store, None)
+        self.addCleanup(shutil.rmtree, self.store_dir)
+
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        db.add_all([
+            models.Sube(Sube_ID=1, Sube_Adi="Merkez"),
+            models.Kategori(Kategori_ID=1, Kategori_Adi="Market", Tip="Gider"),
+            models.DigerHarcama(Harcama_ID=1, Alici_Adi="Market", Belge_Tarihi=date(2025, 8, 1), Donem=2508,
+                                Tutar=Decimal("10.00"), Kategori_ID=1, Harcama_Tipi="Nakit", Sube_ID=1,
+                                Imaj=PNG_BYTES, Imaj_Adi="fis.png"),
+            models.DigerHarcama(Harcama_ID=2, Alici_Adi="Market", Belge_Tarihi=date(2025, 8, 2), Donem=2508,
+                                Tutar=Decimal("20.00"), Kategori_ID=1, Harcama_Tipi="Nakit", Sube_ID=1),
+            models.Nakit(Nakit_ID=1, Tarih=date(2025, 8, 1), Tutar=Decimal("100.00"), Donem=2508, Sube_ID=1,
+                         Imaj=PNG_BYTES, Imaj_Adı="dekont.png"),
+        ])
+        db.commit()
+        db.close()
+
+        app = FastAPI()
+        app.include_router(diger_harcama.router, prefix="/api/v1")
+        app.include_router(nakit.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def test_list_carries_metadata_instead_of_image(self):
+        harcamalar = self.client.get("/api/v1/diger-harcamalar/").json()
+        self.assertNotIn("Imaj", harcamalar[0])
+        self.assertEqual([(h["has_imaj"], h["Imaj_Boyutu"]) for h in harcamalar], [(True, len(PNG_BYTES)), (False, None)])
+
+        nakitler = self.client.get("/api/v1/nakit/").json()
+        self.assertNotIn("Imaj", nakitler[0])
+        self.assertTrue(nakitler[0]["has_imaj"])
+
+    def test_list_fields_leave_out_image_columns(self):
+        harcamalar = self.client.get("/api/v1/diger-harcamalar/", params={"fields": "Harcama_ID,Tutar,has_imaj"}).json()
+        self.assertEqual(harcamalar, [
+            {"Harcama_ID": 1, "Tutar": 10.0, "has_imaj": True},
+            {"Harcama_ID": 2, "Tutar": 20.0, "has_imaj": False},
+        ])
+
+    def test_image_endpoint_returns_raw_bytes(self):
+        response = self.client.get("/api/v1/diger-harcamalar/1/image")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, PNG_BYTES)
+        self.assertEqual(response.headers["content-type"], "image/png")
+        self.assertEqual(response.headers["content-length"], str(len(PNG_BYTES)))
+
+        response = self.client.get("/api/v1/nakit/1/image")
+        self.assertEqual(response.content, PNG_BYTES)
+
+    def test_image_revalidation_returns_304(self):
+        etag = self.client.get("/api/v1/diger-harcamalar/1/image").headers["etag"]
+        response = self.client.get("/api/v1/diger-harcamalar/1/image", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_images_are_kept_out_of_the_database(self):
+        db = self.SessionLocal()
+        harcama = db.query(models.DigerHarcama).filter(models.DigerHarcama.Harcama_ID == 1).first()
+        nakit_row = db.query(models.Nakit).filter(models.Nakit.Nakit_ID == 1).first()
+        self.assertIsNone(harcama.Imaj)
+        self.assertEqual(harcama.Imaj_Boyutu, len(PNG_BYTES))
+        # Identical uploads share one blob
+        self.assertEqual(harcama.Imaj_Hash, nakit_row.Imaj_Hash)
+        self.assertEqual(blob_store.get_blob_store().get(harcama.Imaj_Hash), PNG_BYTES)
+
+        # Single-row reads still return the image inline
+        self.assertEqual(crud.get_diger_harcama(db, 1).Imaj, base64.b64encode(PNG_BYTES).decode("utf-8"))
+        db.close()
+
+    def test_blob_of_rolled_back_row_is_swept(self):
+        db = self.SessionLocal()
+        iptal = models.Nakit(Nakit_ID=2, Tarih=date(2025, 8, 2), Tutar=Decimal("5.00"), Donem=2508, Sube_ID=1,
+                             Imaj=make_jpeg(), Imaj_Adı="iptal.jpg")
+        db.add(iptal)
+        db.flush()
+        orphan = iptal.Imaj_Hash
+        db.rollback()
+
+        store = blob_store.get_blob_store()
+        # Still inside the grace period of a transaction that may yet commit
+        self.assertEqual(image_store.remove_orphan_blobs(db), 0)
+        with mock.patch.object(settings, "BLOB_ORPHAN_MINUTES", -1):
+            self.assertEqual(image_store.remove_orphan_blobs(db), 1)
+        db.close()
+        self.assertIsNone(store.get(orphan))
+        self.assertIsNone(store.get(orphan, thumbnail=True))
+        self.assertEqual(store.get(hashlib.sha256(PNG_BYTES).hexdigest()), PNG_BYTES)
+
+    def test_legacy_row_is_served_from_the_column(self):
+        db = self.SessionLocal()
+        db.execute(models.DigerHarcama.__table__.update()
+                   .where(models.DigerHarcama.Harcama_ID == 2)
+                   .values(Imaj=PNG_BYTES, Imaj_Adi="eski.png"))
+        db.commit()
+        db.close()
+
+        harcamalar = self.client.get("/api/v1/diger-harcamalar/").json()
+        self.assertEqual(harcamalar[1]["has_imaj"], True)
+        self.assertEqual(harcamalar[1]["Imaj_Boyutu"], len(PNG_BYTES))
+        self.assertEqual(self.client.get("/api/v1/diger-harcamalar/2/image").content, PNG_BYTES)
+
+    def test_thumbnail_is_generated_for_images(self):
+        jpeg = make_jpeg()
+        db = self.SessionLocal()
+        harcama = db.query(models.DigerHarcama).filter(models.DigerHarcama.Harcama_ID == 2).first()
+        harcama.Imaj = jpeg
+        harcama.Imaj_Adi = "fis.jpg"
+        db.commit()
+        db.close()
+
+        response = self.client.get("/api/v1/diger-harcamalar/2/image", params={"thumbnail": True})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "image/jpeg")
+        self.assertLess(len(response.content), len(jpeg))
+        self.assertTrue(response.headers["etag"].endswith('-thumb"'))
+
+        # Non-image blobs have no thumbnail, so the original is returned
+        response = self.client.get("/api/v1/diger-harcamalar/1/image", params={"thumbnail": True})
+        self.assertEqual(response.content, PNG_BYTES)
+
+    def test_missing_image_returns_404(self):
+        self.assertEqual(self.client.get("/api/v1/diger-harcamalar/2/image").status_code, 404)
+        self.assertEqual(self.client.get("/api/v1/diger-harcamalar/99/image").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
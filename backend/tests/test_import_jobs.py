@@ -0,0 +1,161 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core.config import settings
+from db.database import Base, get_db
+from db import models, odeme_matcher
+from api.v1 import import_jobs
+from api.v1.endpoints import jobs, odeme
+
+HEADER = "Tip;Hesap Adı;Tarih;Açıklama;Tutar\n"
+
+
+class QueuedExecutor:
+    """Holds submitted jobs until the test runs them, instead of racing the request thread."""
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append((fn, args))
+
+    def run_all(self):
+        while self.submitted:
+            fn, args = self.submitted.pop(0)
+            fn(*args)
+
+
+class TestImportJobs(unittest.TestCase):
+    def setUp(self):
+        odeme_matcher.clear_cache()
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        db.add(models.Sube(Sube_ID=1, Sube_Adi="Merkez"))
+        db.commit()
+        db.close()
+
+        self.job_dir = tempfile.TemporaryDirectory()
+        self.executor = QueuedExecutor()
+        patches = [
+            mock.patch.object(settings, "IMPORT_JOB_PATH", self.job_dir.name),
+            mock.patch.object(import_jobs, "_get_executor", return_value=self.executor),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.job_dir.cleanup)
+
+        app = FastAPI()
+        app.include_router(odeme.router, prefix="/api/v1")
+        app.include_router(jobs.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def upload(self, lines):
+        content = (HEADER + "".join(line + "\n" for line in lines)).encode("utf-8")
+        return self.client.post("/api/v1/odeme/upload-csv/?background=true",
+                                files={"file": ("ekstre.csv", content, "text/csv")})
+
+    def test_background_upload_reports_progress_through_job(self):
+        response = self.upload([
+            "Havale;Banka;02/08/2025;AGUSTOS KIRA;-1.500,00",
+            "Havale;Banka;02/08/2025;AGUSTOS KIRA;-1.500,00",
+            "Havale;Banka;;TARIHSIZ;-5,00",
+            "EFT;Banka;03/09/2025;MARKET;-42.10",
+        ])
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+        self.assertEqual(self.client.get(f"/api/v1/jobs/{job_id}").json()["Durum"], "queued")
+        self.assertEqual(len(os.listdir(self.job_dir.name)), 1)
+
+        self.executor.run_all()
+
+        job = self.client.get(f"/api/v1/jobs/{job_id}").json()
+        self.assertEqual(job["Durum"], "completed")
+        self.assertEqual((job["Okunan"], job["Eklenen"], job["Atlanan"], job["Hatali"]), (4, 2, 1, 1))
+        self.assertEqual(os.listdir(self.job_dir.name), [])
+
+        db = self.SessionLocal()
+        self.assertEqual(db.query(models.Odeme).count(), 2)
+        db.close()
+
+    def test_failed_import_is_recorded(self):
+        content = "Tip;Tarih\n".encode("utf-16")
+        response = self.client.post("/api/v1/odeme/upload-csv/?background=true",
+                                    files={"file": ("ekstre.csv", content, "text/csv")})
+        job_id = response.json()["job_id"]
+        self.executor.run_all()
+
+        job = self.client.get(f"/api/v1/jobs/{job_id}").json()
+        self.assertEqual(job["Durum"], "failed")
+        self.assertTrue(job["Hata"])
+
+    def test_job_is_claimed_once(self):
+        job_id = self.upload(["EFT;Banka;03/09/2025;MARKET;-42.10"]).json()["job_id"]
+        fn, args = self.executor.submitted[0]
+        self.executor.run_all()
+        fn(*args)  # a second worker picking the same job up does nothing
+
+        db = self.SessionLocal()
+        self.assertEqual(db.query(models.Odeme).count(), 1)
+        self.assertEqual(db.get(models.AktarimIsi, job_id).Eklenen, 1)
+        db.close()
+
+    def test_startup_fails_stale_running_jobs_and_resumes_queued(self):
+        paths = []
+        for name in ("stale.csv", "fresh.csv", "queued.csv", "orphan.csv"):
+            paths.append(os.path.join(self.job_dir.name, name))
+            with open(paths[-1], "w") as f:
+                f.write(HEADER)
+        old = (datetime.now() - timedelta(minutes=settings.IMPORT_JOB_STALE_MINUTES + 1)).timestamp()
+        os.utime(paths[3], (old, old))
+
+        db = self.SessionLocal()
+        db.add_all([
+            models.AktarimIsi(Is_ID=1, Tur="odeme", Durum="running", Dosya_Adi="a.csv", Dosya_Yolu=paths[0],
+                              Baslama_Tarihi=datetime.now() - timedelta(minutes=settings.IMPORT_JOB_STALE_MINUTES + 1)),
+            models.AktarimIsi(Is_ID=2, Tur="odeme", Durum="running", Dosya_Adi="b.csv", Dosya_Yolu=paths[1],
+                              Baslama_Tarihi=datetime.now()),
+            models.AktarimIsi(Is_ID=3, Tur="odeme", Durum="queued", Dosya_Adi="c.csv", Dosya_Yolu=paths[2]),
+        ])
+        db.commit()
+        db.close()
+
+        import_jobs.resume_queued_jobs(self.engine)
+
+        db = self.SessionLocal()
+        self.assertEqual([job.Durum for job in db.query(models.AktarimIsi).order_by(models.AktarimIsi.Is_ID)],
+                         ["failed", "running", "queued"])
+        db.close()
+        self.assertEqual(sorted(os.listdir(self.job_dir.name)), ["fresh.csv", "queued.csv"])
+        self.assertEqual([args for _, args in self.executor.submitted], [(3, self.engine)])
+
+    def test_unknown_job(self):
+        self.assertEqual(self.client.get("/api/v1/jobs/999").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
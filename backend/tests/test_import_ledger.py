@@ -0,0 +1,113 @@
+import unittest
+from datetime import date
+
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.database import Base, get_db
+from db import import_ledger, models, odeme_matcher
+from api.v1.endpoints import odeme
+
+HEADER = "Tip;Hesap Adı;Tarih;Açıklama;Tutar"
+AUGUST = [
+    "Havale;Banka;01/08/2025;KIRA;-1.500,00",
+    "Havale;Banka;05/08/2025;MARKET;-42,10",
+    "Havale;Banka;10/08/2025;ELEKTRIK;-300,00",
+]
+
+
+class TestImportLedger(unittest.TestCase):
+    def setUp(self):
+        odeme_matcher.clear_cache()
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        db.add(models.Sube(Sube_ID=1, Sube_Adi="Merkez"))
+        db.commit()
+        db.close()
+
+        app = FastAPI()
+        app.include_router(odeme.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def upload(self, lines, newline="\n", bom=False):
+        content = ("\ufeff" if bom else "") + "".join(line + newline for line in [HEADER] + lines)
+        response = self.client.post("/api/v1/odeme/upload-csv/", files={"file": ("ekstre.csv", content.encode("utf-8"), "text/csv")})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_identical_file_returns_previous_result(self):
+        first = self.upload(AUGUST)
+        self.assertEqual((first["added"], first["skipped"]), (3, 0))
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            again = self.upload(AUGUST, newline="\r\n", bom=True)
+        finally:
+            event.remove(self.engine, "before_cursor_execute", listener)
+        self.assertTrue(again["duplicate"])
+        self.assertEqual((again["added"], again["skipped"]), (3, 0))
+        self.assertEqual([s for s in statements if '"Odeme"' in s], [])
+
+    def test_overlapping_file_is_checked_row_by_row(self):
+        self.upload(AUGUST)
+        # Another account's statement for the same month
+        result = self.upload([
+            "Havale;Banka;05/08/2025;MARKET;-42,10",     # already imported from the first file
+            "Havale;Garanti;06/08/2025;SU;-80,00",
+            "Havale;Garanti;12/08/2025;INTERNET;-250,00",
+        ])
+        self.assertNotIn("duplicate", result)
+        self.assertEqual((result["added"], result["skipped"]), (2, 1))
+
+        db = self.SessionLocal()
+        self.assertEqual({o.Aciklama for o in db.query(models.Odeme)}, {"KIRA", "MARKET", "ELEKTRIK", "SU", "INTERNET"})
+        entry = db.query(models.AktarimKaydi).order_by(models.AktarimKaydi.Kayit_ID.desc()).first()
+        self.assertEqual((entry.Ilk_Tarih, entry.Son_Tarih), (date(2025, 8, 5), date(2025, 8, 12)))
+        db.close()
+
+    def test_deletion_invalidates_ledger(self):
+        self.upload(AUGUST)
+        db = self.SessionLocal()
+        db.delete(db.query(models.Odeme).filter(models.Odeme.Aciklama == "MARKET").one())
+        db.commit()
+        db.close()
+
+        result = self.upload(AUGUST)
+        self.assertNotIn("duplicate", result)
+        self.assertEqual((result["added"], result["skipped"]), (1, 2))
+
+        db = self.SessionLocal()
+        entry = db.query(models.AktarimKaydi).one()
+        self.assertEqual((entry.Eklenen, entry.Atlanan), (1, 2))
+        db.close()
+
+    def test_scope_tracks_file_span(self):
+        scope = import_ledger.ImportScope()
+        scope.see(date(2025, 8, 10))
+        scope.see_dates(pd.Series(pd.to_datetime(["2025-08-15", None, "2025-08-01"])))
+        self.assertEqual((scope.first, scope.last), (date(2025, 8, 1), date(2025, 8, 15)))
+
+if __name__ == "__main__":
+    unittest.main()
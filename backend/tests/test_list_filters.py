@@ -0,0 +1,140 @@
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core.config import settings
+from db.database import Base, get_db
+from db import crud, models
+from api.v1.endpoints import calisan_talep, e_fatura, gelir
+
+
+class TestListFilters(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.db = self.SessionLocal()
+
+        self.db.add_all([
+            models.Sube(Sube_ID=1, Sube_Adi="Merkez"),
+            models.Sube(Sube_ID=2, Sube_Adi="Sube 2"),
+            models.Kategori(Kategori_ID=1, Kategori_Adi="POS", Tip="Gelir"),
+        ])
+        for i in range(1, 6):
+            self.db.add(models.EFatura(Fatura_ID=i, Fatura_Tarihi=date(2025, 8, i), Fatura_Numarasi=f"F{i}",
+                                       Alici_Unvani="A", Tutar=Decimal("1.00"), Donem=2508, Sube_ID=1))
+        self.db.add(models.EFatura(Fatura_ID=6, Fatura_Tarihi=date(2025, 7, 1), Fatura_Numarasi="F6",
+                                   Alici_Unvani="A", Tutar=Decimal("1.00"), Donem=2507, Sube_ID=1))
+        self.db.add(models.EFatura(Fatura_ID=7, Fatura_Tarihi=date(2025, 8, 1), Fatura_Numarasi="F7",
+                                   Alici_Unvani="A", Tutar=Decimal("1.00"), Donem=2508, Sube_ID=2))
+        self.db.add_all([
+            models.Gelir(Gelir_ID=1, Sube_ID=1, Tarih=date(2025, 7, 31), Kategori_ID=1, Tutar=Decimal("1.00")),
+            models.Gelir(Gelir_ID=2, Sube_ID=1, Tarih=date(2025, 8, 1), Kategori_ID=1, Tutar=Decimal("2.00")),
+            models.Gelir(Gelir_ID=3, Sube_ID=1, Tarih=date(2025, 8, 31), Kategori_ID=1, Tutar=Decimal("3.00")),
+            models.Gelir(Gelir_ID=4, Sube_ID=2, Tarih=date(2025, 8, 15), Kategori_ID=1, Tutar=Decimal("4.00")),
+        ])
+        self.db.commit()
+
+        app = FastAPI()
+        app.include_router(e_fatura.router, prefix="/api/v1")
+        app.include_router(gelir.router, prefix="/api/v1")
+        app.include_router(calisan_talep.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_filters_by_sube_and_donem(self):
+        faturalar = crud.get_efaturalar(self.db, sube_id=1, donem=2508)
+        self.assertEqual([f.Fatura_ID for f in faturalar], [1, 2, 3, 4, 5])
+        # Six-digit periods are accepted as well
+        self.assertEqual(len(crud.get_efaturalar(self.db, donem=202508)), 6)
+
+    def test_donem_falls_back_to_date_range(self):
+        gelirler = crud.get_gelirler(self.db, sube_id=1, donem=2508)
+        self.assertEqual([g.Gelir_ID for g in gelirler], [2, 3])
+
+    def test_date_range_filter(self):
+        faturalar = crud.get_efaturalar(self.db, start_date=date(2025, 8, 2), end_date=date(2025, 8, 3))
+        self.assertEqual([f.Fatura_ID for f in faturalar], [2, 3])
+
+    def test_since_returns_only_changed_rows(self):
+        self.db.query(models.EFatura).update({models.EFatura.Kayit_Tarihi: datetime(2020, 1, 1)})
+        self.db.commit()
+        fatura = crud.get_efatura(self.db, efatura_id=3)
+        fatura.Aciklama = "changed"
+        self.db.commit()
+
+        faturalar = crud.get_efaturalar(self.db, since=datetime(2024, 1, 1))
+        self.assertEqual([f.Fatura_ID for f in faturalar], [3])
+
+    def test_since_reports_deleted_rows_and_watermark(self):
+        self.db.delete(crud.get_efatura(self.db, efatura_id=2))
+        self.db.commit()
+
+        response = self.client.get("/api/v1/e-faturalar/", params={"since": "2024-01-01T00:00:00", "sube_id": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Deleted-Ids"], "2")
+        # Set back by the margin, so rows of transactions still open now are sent again next time
+        watermark = datetime.fromisoformat(response.headers["X-Sync-Watermark"])
+        database_now = self.db.query(func.now()).scalar()
+        self.assertLessEqual(watermark, database_now - timedelta(seconds=settings.SYNC_WATERMARK_MARGIN_SECONDS))
+
+        self.assertNotIn("X-Deleted-Ids", self.client.get("/api/v1/e-faturalar/").headers)
+
+    def test_keyset_pagination_endpoint(self):
+        params = {"sube_id": 1, "donem": 2508, "limit": 2}
+        first_page = self.client.get("/api/v1/e-faturalar/", params=params).json()
+        self.assertEqual([f["Fatura_ID"] for f in first_page], [1, 2])
+
+        params["after_id"] = first_page[-1]["Fatura_ID"]
+        second_page = self.client.get("/api/v1/e-faturalar/", params=params).json()
+        self.assertEqual([f["Fatura_ID"] for f in second_page], [3, 4])
+
+        params["after_id"] = second_page[-1]["Fatura_ID"]
+        last_page = self.client.get("/api/v1/e-faturalar/", params=params).json()
+        self.assertEqual([f["Fatura_ID"] for f in last_page], [5])
+
+    def test_malformed_donem_is_rejected(self):
+        for donem in ("25", "2513", "999999"):
+            response = self.client.get("/api/v1/gelirler/", params={"donem": donem})
+            self.assertEqual(response.status_code, 400, donem)
+
+    def test_filter_without_column_is_rejected(self):
+        # Calisan_Talep has neither a Donem nor a date column
+        response = self.client.get("/api/v1/calisan-talepler/", params={"donem": 2508})
+        self.assertEqual(response.status_code, 400)
+
+    def test_since_on_untracked_table_is_rejected(self):
+        self.assertNotIn("Stok_Fiyat", models.TOMBSTONE_TABLES)
+        with self.assertRaises(HTTPException) as raised:
+            crud.get_stok_fiyatlar(self.db, since=datetime(2024, 1, 1))
+        self.assertEqual(raised.exception.status_code, 400)
+
+    def test_unfiltered_endpoint_returns_everything(self):
+        response = self.client.get("/api/v1/gelirler/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+from unittest import mock
+from datetime import date
+from decimal import Decimal
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core.config import settings
+from db.database import Base, get_db
+from db import crud, models, odeme_matcher, versioning
+from api.v1.endpoints import odeme
+
+HEADER = "Tip;Hesap Adı;Tarih;Açıklama;Tutar\n"
+
+
+class TestOdemeUpload(unittest.TestCase):
+    def setUp(self):
+        odeme_matcher.clear_cache()
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        db.add_all([
+            models.Sube(Sube_ID=1, Sube_Adi="Merkez"),
+            models.Kategori(Kategori_ID=5, Kategori_Adi="Kira", Tip="Gider"),
+            models.Kategori(Kategori_ID=6, Kategori_Adi="Depo Kirası", Tip="Gider"),
+            models.OdemeReferans(Referans_ID=1, Referans_Metin="KIRA", Kategori_ID=5),
+            models.OdemeReferans(Referans_ID=2, Referans_Metin="DEPO", Kategori_ID=6),
+            models.OdemeReferans(Referans_ID=3, Referans_Metin="MARKET", Kategori_ID=6, Aktif_Pasif=False),
+            models.Odeme(Tip="Havale", Hesap_Adi="Banka", Tarih=date(2025, 8, 1), Aciklama="ESKI",
+                         Tutar=Decimal("-10.00"), Donem=2508, Sube_ID=1),
+        ])
+        db.commit()
+        db.close()
+
+        app = FastAPI()
+        app.include_router(odeme.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def upload(self, lines):
+        content = (HEADER + "".join(line + "\n" for line in lines)).encode("utf-8")
+        return self.client.post("/api/v1/odeme/upload-csv/", files={"file": ("ekstre.csv", content, "text/csv")})
+
+    def test_upload_skips_existing_and_repeated_lines(self):
+        response = self.upload([
+            "Havale;Banka;01/08/2025;ESKI;-10,00",          # already in the table
+            "Havale;Banka;02/08/2025;AGUSTOS KIRA;-1.500,00",
+            "Havale;Banka;02/08/2025;AGUSTOS KIRA;-1.500,00",  # repeated in the file
+            "Havale;Banka;;TARIHSIZ;-5,00",                   # no date
+            "EFT;Banka;03/09/2025;MARKET;-42.10",
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()["added"], response.json()["skipped"]), (2, 3))
+
+        db = self.SessionLocal()
+        kira = db.query(models.Odeme).filter(models.Odeme.Aciklama == "AGUSTOS KIRA").one()
+        self.assertEqual((kira.Tutar, kira.Kategori_ID, kira.Donem), (Decimal("-1500.00"), 5, 2508))
+        self.assertEqual(versioning.get_table_versions(db, [("Odeme", 1, 2509)]), [1])
+        db.close()
+
+    def test_upload_is_batched(self):
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            response = self.upload([f"EFT;Banka;{1 + i % 28:02d}/08/2025;SATIR {i};-{i},00" for i in range(200)])
+        finally:
+            event.remove(self.engine, "before_cursor_execute", listener)
+        self.assertEqual(response.json()["added"], 200)
+        self.assertEqual(len([s for s in statements if s.startswith('INSERT INTO "Odeme"')]), 1)
+        self.assertEqual(len([s for s in statements if s.startswith("SELECT") and 'FROM "Odeme"' in s]), 1)
+
+    def test_upload_commits_in_chunks(self):
+        lines = [f"EFT;Banka;{1 + i % 10:02d}/08/2025;SATIR {i % 10};-{i % 10},00" for i in range(20)]
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            with mock.patch.object(settings, "UPLOAD_CHUNK_ROWS", 6):
+                response = self.upload(lines)
+        finally:
+            event.remove(self.engine, "before_cursor_execute", listener)
+        # Lines repeated in a later chunk are found by that chunk's prefetch
+        self.assertEqual((response.json()["added"], response.json()["skipped"]), (10, 10))
+        self.assertEqual(len([s for s in statements if s.startswith('INSERT INTO "Odeme"')]), 2)
+
+    def test_matcher_uses_lowest_active_referans(self):
+        db = self.SessionLocal()
+        matcher = odeme_matcher.get_matcher(db)
+        self.assertEqual(matcher.kategori_for("DEPO KIRA ODEMESI"), 5)
+        self.assertEqual(matcher.kategori_for("DEPO BAKIM"), 6)
+        self.assertIsNone(matcher.kategori_for("MARKET"))
+        self.assertIsNone(matcher.kategori_for(None))
+
+        db.query(models.OdemeReferans).filter(models.OdemeReferans.Referans_ID == 3).update({"Aktif_Pasif": True})
+        versioning.bump_table_version(db, "Odeme_Referans")
+        db.commit()
+        self.assertEqual(odeme_matcher.get_matcher(db).kategori_for("MARKET"), 6)
+        db.close()
+
+    def test_reclassify_fills_missing_categories(self):
+        db = self.SessionLocal()
+        db.add_all([
+            models.Odeme(Tip="EFT", Hesap_Adi="Banka", Tarih=date(2025, 8, 5), Aciklama="DEPO TEMIZLIK",
+                         Tutar=Decimal("-20.00"), Donem=2508, Sube_ID=1),
+            models.Odeme(Tip="EFT", Hesap_Adi="Banka", Tarih=date(2025, 8, 6), Aciklama="KIRA ELLE",
+                         Tutar=Decimal("-30.00"), Kategori_ID=6, Donem=2508, Sube_ID=1),
+        ])
+        db.commit()
+        self.assertEqual(crud.reclassify_odemeler(db), {"checked": 2, "updated": 1})
+        kategoriler = dict(db.query(models.Odeme.Aciklama, models.Odeme.Kategori_ID))
+        self.assertEqual(kategoriler["DEPO TEMIZLIK"], 6)
+        self.assertEqual(kategoriler["KIRA ELLE"], 6)
+
+        self.assertEqual(crud.reclassify_odemeler(db, only_uncategorized=False)["updated"], 1)
+        self.assertEqual(db.query(models.Odeme.Kategori_ID).filter(models.Odeme.Aciklama == "KIRA ELLE").scalar(), 5)
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.database import Base, get_db
+from db import models
+from api.v1.endpoints import ozet_kontrol_raporu
+
+
+class TestOzetKontrolRaporu(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        db.add_all([
+            models.Sube(Sube_ID=1, Sube_Adi="Merkez"),
+            models.Sube(Sube_ID=2, Sube_Adi="Kadıköy"),
+            models.UstKategori(UstKategori_ID=1, UstKategori_Adi="Nakit"),
+            models.UstKategori(UstKategori_ID=2, UstKategori_Adi="Kredi Kartı"),
+            models.UstKategori(UstKategori_ID=3, UstKategori_Adi="Yemek Çeki"),
+            models.UstKategori(UstKategori_ID=4, UstKategori_Adi="E-Ticaret Kredi Kart"),
+            models.Kategori(Kategori_ID=10, Kategori_Adi="Nakit", Tip="Gelir", Ust_Kategori_ID=1),
+            models.Kategori(Kategori_ID=11, Kategori_Adi="POS", Tip="Gelir", Ust_Kategori_ID=2),
+            models.Kategori(Kategori_ID=12, Kategori_Adi="Sodexo", Tip="Gelir", Ust_Kategori_ID=3),
+            models.Kategori(Kategori_ID=13, Kategori_Adi="Online", Tip="Gelir", Ust_Kategori_ID=4),
+            models.Kategori(Kategori_ID=14, Kategori_Adi="ATM Para Yatırma", Tip="Gider"),
+            models.Kategori(Kategori_ID=15, Kategori_Adi="Kira", Tip="Gider"),
+        ])
+        gelirler = [
+            (1, date(2025, 7, 25), 12, "40"),   # booked before the period against the August voucher
+            (1, date(2025, 8, 3), 10, "100"),
+            (1, date(2025, 8, 4), 11, "200"),
+            (1, date(2025, 8, 5), 12, "50"),
+            (1, date(2025, 8, 6), 13, "30"),
+            (1, date(2025, 9, 2), 10, "70"),
+            (2, date(2025, 8, 3), 10, "500"),
+        ]
+        db.add_all(models.Gelir(Sube_ID=sube_id, Tarih=tarih, Kategori_ID=kategori_id, Tutar=Decimal(tutar))
+                   for sube_id, tarih, kategori_id, tutar in gelirler)
+        db.add_all([
+            models.GelirEkstra(Sube_ID=1, Tarih=date(2025, 8, 3), RobotPos_Tutar=Decimal("400")),
+            models.GelirEkstra(Sube_ID=1, Tarih=date(2025, 9, 1), RobotPos_Tutar=Decimal("90")),
+            models.EFatura(Fatura_Tarihi=date(2025, 8, 2), Fatura_Numarasi="F1", Alici_Unvani="A", Tutar=Decimal("20"),
+                           Donem=2508, Gunluk_Harcama=True, Sube_ID=1),
+            models.EFatura(Fatura_Tarihi=date(2025, 8, 2), Fatura_Numarasi="F2", Alici_Unvani="A", Tutar=Decimal("999"),
+                           Donem=2508, Gunluk_Harcama=False, Sube_ID=1),
+            models.DigerHarcama(Alici_Adi="B", Belge_Tarihi=date(2025, 8, 2), Donem=2508, Tutar=Decimal("10"),
+                                Kategori_ID=15, Harcama_Tipi="Nakit", Gunluk_Harcama=True, Sube_ID=1),
+            models.Nakit(Tarih=date(2025, 8, 7), Tutar=Decimal("60"), Tip="Bankaya Yatan", Donem=2508, Sube_ID=1),
+            models.Odeme(Tip="ATM", Hesap_Adi="Banka", Tarih=date(2025, 8, 7), Aciklama="ATM", Tutar=Decimal("80"),
+                         Kategori_ID=14, Donem=2508, Sube_ID=1),
+            models.Odeme(Tip="Havale", Hesap_Adi="Banka", Tarih=date(2025, 8, 8), Aciklama="KIRA", Tutar=Decimal("1000"),
+                         Kategori_ID=15, Donem=2508, Sube_ID=1),
+            models.POSHareketleri(Islem_Tarihi=date(2025, 8, 4), Hesaba_Gecis=date(2025, 8, 5), Para_Birimi="TRY",
+                                  Islem_Tutari=Decimal("195"), Kesinti_Tutari=Decimal("5"), Net_Tutar=Decimal("190"), Sube_ID=1),
+            models.B2BEkstre(Tarih=date(2025, 8, 9), Fis_No="V1", Aciklama="Online Alacak Virman 1", Alacak=Decimal("25"),
+                             Donem=2508, Sube_ID=1),
+            models.YemekCeki(Kategori_ID=12, Tarih=date(2025, 7, 20), Tutar=Decimal("300"), Odeme_Tarih=date(2025, 9, 1),
+                             Ilk_Tarih=date(2025, 7, 20), Son_Tarih=date(2025, 8, 20), Sube_ID=1),
+        ])
+        db.commit()
+        db.close()
+
+        app = FastAPI()
+        app.include_router(ozet_kontrol_raporu.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def test_single_report_has_all_figures(self):
+        response = self.client.get("/api/v1/ozet-kontrol-raporu/1/202508")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "Sube_ID": 1, "Donem": 2508,
+            "robotpos_tutar": 400.0, "toplam_satis_gelirleri": 380.0, "nakit": 100.0,
+            "gunluk_harcama_efatura": 20.0, "gunluk_harcama_diger": 10.0, "kalan_nakit": 70.0,
+            "nakit_girisi_toplam": 60.0, "bankaya_yatan": 80.0, "gelir_pos": 200.0, "pos_hareketleri": 195.0,
+            "gelir_toplam": 30.0, "virman_toplam": -25.0, "aylik_gelir": 50.0, "toplam_donem": 260.0,
+        })
+
+    def test_several_branches_and_periods_in_one_query(self):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            response = self.client.get("/api/v1/ozet-kontrol-raporu/?sube_id=1&sube_id=2&donem=2508&donem=2509")
+        finally:
+            event.remove(self.engine, "before_cursor_execute", listener)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(statements), 1)
+
+        raporlar = {(r["Sube_ID"], r["Donem"]): r for r in response.json()}
+        self.assertEqual(list(raporlar), [(1, 2508), (1, 2509), (2, 2508), (2, 2509)])
+        self.assertEqual(raporlar[(1, 2508)]["toplam_donem"], 260.0)
+        self.assertEqual((raporlar[(1, 2509)]["robotpos_tutar"], raporlar[(1, 2509)]["nakit"], raporlar[(1, 2509)]["toplam_donem"]),
+                         (90.0, 70.0, 0.0))
+        self.assertEqual((raporlar[(2, 2508)]["toplam_satis_gelirleri"], raporlar[(2, 2508)]["kalan_nakit"]), (500.0, 500.0))
+        self.assertTrue(all(value == 0 for key, value in raporlar[(2, 2509)].items() if key not in ("Sube_ID", "Donem")))
+
+
+if __name__ == "__main__":
+    unittest.main()
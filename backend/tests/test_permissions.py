@@ -0,0 +1,103 @@
+import unittest
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core.security import create_access_token
+from db.database import Base, get_db
+from db import models, permissions, principals
+from api.v1 import deps
+
+
+class TestPermissions(unittest.TestCase):
+    def setUp(self):
+        permissions.clear_cache()
+        principals.clear_cache()
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        db.add_all([
+            models.Sube(Sube_ID=1, Sube_Adi="Merkez"),
+            models.Sube(Sube_ID=2, Sube_Adi="Sube 2"),
+            models.Kullanici(Kullanici_ID=1, Adi_Soyadi="Test", Kullanici_Adi="test", Password="x", Aktif_Pasif=True),
+            models.Rol(Rol_ID=1, Rol_Adi="Muhasebe"),
+            models.Rol(Rol_ID=2, Rol_Adi="Sube"),
+            models.Yetki(Yetki_ID=1, Yetki_Adi="Fatura Görüntüle"),
+            models.Yetki(Yetki_ID=2, Yetki_Adi="Nakit Girişi"),
+            models.Yetki(Yetki_ID=3, Yetki_Adi="Rapor"),
+            models.KullaniciRol(Kullanici_ID=1, Rol_ID=1, Sube_ID=1),
+            models.KullaniciRol(Kullanici_ID=1, Rol_ID=2, Sube_ID=2),
+            models.RolYetki(Rol_ID=1, Yetki_ID=1, Aktif_Pasif=True),
+            models.RolYetki(Rol_ID=2, Yetki_ID=1, Aktif_Pasif=True),
+            models.RolYetki(Rol_ID=2, Yetki_ID=2, Aktif_Pasif=True),
+            models.RolYetki(Rol_ID=2, Yetki_ID=3, Aktif_Pasif=False),
+        ])
+        db.commit()
+        db.close()
+
+        app = FastAPI()
+
+        @app.get("/nakit", dependencies=[Depends(deps.check_permission("Nakit Girişi"))])
+        def nakit():
+            return {"ok": True}
+
+        @app.get("/rapor", dependencies=[Depends(deps.check_permission("Rapor"))])
+        def rapor():
+            return {"ok": True}
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+        self.headers = {"Authorization": f"Bearer {create_access_token({'sub': 'test'})}"}
+
+    def test_permissions_are_resolved_in_one_query(self):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(self.engine, "before_cursor_execute", listener)
+        db = self.SessionLocal()
+        try:
+            result = permissions.load_user_permissions(db, 1)
+        finally:
+            db.close()
+            event.remove(self.engine, "before_cursor_execute", listener)
+        self.assertEqual(result, frozenset({"Fatura Görüntüle", "Nakit Girişi"}))
+        self.assertEqual(len(statements), 1)
+
+    def test_check_permission(self):
+        self.assertEqual(self.client.get("/nakit", headers=self.headers).status_code, 200)
+        self.assertEqual(self.client.get("/rapor", headers=self.headers).status_code, 403)
+
+    def test_role_change_invalidates_cache(self):
+        self.assertEqual(self.client.get("/rapor", headers=self.headers).status_code, 403)
+
+        db = self.SessionLocal()
+        rol_yetki = db.query(models.RolYetki).filter(models.RolYetki.Rol_ID == 2, models.RolYetki.Yetki_ID == 3).first()
+        rol_yetki.Aktif_Pasif = True
+        db.commit()
+        db.close()
+        self.assertEqual(self.client.get("/rapor", headers=self.headers).status_code, 200)
+
+        db = self.SessionLocal()
+        db.query(models.KullaniciRol).filter(models.KullaniciRol.Rol_ID == 2).delete()
+        db.commit()
+        db.close()
+        self.assertEqual(self.client.get("/nakit", headers=self.headers).status_code, 403)
+
+
+if __name__ == "__main__":
+    unittest.main()
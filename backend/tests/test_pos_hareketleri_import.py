@@ -0,0 +1,125 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core.config import settings
+from db.database import Base, get_db
+from db import crud, models, versioning
+from api.v1.endpoints import pos_hareketleri
+
+
+class TestPOSHareketleriImport(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        db.add_all([
+            models.Sube(Sube_ID=1, Sube_Adi="Merkez"),
+            models.POSHareketleri(Islem_Tarihi=date(2025, 9, 1), Hesaba_Gecis=date(2025, 9, 2), Para_Birimi="TRY",
+                                  Islem_Tutari=Decimal("100.50"), Kesinti_Tutari=Decimal("1.00"),
+                                  Net_Tutar=Decimal("99.50"), Sube_ID=1),
+        ])
+        db.commit()
+        db.close()
+
+        app = FastAPI()
+        app.include_router(pos_hareketleri.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def test_upload_validates_and_anti_joins(self):
+        sheet = pd.DataFrame({
+            "İşlem Tarihi": ["01.09.2025", "01.09.2025", "02.09.2025", "02.09.2025", "03.09.2025", None],
+            "Hesaba Geçiş Tarihi": ["02.09.2025", "02.09.2025", "03.09.2025", "03.09.2025", "04.09.2025", "04.09.2025"],
+            "Para Birimi": ["TRY", "TRY", "TRY", "TRY", "TRY", "TRY"],
+            "İşlem Tutarı": [100.50, 100.51, 200.00, 200.00, 10.00, 5.00],
+            "Kesinti Tutarı": [1.00, 1.00, None, None, 20.00, 0.00],
+        })
+        excel = BytesIO()
+        sheet.to_excel(excel, index=False)
+        response = self.client.post(
+            "/api/v1/pos-hareketleri/upload/",
+            data={"sube_id": "1"},
+            files={"file": ("pos.xlsx", excel.getvalue(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+        )
+        self.assertEqual(response.status_code, 200)
+        # existing row, Kesinti above Islem and a missing date are skipped; the two
+        # identical sales on 02.09 are both kept
+        self.assertEqual((response.json()["added"], response.json()["skipped"]), (3, 3))
+
+        db = self.SessionLocal()
+        added = db.query(models.POSHareketleri).filter(models.POSHareketleri.Islem_Tarihi == date(2025, 9, 2)).all()
+        self.assertEqual(len(added), 2)
+        self.assertEqual((added[0].Islem_Tutari, added[0].Kesinti_Tutari, added[0].Net_Tutar), (Decimal("200.00"), Decimal("0.00"), Decimal("200.00")))
+        self.assertEqual(versioning.get_table_versions(db, [("POS_Hareketleri", 1, 0)]), [2])
+        db.close()
+
+    def test_identical_sales_across_chunks_are_all_imported(self):
+        sheet = pd.DataFrame({
+            "İşlem Tarihi": ["01.05.2025"] * 3 + ["01.09.2025"],
+            "Hesaba Geçiş Tarihi": ["02.05.2025"] * 3 + ["02.09.2025"],
+            "Para Birimi": ["TRY"] * 4,
+            "İşlem Tutarı": [150.0, 150.0, 150.0, 100.5],
+            "Kesinti Tutarı": [0.0, 0.0, 0.0, 1.0],
+        })
+        excel = BytesIO()
+        sheet.to_excel(excel, index=False)
+        with mock.patch.object(settings, "UPLOAD_CHUNK_ROWS", 2):
+            response = self.client.post(
+                "/api/v1/pos-hareketleri/upload/",
+                data={"sube_id": "1"},
+                files={"file": ("pos.xlsx", excel.getvalue(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+            )
+        self.assertEqual((response.json()["added"], response.json()["skipped"]), (3, 1))
+
+        db = self.SessionLocal()
+        self.assertEqual(db.query(models.POSHareketleri).filter(models.POSHareketleri.Islem_Tarihi == date(2025, 5, 1)).count(), 3)
+        db.close()
+
+    def test_import_uses_one_lookup_and_one_insert(self):
+        frame = pd.DataFrame({
+            "Islem_Tarihi": pd.date_range("2025-08-01", periods=300, freq="D"),
+            "Hesaba_Gecis": pd.date_range("2025-08-02", periods=300, freq="D"),
+            "Para_Birimi": "TRY",
+            "Islem_Tutari": [100.5 if i == 31 else float(i) for i in range(300)],  # 2025-09-01 is already stored
+            "Sube_ID": 1,
+        })
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(self.engine, "before_cursor_execute", listener)
+        db = self.SessionLocal()
+        try:
+            result = crud.create_pos_hareketleri_from_frame(db, frame)
+        finally:
+            db.close()
+            event.remove(self.engine, "before_cursor_execute", listener)
+        self.assertEqual(result, {"added": 299, "skipped": 1})
+        self.assertEqual(len([s for s in statements if s.startswith('INSERT INTO "POS_Hareketleri"')]), 1)
+        self.assertEqual(len([s for s in statements if s.startswith("SELECT") and 'FROM "POS_Hareketleri"' in s]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
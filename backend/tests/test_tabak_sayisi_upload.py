@@ -0,0 +1,101 @@
+import unittest
+from datetime import date, datetime
+from decimal import Decimal
+from io import BytesIO
+
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.database import Base, get_db
+from db import models
+from api.v1.endpoints import gelir_ekstra
+
+
+class TestTabakSayisiUpload(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        db.add(models.Sube(Sube_ID=1, Sube_Adi="Merkez"))
+        db.add_all([
+            models.GelirEkstra(Sube_ID=1, Tarih=date(2025, 9, gun), RobotPos_Tutar=Decimal("0.00"), Tabak_Sayisi=0)
+            for gun in range(1, 29)
+        ])
+        db.commit()
+        db.close()
+
+        app = FastAPI()
+        app.include_router(gelir_ekstra.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def upload(self, sheet):
+        excel = BytesIO()
+        sheet.to_excel(excel, index=False)
+        return self.client.post(
+            "/api/v1/upload-tabak-sayisi/",
+            data={"sube_id": "1"},
+            files={"file": ("tabak.xlsx", excel.getvalue(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+        )
+
+    def test_counts_are_applied_by_date(self):
+        response = self.upload(pd.DataFrame({
+            "Tarih": [datetime(2025, 9, 1, 23, 59), datetime(2025, 9, 2), datetime(2025, 9, 2), datetime(2025, 10, 1), "tarih yok"],
+            "Toplam Tabak Sayısı": [120, 80, 95, 10, 5],
+        }))
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body["updated_records"], body["records_not_found"]), (2, 1))
+        self.assertEqual(body["unmatched_dates"], ["2025-10-01"])
+        self.assertEqual(body["errors"], ["Row 6: invalid date"])
+
+        db = self.SessionLocal()
+        tabak = dict(db.query(models.GelirEkstra.Tarih, models.GelirEkstra.Tabak_Sayisi).filter(models.GelirEkstra.Tarih <= date(2025, 9, 3)))
+        self.assertEqual(tabak, {date(2025, 9, 1): 120, date(2025, 9, 2): 95, date(2025, 9, 3): 0})
+        db.close()
+
+    def test_dates_in_a_second_format_are_parsed(self):
+        response = self.upload(pd.DataFrame({
+            "Tarih": ["13.09.2025", "14.09.2025", "2025-09-15", "tarih yok"],
+            "Toplam Tabak Sayısı": [10, 20, 30, 40],
+        }))
+        body = response.json()
+        self.assertEqual(body["updated_records"], 3)
+        self.assertEqual(body["errors"], ["Row 5: invalid date"])
+
+    def test_month_is_read_once_and_written_in_one_batch(self):
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            response = self.upload(pd.DataFrame({
+                "Tarih": pd.date_range("2025-09-01", periods=28, freq="D"),
+                "Toplam Tabak Sayısı": range(1, 29),
+            }))
+        finally:
+            event.remove(self.engine, "before_cursor_execute", listener)
+        self.assertEqual(response.json()["updated_records"], 28)
+        self.assertEqual(len([s for s in statements if 'FROM "GelirEkstra"' in s]), 1)
+        self.assertEqual(len([s for s in statements if s.startswith('UPDATE "GelirEkstra"')]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.database import Base, get_db
+from db import models, versioning
+from api.v1.endpoints import e_fatura, kategori
+
+
+class TestTableEtag(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        db.add_all([
+            models.Sube(Sube_ID=1, Sube_Adi="Merkez"),
+            models.Sube(Sube_ID=2, Sube_Adi="Sube 2"),
+            models.Kategori(Kategori_ID=1, Kategori_Adi="Kira", Tip="Gider"),
+            models.EFatura(Fatura_ID=1, Fatura_Tarihi=date(2025, 8, 1), Fatura_Numarasi="F1", Alici_Unvani="A",
+                           Tutar=Decimal("1.00"), Donem=2508, Sube_ID=1),
+            models.EFatura(Fatura_ID=2, Fatura_Tarihi=date(2025, 8, 1), Fatura_Numarasi="F2", Alici_Unvani="A",
+                           Tutar=Decimal("1.00"), Donem=2508, Sube_ID=2),
+        ])
+        db.commit()
+        db.close()
+
+        app = FastAPI()
+        app.include_router(e_fatura.router, prefix="/api/v1")
+        app.include_router(kategori.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def test_unchanged_table_returns_304(self):
+        response = self.client.get("/api/v1/kategoriler/")
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["etag"]
+
+        response = self.client.get("/api/v1/kategoriler/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response.headers["etag"], etag)
+
+    def test_write_changes_etag(self):
+        etag = self.client.get("/api/v1/kategoriler/").headers["etag"]
+
+        db = self.SessionLocal()
+        db.add(models.Kategori(Kategori_ID=2, Kategori_Adi="Elektrik", Tip="Gider"))
+        db.commit()
+        db.close()
+
+        response = self.client.get("/api/v1/kategoriler/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["etag"], etag)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_write_only_invalidates_its_own_sube(self):
+        params_1 = {"sube_id": 1, "donem": 2508}
+        params_2 = {"sube_id": 2, "donem": 2508}
+        etag_1 = self.client.get("/api/v1/e-faturalar/", params=params_1).headers["etag"]
+        etag_2 = self.client.get("/api/v1/e-faturalar/", params=params_2).headers["etag"]
+        self.assertNotEqual(etag_1, etag_2)
+
+        db = self.SessionLocal()
+        fatura = db.query(models.EFatura).filter(models.EFatura.Fatura_ID == 1).first()
+        fatura.Aciklama = "changed"
+        db.commit()
+        db.close()
+
+        db = self.SessionLocal()
+        versions = versioning.get_table_versions(db, [("e_Fatura", 1, 2508), ("e_Fatura", 2, 2508), ("e_Fatura", 0, 0)])
+        db.close()
+        # Neither the other branch nor the table's own counter moved
+        self.assertEqual(versions, [2, 1, 0])
+
+        response = self.client.get("/api/v1/e-faturalar/", params=params_1, headers={"If-None-Match": etag_1})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get("/api/v1/e-faturalar/", params=params_2, headers={"If-None-Match": etag_2})
+        self.assertEqual(response.status_code, 304)
+
+    def test_branch_write_leaves_table_wide_row_unlocked(self):
+        db = self.SessionLocal()
+        before = versioning.get_table_versions(db, [versioning.any_write_key("e_Fatura")])[0]
+        fatura = db.query(models.EFatura).filter(models.EFatura.Fatura_ID == 1).first()
+        fatura.Aciklama = "changed"
+        db.commit()
+
+        # Only the branch counters are written; the any-write version is derived from them
+        row = db.get(models.TabloVersiyon, ("e_Fatura", 0, 0))
+        self.assertIsNone(row)
+        self.assertGreater(versioning.get_table_versions(db, [versioning.any_write_key("e_Fatura")])[0], before)
+        db.close()
+
+    def test_bulk_update_bumps_table_version(self):
+        db = self.SessionLocal()
+        before = versioning.get_table_versions(db, [("e_Fatura", 0, 0)])[0]
+        db.query(models.EFatura).update({models.EFatura.Aciklama: "bulk"})
+        db.commit()
+        after = versioning.get_table_versions(db, [("e_Fatura", 0, 0)])[0]
+        db.close()
+        self.assertGreater(after, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
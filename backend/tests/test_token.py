@@ -0,0 +1,111 @@
+import unittest
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core.security import get_password_hash
+from db.database import Base, get_db
+from db import crud, models, principals
+from schemas import user as user_schema
+from api.v1 import deps
+from api.v1.endpoints import token
+
+
+class TestToken(unittest.TestCase):
+    def setUp(self):
+        principals.clear_cache()
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        db.add(models.Kullanici(Kullanici_ID=1, Adi_Soyadi="Test", Kullanici_Adi="test",
+                                Password=get_password_hash("gizli"), Aktif_Pasif=True))
+        db.commit()
+        db.close()
+
+        app = FastAPI()
+        app.include_router(token.router, prefix="/api/v1")
+
+        @app.get("/me")
+        def me(current_user: models.Kullanici = Depends(deps.get_current_active_user)):
+            return {"username": current_user.Kullanici_Adi}
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def login(self, password="gizli"):
+        return self.client.post("/api/v1/token", data={"username": "test", "password": password})
+
+    def test_login(self):
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        tokens = response.json()
+        self.assertEqual(tokens["token_type"], "bearer")
+        self.assertIsNotNone(tokens["refresh_token"])
+
+        me = self.client.get("/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+        self.assertEqual(me.json(), {"username": "test"})
+
+        self.assertEqual(self.login("yanlis").status_code, 401)
+
+    def test_refresh_issues_new_access_token(self):
+        tokens = self.login().json()
+        response = self.client.post("/api/v1/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+        self.assertEqual(response.status_code, 200)
+        me = self.client.get("/me", headers={"Authorization": f"Bearer {response.json()['access_token']}"})
+        self.assertEqual(me.status_code, 200)
+
+    def test_token_types_are_not_interchangeable(self):
+        tokens = self.login().json()
+        response = self.client.post("/api/v1/token/refresh", json={"refresh_token": tokens["access_token"]})
+        self.assertEqual(response.status_code, 401)
+
+        me = self.client.get("/me", headers={"Authorization": f"Bearer {tokens['refresh_token']}"})
+        self.assertEqual(me.status_code, 401)
+
+    def test_principal_is_cached_until_user_changes(self):
+        headers = {"Authorization": f"Bearer {self.login().json()['access_token']}"}
+        self.client.get("/me", headers=headers)
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            self.assertEqual(self.client.get("/me", headers=headers).status_code, 200)
+        finally:
+            event.remove(self.engine, "before_cursor_execute", listener)
+        self.assertEqual(statements, [])
+
+        db = self.SessionLocal()
+        crud.update_user(db, 1, user_schema.UserUpdate(Adi_Soyadi="Test", Kullanici_Adi="test", Aktif_Pasif=False))
+        db.close()
+        self.assertEqual(self.client.get("/me", headers=headers).status_code, 400)
+
+    def test_inactive_user_cannot_refresh(self):
+        tokens = self.login().json()
+        db = self.SessionLocal()
+        db.query(models.Kullanici).filter(models.Kullanici.Kullanici_ID == 1).update({"Aktif_Pasif": False})
+        db.commit()
+        db.close()
+
+        response = self.client.post("/api/v1/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+        self.assertEqual(response.status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
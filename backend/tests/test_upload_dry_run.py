@@ -0,0 +1,137 @@
+import io
+import unittest
+from unittest import mock
+from datetime import date
+from decimal import Decimal
+
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from core import uploads
+from core.config import settings
+from db.database import Base, get_db
+from db import models, odeme_matcher
+from api.v1.endpoints import odeme, pos_hareketleri
+
+HEADER = "Tip;Hesap Adı;Tarih;Açıklama;Tutar\n"
+
+
+class TestUploadDryRun(unittest.TestCase):
+    def setUp(self):
+        odeme_matcher.clear_cache()
+        self.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        db = self.SessionLocal()
+        db.add_all([
+            models.Sube(Sube_ID=1, Sube_Adi="Merkez"),
+            models.Kategori(Kategori_ID=5, Kategori_Adi="Kira", Tip="Gider"),
+            models.OdemeReferans(Referans_ID=1, Referans_Metin="KIRA", Kategori_ID=5),
+            models.Odeme(Tip="Havale", Hesap_Adi="Banka", Tarih=date(2025, 8, 1), Aciklama="ESKI",
+                         Tutar=Decimal("-10.00"), Donem=2508, Sube_ID=1),
+            models.POSHareketleri(Islem_Tarihi=date(2025, 8, 1), Hesaba_Gecis=date(2025, 8, 2), Para_Birimi="TRY",
+                                  Islem_Tutari=Decimal("100.50"), Kesinti_Tutari=Decimal("1.00"),
+                                  Net_Tutar=Decimal("99.50"), Sube_ID=1),
+        ])
+        db.commit()
+        db.close()
+
+        app = FastAPI()
+        app.include_router(odeme.router, prefix="/api/v1")
+        app.include_router(pos_hareketleri.router, prefix="/api/v1")
+
+        def override_get_db():
+            session = self.SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def send_odeme(self):
+        content = (HEADER + "".join(line + "\n" for line in [
+            "Havale;Banka;01/08/2025;ESKI;-10,00",
+            "Havale;Banka;02/08/2025;AGUSTOS KIRA;-1.500,00",
+            "Havale;Banka;02/08/2025;AGUSTOS KIRA;-1.500,00",
+            "Havale;Banka;;TARIHSIZ;-5,00",
+            "EFT;Banka;03/08/2025;MARKET;-42.10",
+        ])).encode("utf-8")
+        return self.client.post("/api/v1/odeme/upload-csv/?dry_run=true",
+                                files={"file": ("ekstre.csv", content, "text/csv")})
+
+    def count_writes(self, send):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            response = send()
+        finally:
+            event.remove(self.engine, "before_cursor_execute", listener)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([s for s in statements if not s.lstrip().upper().startswith("SELECT")], [])
+        return response.json()
+
+    def test_odeme_dry_run_counts_without_writing(self):
+        preview = self.count_writes(self.send_odeme)
+
+        self.assertEqual(
+            (preview["parsed"], preview["new"], preview["duplicate"], preview["invalid"], preview["uncategorized"]),
+            (5, 2, 2, 1, 1)
+        )
+        self.assertEqual([row["Aciklama"] for row in preview["sample"]["new"]], ["AGUSTOS KIRA", "MARKET"])
+        self.assertEqual([row["Aciklama"] for row in preview["sample"]["duplicate"]], ["ESKI", "AGUSTOS KIRA"])
+
+        db = self.SessionLocal()
+        self.assertEqual(db.query(models.Odeme).count(), 1)
+        self.assertEqual(db.query(models.AktarimKaydi).count(), 0)
+        db.close()
+
+    def test_dry_run_reads_the_file_in_chunks(self):
+        # The repeated KIRA line is in the second chunk, its first copy in the first
+        with mock.patch.object(settings, "UPLOAD_CHUNK_ROWS", 2):
+            preview = self.count_writes(self.send_odeme)
+        self.assertEqual(
+            (preview["parsed"], preview["new"], preview["duplicate"], preview["invalid"], preview["uncategorized"]),
+            (5, 2, 2, 1, 1)
+        )
+        with mock.patch.object(uploads, "PREVIEW_SAMPLE_ROWS", 1):
+            preview = self.count_writes(self.send_odeme)
+        self.assertEqual(len(preview["sample"]["new"]), 1)
+
+    def test_pos_dry_run_counts_without_writing(self):
+        sheet = pd.DataFrame({
+            "İşlem Tarihi": ["01.08.2025", "03.08.2025", "03.08.2025", "bozuk"],
+            "Hesaba Geçiş Tarihi": ["02.08.2025", "04.08.2025", "04.08.2025", "04.08.2025"],
+            "Para Birimi": ["TRY"] * 4,
+            "İşlem Tutarı": [100.5, 20.0, 20.0, 5.0],
+            "Kesinti Tutarı": [1.0, 0.5, 0.5, 0.0],
+        })
+        content = io.BytesIO()
+        sheet.to_excel(content, index=False)
+        send = lambda: self.client.post(
+            "/api/v1/pos-hareketleri/upload/?dry_run=true", data={"sube_id": "1"},
+            files={"file": ("pos.xlsx", content.getvalue(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+        )
+        preview = self.count_writes(send)
+
+        self.assertEqual((preview["parsed"], preview["new"], preview["duplicate"], preview["invalid"]), (4, 2, 1, 1))
+        self.assertEqual(preview["sample"]["new"][0]["Net_Tutar"], 19.5)
+
+        db = self.SessionLocal()
+        self.assertEqual(db.query(models.POSHareketleri).count(), 1)
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
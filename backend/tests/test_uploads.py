@@ -0,0 +1,44 @@
+import tempfile
+import unittest
+from datetime import datetime
+
+import pandas as pd
+
+from core import uploads
+
+
+def spooled(content: bytes):
+    upload_file = tempfile.SpooledTemporaryFile(max_size=16)
+    upload_file.write(content)
+    upload_file.seek(0)
+    return upload_file
+
+
+class TestUploads(unittest.TestCase):
+    def test_batches(self):
+        self.assertEqual(list(uploads.batches(iter(range(5)), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(uploads.batches([], 2)), [])
+
+    def test_csv_rows_are_read_incrementally(self):
+        upload_file = spooled("﻿Tarih;Açıklama\n01/08/2025;Kira\n02/08/2025;Market\n".encode("utf-8"))
+        rows = uploads.iter_csv_rows(upload_file, delimiter=";")
+        self.assertEqual(next(rows), {"Tarih": "01/08/2025", "Açıklama": "Kira"})
+        self.assertEqual(len(list(rows)), 1)
+        self.assertFalse(upload_file.closed)
+
+        with self.assertRaises(UnicodeDecodeError):
+            list(uploads.iter_csv_rows(spooled(b"Tarih\n\xff\xfe\n")))
+
+    def test_excel_frames(self):
+        sheet = pd.DataFrame({"Tarih": pd.date_range("2025-09-01", periods=5), "Toplam Tabak": range(5)})
+        upload_file = tempfile.SpooledTemporaryFile()
+        sheet.to_excel(upload_file, index=False)
+
+        frames = list(uploads.iter_excel_frames(upload_file, chunk_rows=2))
+        self.assertEqual([len(frame) for frame in frames], [2, 2, 1])
+        self.assertEqual(list(frames[0].columns), ["Tarih", "Toplam Tabak"])
+        self.assertEqual(frames[2].iloc[0].tolist(), [datetime(2025, 9, 5), 4])
+
+
+if __name__ == "__main__":
+    unittest.main()